@@ -25,4 +25,12 @@ from app import *
 
 # Application code
 if __name__ == '__main__':
-    Invaders(width=GAME_WIDTH,height=GAME_HEIGHT).run()
+    options = dict(arg[2:].split('=',1) for arg in sys.argv[1:] if arg.startswith('--') and '=' in arg)
+    # Draw at --fps=N while simulating in fixed steps of --timestep=SECONDS
+    fps = float(options.get('fps',60))
+    timestep = float(options['timestep']) if 'timestep' in options else None
+    game = Invaders(width=GAME_WIDTH,height=GAME_HEIGHT,fps=fps,timestep=timestep)
+    # Record the session with --record=FILE, for replay with headless.py --replay=FILE
+    if 'record' in options:
+        game.record(options['record'])
+    game.run()
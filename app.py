@@ -42,14 +42,23 @@ class Invaders(GameApp):
             self._subtext = GLabel(text='PRESS \'M\' TO MUTE SOUND', linecolor = introcs.RGB(255, 255, 255), \
             font_size= 50, font_name='Arcade.ttf', x=GAME_WIDTH/2, y=GAME_HEIGHT/4)
             self._wave = None
+        if self.metrics is not None:
+            self.metrics.register('aliens', lambda: self._wavecount('getAlienCount'))
+            self.metrics.register('bolts', lambda: self._wavecount('getBoltCount'))
+            self.metrics.register('collisions', lambda: self._wavecount('getCollisionTests'))
 
     def update(self,dt):
         """
         Animates a single frame in the game.
 
+        The wave remembers where everything was before the update, so that draw can
+        blend between the two when the game uses a fixed time step.
+
         Parameter dt: The time in seconds since last update
         Precondition: dt is a number (int or float)
         """
+        if self._wave is not None:
+            self._wave.remember()
         if self._state == STATE_INACTIVE:
             self.inputkeys()
         if self._state == STATE_NEWWAVE:
@@ -65,7 +74,7 @@ class Invaders(GameApp):
                 self._text = GLabel(text='YOU WON!', linecolor = introcs.RGB(255, 255, 255),\
                 font_size= 75, font_name='Arcade.ttf', x=GAME_WIDTH/2, y=GAME_HEIGHT/2)
                 self._subtext = None
-                self._state = STATE_COMPLETE
+                self._setstate(STATE_COMPLETE)
 
     def newwavestate(self):
         """
@@ -77,7 +86,7 @@ class Invaders(GameApp):
         self._text = None
         self._subtext = None
         self._wave = Wave()
-        self._state = STATE_ACTIVE
+        self._setstate(STATE_ACTIVE)
 
     def activestate(self, dt):
         """
@@ -92,21 +101,21 @@ class Invaders(GameApp):
         """
         self._text = None
         self._subtext = None
-        self.moveship()
+        self.moveship(dt)
         if self._wave is not None:
             self._wave.update(dt,self.input)
         if self._wave.lives() == True:
             if self._wave.getLives() > 0:
                 self._templife = self._wave.getLives()
                 self._wave.setLives(self._templife)
-                self._state = STATE_ACTIVE
+                self._setstate(STATE_ACTIVE)
             if self._wave.getShip() is None and self._wave.getLives() > 0:
-                self._state = STATE_PAUSED
+                self._setstate(STATE_PAUSED)
         if self._wave.lives() == False or self._wave.aliensbelow():
             self._text = GLabel(text='YOU LOST', linecolor = introcs.RGB(255, 255, 255), \
             font_size= 75, font_name='Arcade.ttf', x=GAME_WIDTH/2, y=200)
             self._subtext = None
-            self._state = STATE_COMPLETE
+            self._setstate(STATE_COMPLETE)
 
     def pausedstate(self):
         """
@@ -122,7 +131,7 @@ class Invaders(GameApp):
         font_size= 55, font_name='Arcade.ttf', x=GAME_WIDTH/2, y=200)
         self._subtext = None
         if self.inputkeys():
-            self._state = STATE_CONTINUE
+            self._setstate(STATE_CONTINUE)
 
     def continuestate(self):
         """
@@ -133,11 +142,11 @@ class Invaders(GameApp):
         the text attributes are set to None (no text is visible on the screen).
         """
         self._wave.newShip()
-        self._state = STATE_ACTIVE
+        self._setstate(STATE_ACTIVE)
         self._text = None
         self._subtext = None
 
-    def moveship(self):
+    def moveship(self, dt):
         """
         This method moves the ships according to the user's key presses.
 
@@ -148,26 +157,92 @@ class Invaders(GameApp):
         To move left, the function is_key_down() checks if the left key is
         being pressed. If it is, the shipleft method is called, allowing the
         ship to move left.
+
+        Parameter dt: The time in seconds since last update
+        Precondition: dt is a number (int or float)
         """
         if self._input.is_key_down('right'):
             if self._wave.getShip() is not None:
-                self._wave.getShip().shipright()
+                self._wave.getShip().shipright(dt)
         if self._input.is_key_down('left'):
             if self._wave.getShip() is not None:
-                self._wave.getShip().shipleft()
+                self._wave.getShip().shipleft(dt)
 
     def draw(self):
         """
         Draws the game objects (background image, text, alien wave and subtext) to the view.
+
+        The wave is drawn with the interpolation factor alpha, so it moves smoothly
+        even when the frame rate is lower than the rate of the fixed time steps.
         """
         self._background.draw(self.view)
         if not self._text is None:
             self._text.draw(self.view)
         if not self._wave is None:
-            self._wave.draw(self.view)
+            self._wave.draw(self.view, self.alpha)
         if not self._subtext is None:
             self._subtext.draw(self.view)
 
+    def snapshot(self):
+        """
+        Returns a dictionary of the game state for the frame-spike sampler.
+
+        The dictionary has the state, the number of aliens alive and the number of
+        bolts on screen, which are the usual suspects for a slow frame.
+        """
+        return {'state': self._state, 'aliens': self._wavecount('getAlienCount'),
+                'bolts': self._wavecount('getBoltCount')}
+
+    def getState(self):
+        """
+        Returns the current state of the game, one of the STATE constants in consts.py.
+        """
+        return self._state
+
+    def restart(self):
+        """
+        Starts a new game with a fresh wave, whatever the current state.
+
+        The new wave is created at the next update, exactly as when 'P' is pressed on
+        the welcome screen. This lets a harness play games back to back.
+        """
+        self._text = None
+        self._subtext = None
+        self._setstate(STATE_NEWWAVE)
+
+    def _setstate(self, state):
+        """
+        Changes the state of the game, running or holding back garbage collection.
+
+        Full garbage collections are held back while the wave is active, so that they
+        cannot cause a hitch in play. They are run when the game pauses, starts a new
+        wave or finishes, where nobody will notice. Nothing happens if the state does
+        not change.
+
+        Parameter state: the new state of the game
+        Precondition: state is one of the STATE constants in consts.py
+        """
+        if state == self._state:
+            return
+        self._state = state
+        if state == STATE_ACTIVE:
+            self.holdgc()
+        elif state in (STATE_PAUSED, STATE_NEWWAVE, STATE_COMPLETE):
+            self.releasegc()
+
+    def _wavecount(self, getter):
+        """
+        Returns the value of the given counting getter of the wave, or 0 if there is no wave.
+
+        This method supplies the game columns of the frame metrics.
+
+        Parameter getter: the name of a Wave getter returning a number
+        Precondition: getter is a string
+        """
+        if self._wave is None:
+            return 0
+        return getattr(self._wave, getter)()
+
     def inputkeys(self):
         """
         Checks if the key being pressed has also been pressed beforehand.
@@ -182,13 +257,13 @@ class Invaders(GameApp):
         to 0 if the key 'm' is pressed on the welcome screen.
         """
         if self._pressed == False and self._input.is_key_down('p') and self._state == STATE_INACTIVE:
-                self._state = STATE_NEWWAVE
+                self._setstate(STATE_NEWWAVE)
                 self._text = None
                 self._pressed = True
                 self._subtext = None
                 return True
         elif self._pressed == False and self._input.is_key_down('p') and self._state == STATE_PAUSED:
-            self._state = STATE_ACTIVE
+            self._setstate(STATE_ACTIVE)
             self._pressed = True
             self._text = None
             self._subtext = None
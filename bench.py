@@ -0,0 +1,104 @@
+"""
+A script to benchmark the game2d operations that Alien Invaders relies on
+
+This script times the game2d primitives (see the module game2d.bench) and appends
+the results for the current commit to a JSON Lines file.  It can then compare two
+commits and flag the benchmarks that regressed:
+
+    python bench.py run
+    python bench.py compare                (the last two commits in the file)
+    python bench.py compare BASE [HEAD]    (commits named by the start of their hash)
+    python bench.py list
+
+The optional flags are
+
+    --results=FILE (the results file; default benchmarks.jsonl)
+    --only=TEXT   (only run the benchmarks whose names contain this text)
+    --repeat=N    (the number of samples of each benchmark; default 7)
+    --threshold=RATIO (the smallest slowdown to flag; default 0.10)
+
+The benchmarks draw with Kivy, so that they include the cost of its instructions
+and textures, unless Kivy cannot be imported.  Set GAME2D_BACKEND=null to time the
+null backend instead.  Each run is tagged with its backend, and the list and compare
+commands only look at the runs on the backend in use.
+
+The comparison exits with status 1 if any benchmark regressed.
+"""
+import os
+import sys
+
+
+def choose():
+    """
+    Returns the backend to benchmark, and sets GAME2D_BACKEND to it.
+
+    The environment variable wins if it is set. Otherwise the backend is Kivy if it
+    can be imported and can open a window, and the null backend if not. Kivy needs
+    the window for its OpenGL context, without which it cannot build lines, meshes
+    or textures. This must be called before game2d is imported, as the backend
+    cannot change after that.
+    """
+    # Kivy rejects command line flags it does not know, such as --results
+    os.environ.setdefault('KIVY_NO_ARGS','1')
+    if os.environ.get('GAME2D_BACKEND','kivy') == 'kivy':
+        try:
+            from kivy.core.window import Window
+            os.environ.setdefault('GAME2D_BACKEND','kivy' if Window is not None else 'null')
+        except ImportError:
+            os.environ.setdefault('GAME2D_BACKEND','null')
+    return os.environ['GAME2D_BACKEND']
+
+
+if __name__ == '__main__':
+    choose()
+    # The headless module selects the null backend, so game2d must be imported first
+    from game2d import GameApp
+    from game2d import bench
+    from game2d.backend import BACKEND as backend
+    from headless import flag
+
+    results = flag('results','benchmarks.jsonl',str)
+    only = flag('only',None,str)
+    repeat = flag('repeat',7,int)
+    threshold = flag('threshold',0.10,float)
+    words = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    command = words[0] if words else 'run'
+
+    if command == 'run':
+        GameApp.images = os.path.join(os.path.dirname(os.path.abspath(__file__)),'Images')
+        if backend == 'kivy':
+            # Kivy finds the textures through its resource path, as in a running game
+            import kivy.resources
+            kivy.resources.resource_add_path(GameApp.images)
+        record = bench.run('alien1.png','alien-strip1.png',only,repeat)
+        bench.save(results,record)
+        for name in sorted(record['results']):
+            value = record['results'][name]
+            print('%-24s %10.3f us  (spread %4.1f%%)' % (name,value['median']*1e6,value['spread']*100))
+        print('saved as commit %s (%s backend) in %s' % (record['commit'],backend,results))
+    elif command in ('list','compare') and not os.path.exists(results):
+        print('there are no results in %s; use run first' % results)
+        sys.exit(2)
+    elif command == 'list':
+        for name in bench.runs(results,backend):
+            print(name)
+    elif command == 'compare':
+        names = bench.runs(results,backend)
+        if len(words) >= 3:
+            (base, head) = (bench.load(results,words[1],backend),bench.load(results,words[2],backend))
+        elif len(words) == 2:
+            (base, head) = (bench.load(results,words[1],backend),bench.load(results,None,backend))
+        elif len(names) >= 2:
+            (base, head) = (bench.load(results,names[-2],backend),bench.load(results,names[-1],backend))
+        else:
+            print('there are fewer than two commits on the %s backend in %s' % (backend,results))
+            sys.exit(2)
+        if base is None or head is None:
+            print('there is no run for that commit on the %s backend in %s' % (backend,results))
+            sys.exit(2)
+        (report, regressions) = bench.compare(base,head,threshold)
+        print(report)
+        sys.exit(1 if regressions else 0)
+    else:
+        print('unknown command %s; use run, compare or list' % repr(command))
+        sys.exit(2)
@@ -27,8 +27,8 @@ SHIP_WIDTH    = 44
 SHIP_HEIGHT   = 44
 # the distance of the (bottom of the) ship from the bottom of the screen
 SHIP_BOTTOM   = 32
-# The number of pixels to move the ship per update
-SHIP_MOVEMENT = 5
+# The number of pixels to move the ship per second
+SHIP_MOVEMENT = 300
 # The number of lives a ship has
 SHIP_LIVES    = 3
 
@@ -68,8 +68,8 @@ ALIEN_SPEED = 1.0
 BOLT_WIDTH  = 4
 # the height of a laser bolt
 BOLT_HEIGHT = 16
-# the number of pixels to move the bolt per update
-BOLT_SPEED  = 10
+# the number of pixels to move the bolt per second
+BOLT_SPEED  = 600
 # the number of ALIEN STEPS (not frames) between bolts
 BOLT_RATE   = 5
 
@@ -116,3 +116,8 @@ except:
     pass # Use original value
 
 ### ADD MORE CONSTANTS (PROPERLY COMMENTED) AS NECESSARY ###
+
+# the horizontal distance between the centers of neighboring alien columns
+ALIEN_COL_STEP = ALIEN_WIDTH + ALIEN_H_SEP
+# the vertical distance between the centers of neighboring alien rows
+ALIEN_ROW_STEP = ALIEN_HEIGHT + ALIEN_V_SEP
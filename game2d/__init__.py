@@ -11,6 +11,16 @@ from .gobject import GObject, GScene
 from .grectangle import GRectangle, GEllipse, GImage, GLabel
 from .gsprite import GSprite
 from .gpath import GPath, GTriangle, GPolygon
-from .gview import GInput, GView
+from .gview import GInput, GScriptedInput, GView
 from .sound import Sound, SoundLibrary
-from .app import GameApp
\ No newline at end of file
+from .app import GameApp
+from .overlay import GOverlay
+from .metrics import GMetrics
+from .capture import GCapture
+from .watchdog import GWatchdog
+from .trace import GTracer
+from .allocs import GAllocations
+from .collector import GCollector
+from .registry import GRegistry
+from .runner import HeadlessRunner
+from .replay import GRecorder, GReplay, GReplayInput
@@ -0,0 +1,208 @@
+"""
+Per-frame allocation tracking for 2D game support.
+
+A frame that allocates nothing in its steady state cannot trigger the garbage
+collector or grow the heap.  The class in this module uses ``tracemalloc`` to take a
+snapshot at the end of every frame, compares it to the one before, and charges every
+new block of memory to the line of game code that asked for it.  It then reports the
+call sites that allocate the most, and how many frames allocated nothing at all.
+
+This is an instrumentation mode.  Tracing every allocation and grouping a snapshot at
+the end of every frame costs tens of milliseconds a frame, so the game runs at a few
+frames a second.  Frames whose traced memory did not change are skipped cheaply.
+"""
+import os
+import linecache
+import tracemalloc
+
+
+class GAllocations(object):
+    """
+    A class to track the memory allocated in each frame by the game.
+
+    Each call to :meth:`record` compares a new ``tracemalloc`` snapshot to the previous
+    one.  Only the blocks still alive at the end of the frame are seen, so a temporary
+    that is freed within the frame is not counted.  Every block that is new is charged
+    to the innermost line of its traceback that is in one of the watched folders (by
+    default the folder of the game and of this package), so an allocation made deep in
+    Kivy or NumPy is charged to the game code that caused it.
+
+    A frame is allocation-free if no new block was charged to any watched line.  The
+    comparison is by count: a frame that frees as many blocks at a site as it allocates
+    there is not charged for that site.
+    """
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def frames(self):
+        """
+        The number of frames recorded.
+
+        **Invariant**: Must be an int >= 0.
+        """
+        return self._frames
+
+    @property
+    def clean(self):
+        """
+        The number of frames recorded that were allocation-free.
+
+        **Invariant**: Must be an int in 0..frames.
+        """
+        return self._clean
+
+    @property
+    def last(self):
+        """
+        The (bytes, blocks) charged to watched lines in the last frame recorded.
+
+        **Invariant**: Must be a tuple of two ints >= 0.
+        """
+        return self._last
+
+    # BUILT-IN METHODS
+    def __init__(self,folders,depth=16,limit=10):
+        """
+        Creates a new tracker and starts ``tracemalloc``.
+
+        :param folders: the folders whose source files are charged for allocations
+        :type folders:  ``list`` of ``str``
+
+        :param depth: the number of stack frames stored for each allocation
+        :type depth:  ``int`` > 0
+
+        :param limit: the number of call sites in a report
+        :type limit:  ``int`` > 0
+        """
+        assert type(depth) == int and depth > 0, 'depth %s is not a positive int' % repr(depth)
+        assert type(limit) == int and limit > 0, 'limit %s is not a positive int' % repr(limit)
+        assert len(folders) > 0, 'there are no folders to watch'
+        self._folders = tuple(os.path.join(os.path.abspath(folder),'') for folder in folders)
+        self._root = os.path.commonpath(self._folders)
+        self._limit = limit
+        self._frames = 0
+        self._clean  = 0
+        self._last   = (0,0)
+        # Site (filename, lineno) -> [bytes, blocks, frames]
+        self._sites  = {}
+        self._skip   = (os.path.abspath(__file__),tracemalloc.__file__)
+        # The null backend stands in for Kivy, so it is charged to its callers
+        self._pass   = (os.path.join(os.path.dirname(self._skip[0]),'null.py'),)
+        self._started = not tracemalloc.is_tracing()
+        if self._started:
+            tracemalloc.start(depth)
+        self._traced = tracemalloc.get_traced_memory()[0]
+        self._blocks = self._group()
+
+    # PUBLIC METHODS
+    def record(self):
+        """
+        Compares the heap to the end of the previous frame and charges the new blocks.
+        """
+        self._frames += 1
+        traced = tracemalloc.get_traced_memory()[0]
+        if traced == self._traced:
+            # Grouping a snapshot is slow, so skip the frames that did not change size
+            self._last = (0,0)
+            self._clean += 1
+            return
+        self._traced = traced
+
+        blocks = self._group()
+        size = 0
+        count = 0
+        charged = set()
+        for key in blocks:
+            (newsize, newcount) = blocks[key]
+            (oldsize, oldcount) = self._blocks.get(key,(0,0))
+            if newcount <= oldcount:
+                continue
+            site = self._site(key)
+            if site is None:
+                continue
+            if not site in self._sites:
+                self._sites[site] = [0,0,0]
+            totals = self._sites[site]
+            totals[0] += max(newsize-oldsize,0)
+            totals[1] += newcount-oldcount
+            if not site in charged:
+                totals[2] += 1
+                charged.add(site)
+            size  += max(newsize-oldsize,0)
+            count += newcount-oldcount
+        self._blocks = blocks
+        self._last = (size,count)
+        if count == 0:
+            self._clean += 1
+
+    def report(self):
+        """
+        Returns: a multiline summary of the call sites that allocated the most
+
+        The sites are sorted by the total bytes charged to them.  Each line shows the
+        bytes, the blocks and the number of frames in which the site allocated.
+        """
+        lines = ['allocations over %d frames: %d allocation-free' % (self._frames,self._clean)]
+        sites = sorted(self._sites.items(),key=lambda item: -item[1][0])
+        for (site, totals) in sites[:self._limit]:
+            (filename, lineno) = site
+            source = linecache.getline(filename,lineno).strip()
+            lines.append('%10d B %7d blocks %6d frames  %s:%d  %s' %
+                         (totals[0],totals[1],totals[2],self._short(filename),lineno,source))
+        return '\n'.join(lines)
+
+    def dump(self,path):
+        """
+        Writes the report to the given file.
+
+        :param path: the name of the file to write
+        :type path:  ``str``
+        """
+        with open(path,'w') as file:
+            file.write(self.report()+'\n')
+
+    def close(self):
+        """
+        Stops ``tracemalloc``, if this tracker started it.
+        """
+        self._blocks = {}
+        if self._started and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self._started = False
+
+    # HIDDEN METHODS
+    def _group(self):
+        """
+        Returns: the live blocks of the heap as a dictionary from traceback to (size, count)
+        """
+        result = {}
+        for stat in tracemalloc.take_snapshot().statistics('traceback'):
+            result[stat.traceback] = (stat.size,stat.count)
+        return result
+
+    def _site(self,traceback):
+        """
+        Returns: the innermost (filename, lineno) of traceback in a watched folder, or None
+
+        The allocations of the tracker itself and of ``tracemalloc`` are never charged.
+        (Filtering them out of the snapshot is much slower.)
+
+        :param traceback: the traceback of an allocation
+        :type traceback:  ``tracemalloc.Traceback``
+        """
+        # The innermost frame is last
+        if traceback[-1].filename in self._skip:
+            return None
+        for frame in reversed(traceback):
+            if frame.filename.startswith(self._folders) and not frame.filename in self._pass:
+                return (frame.filename,frame.lineno)
+        return None
+
+    def _short(self,filename):
+        """
+        Returns: the file name relative to the folder shared by all watched folders
+
+        :param filename: the absolute name of a file in a watched folder
+        :type filename:  ``str``
+        """
+        return os.path.relpath(filename,self._root)
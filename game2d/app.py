@@ -7,17 +7,23 @@ The primary class for 2D game support.
 Author: Walker M. White (wmw2)
 Date:   August 1, 2017 (Python 3 version)
 """
-# Basic Kivy Modules
-import kivy
-import kivy.app
-
-# Lower-level kivy modules to support animation
-from kivy.config import Config
-from kivy.clock  import Clock
+from .backend import HEADLESS
+if HEADLESS:
+    from .null import App, Config, Clock
+else:
+    # Basic Kivy Modules
+    import kivy
+    from kivy.app import App
+    
+    # Lower-level kivy modules to support animation
+    from kivy.config import Config
+    from kivy.clock  import Clock
 
 import os.path
+import time
+from .trace import GTracer
 
-class GameApp(kivy.app.App):
+class GameApp(App):
     """
     A controller class for a simple game application.
     
@@ -39,6 +45,13 @@ class GameApp(kivy.app.App):
     # Class attribute for tracking textures (to reduce memory footprint)
     TEXTURE_CACHE = {}
     
+    # The key that toggles the frame-time overlay
+    OVERLAY_KEY = 'f3'
+    # The key that writes the frame metrics to their file
+    METRICS_KEY = 'f4'
+    # The key that profiles the next few frames
+    PROFILE_KEY = 'f5'
+    
     
     # MUTABLE ATTRIBUTES
     @property
@@ -62,8 +75,183 @@ class GameApp(kivy.app.App):
         self._fps = value
         Clock.schedule_interval(self._refresh,1.0/self._fps)
     
+    @property
+    def timestep(self):
+        """
+        The fixed simulation time step in seconds, or None for a variable time step
+        
+        By default this value is None, and ``update`` is called once per animation frame
+        with the time since the last frame.  If it is a number, the game uses a fixed
+        time step instead.  The time since the last frame is added to an accumulator,
+        and ``update`` is called with exactly this time step for as long as the
+        accumulator holds at least one step.  Hence the simulation behaves the same no
+        matter what the ``fps``, and the frame rate can drop without changing the game.
+        
+        See also the attributes ``maxsteps`` and ``alpha``.
+        
+        **Invariant**: Must be None or an int or float > 0.
+        """
+        return self._timestep
+    
+    @timestep.setter
+    def timestep(self,value):
+        assert value is None or type(value) in [int,float], 'value %s is not a number' % repr(value)
+        assert value is None or value > 0, 'value %s is not positive' % repr(value)
+        self._timestep = value
+        self._accumulator = 0.0
+        self._alpha = 1.0 if value is None else 0.0
+    
+    @property
+    def maxsteps(self):
+        """
+        The maximum number of fixed time steps in one animation frame
+        
+        When a frame is late, the fixed time step loop runs several steps to catch up.
+        This value caps those steps, so that a slow machine does not fall further and
+        further behind.  Any time beyond the cap is discarded.  It has no effect if
+        ``timestep`` is None.  By default this value is 5.
+        
+        **Invariant**: Must be an int > 0.
+        """
+        return self._maxsteps
+    
+    @maxsteps.setter
+    def maxsteps(self,value):
+        assert type(value) == int, 'value %s is not an int' % repr(value)
+        assert value > 0, 'value %s is not positive' % repr(value)
+        self._maxsteps = value
+    
+    
+    @property
+    def overlay(self):
+        """
+        Whether to draw the frame-time overlay on top of the game
+        
+        The overlay shows the average update, draw and frame times, the frame rate and
+        the number of graphics instructions, with a graph of recent frames.  See the 
+        class :class:`GOverlay` for more information.  This value can also be toggled
+        by pressing ``OVERLAY_KEY``.  It is False by default.
+        
+        **Invariant**: Must be a bool.
+        """
+        return self._overlay
+    
+    @overlay.setter
+    def overlay(self,value):
+        assert type(value) == bool, 'value %s is not a bool' % repr(value)
+        self._overlay = value
+    
+    
+    @property
+    def captureframes(self):
+        """
+        The number of frames profiled when ``PROFILE_KEY`` is pressed
+        
+        By default this value is 120 (two seconds at 60 FPS).  See the method 
+        :meth:`capture` for more information.
+        
+        **Invariant**: Must be an int > 0.
+        """
+        return self._captureframes
+    
+    @captureframes.setter
+    def captureframes(self,value):
+        assert type(value) == int, 'value %s is not an int' % repr(value)
+        assert value > 0, 'value %s is not positive' % repr(value)
+        self._captureframes = value
+    
     
     # IMMUTABLE PROPERTIES
+    @property
+    def capturing(self):
+        """
+        Whether the next animation frame will be profiled
+        
+        **Invariant**: Must be a bool.
+        """
+        return not self._capture is None
+    
+    @property
+    def watchdog(self):
+        """
+        The frame-spike sampler of this game, or None if frames are not being watched
+        
+        See the method :meth:`watch` to start watching.
+        
+        **Invariant**: Must be a :class:`GWatchdog` or None.
+        """
+        return self._watchdog
+    
+    @property
+    def allocations(self):
+        """
+        The per-frame allocation tracker of this game, or None if it is not tracking
+        
+        See the method :meth:`track` to start tracking.
+        
+        **Invariant**: Must be a :class:`GAllocations` or None.
+        """
+        return self._allocs
+    
+    @property
+    def collector(self):
+        """
+        The garbage collection policy of this game, or None if it is not managed
+        
+        See the method :meth:`managegc` to manage collections.
+        
+        **Invariant**: Must be a :class:`GCollector` or None.
+        """
+        return self._collector
+    
+    @property
+    def registry(self):
+        """
+        The registry of live graphics objects of this game, or None if there is none
+        
+        See the method :meth:`census` to start a registry.
+        
+        **Invariant**: Must be a :class:`GRegistry` or None.
+        """
+        return self._registry
+    
+    @property
+    def metrics(self):
+        """
+        The per-frame metrics of this game, or None if they are not being measured
+        
+        See the method :meth:`measure` to start measuring.
+        
+        **Invariant**: Must be a :class:`GMetrics` or None.
+        """
+        return self._metrics
+    
+    @property
+    def timings(self):
+        """
+        The time spent in the last animation frame, as a (clear, update, draw) tuple
+        
+        Each entry is in seconds.  The update time includes every fixed time step in
+        the frame.  The time to draw the overlay is not included.
+        
+        **Invariant**: Must be a tuple of three floats >= 0.
+        """
+        return self._timings
+    
+    @property
+    def alpha(self):
+        """
+        The interpolation factor for drawing between two fixed time steps
+        
+        This is the fraction of a time step left in the accumulator after the last
+        ``update``.  A game may use it in ``draw`` to blend between the previous and
+        current state of an object, as in ``previous*(1-alpha)+current*alpha``.  It is
+        always 1 if ``timestep`` is None, so that the blend is just the current state.
+        
+        **Invariant**: Must be a float in 0..1.
+        """
+        return self._alpha
+    
     @property
     def width(self):
         """
@@ -178,6 +366,9 @@ class GameApp(kivy.app.App):
         assert cls.is_image(name), '%s is not an image file' % repr(name)
         if name in cls.TEXTURE_CACHE:
             return cls.TEXTURE_CACHE[name]
+        elif HEADLESS:
+            # There are no textures without a window
+            return None
         
         try:
             from kivy.core.image import Image
@@ -232,22 +423,55 @@ class GameApp(kivy.app.App):
         w = keywords.pop('width', 0.0)
         h = keywords.pop('height', 0.0)
         f = keywords.pop('fps', 60.0)
+        t = keywords.pop('timestep', None)
+        m = keywords.pop('maxsteps', 5)
+        o = keywords.pop('overlay', False)
+        c = keywords.pop('captureframes', 120)
 
         assert type(w) in [int,float], 'width %s is not a number' % repr(w)
         assert type(h) in [int,float], 'height %s is not a number' % repr(h)
         assert type(f) in [int,float], 'fps %s is not a number' % repr(value)
         assert f > 0, 'fps %s is not positive' % repr(value)
+        assert t is None or type(t) in [int,float], 'timestep %s is not a number' % repr(t)
+        assert t is None or t > 0, 'timestep %s is not positive' % repr(t)
+        assert type(m) == int and m > 0, 'maxsteps %s is not a positive int' % repr(m)
+        assert type(o) == bool, 'overlay %s is not a bool' % repr(o)
+        assert type(c) == int and c > 0, 'captureframes %s is not a positive int' % repr(c)
 
         self._gwidth = w
         self._gheight = h
         self._fps = f
+        self._timestep = t
+        self._maxsteps = m
+        self._accumulator = 0.0
+        self._alpha = 1.0 if t is None else 0.0
+        self._recorder = None
+        self._overlay = o
+        self._graph = None
+        self._toggled = False
+        self._captureframes = c
+        self._capture = None
+        self._capturing = False
+        self._timings = (0.0,0.0,0.0)
+        self._metrics = None
+        self._metricsfile = None
+        self._watchdog = None
+        self._tracer = None
+        self._allocs = None
+        self._allocsfile = None
+        self._collector = None
+        self._collectorfile = None
+        self._registry = None
+        # The span names of update and draw, after the game class
+        self._spans = (type(self).__name__+'.update',type(self).__name__+'.draw')
+        self._dumping = False
         
         Config.set('graphics', 'width', str(self.width))
         Config.set('graphics', 'height', str(self.height))
         self._setpaths()
         
         # Tell Kivy to build the application
-        kivy.app.App.__init__(self,**keywords)
+        App.__init__(self,**keywords)
     
     
     # PUBLIC METHODS
@@ -273,7 +497,7 @@ class GameApp(kivy.app.App):
         It should **never** be overridden.
         """
         Clock.schedule_once(self._bootstrap,-1)
-        kivy.app.App.run(self)
+        App.run(self)
     
     def stop(self):
         """
@@ -283,9 +507,246 @@ class GameApp(kivy.app.App):
         It should **never** be overridden.
         """
         import sys
-        kivy.app.App.stop(self)
+        if not self._recorder is None:
+            self._recorder.close()
+        if not self._watchdog is None:
+            self._watchdog.close()
+        if not self._tracer is None:
+            self._tracer.close()
+        self._finish()
+        App.stop(self)
         sys.exit(0)
     
+    def record(self,path,seed=None):
+        """
+        Records the input and time step of every frame to the given file.
+
+        This method seeds the ``random`` module, so it must be called before the game
+        is started.  The recording is completed when the game is stopped.  See
+        :class:`GRecorder` for more information.
+
+        :param path: the name of the file to record to
+        :type path:  ``str``
+
+        :param seed: the seed for the ``random`` module (optional)
+        :type seed:  ``int`` >= 0
+
+        :return: the recorder for this game
+        :rtype:  :class:`GRecorder`
+        """
+        from .replay import GRecorder
+        assert self._recorder is None, 'the game is already recording'
+        self._recorder = GRecorder(path,seed,timestep=self._timestep,maxsteps=self._maxsteps)
+        return self._recorder
+
+    def measure(self,path=None,capacity=3600):
+        """
+        Records metrics for every frame in a ring buffer.
+        
+        The metrics are written to the given file whenever ``METRICS_KEY`` is pressed,
+        and again when the game stops.  The frame time percentiles are also printed
+        when the game stops.  A game can add its own columns to the :attr:`metrics`
+        in ``start``.  See :class:`GMetrics` for more information.
+        
+        :param path: the name of the .csv or .jsonl file to write (optional)
+        :type path:  ``str``
+        
+        :param capacity: the maximum number of frames to keep
+        :type capacity:  ``int`` > 0
+        
+        :return: the metrics for this game
+        :rtype:  :class:`GMetrics`
+        """
+        from .metrics import GMetrics
+        assert self._metrics is None, 'the game is already measuring'
+        self._metrics = GMetrics(capacity)
+        self._metricsfile = path
+        return self._metrics
+    
+    def capture(self,frames=None,path=None):
+        """
+        Profiles the ``update`` and ``draw`` calls of the next few frames.
+        
+        This is what ``PROFILE_KEY`` does, and it can be called from the game as well,
+        for example when a wave gets crowded.  When the last frame is profiled, the
+        statistics are written to ``path.prof`` and the top 20 functions by cumulative
+        time to ``path.txt``.  See :class:`GCapture` for more information.
+        
+        :param frames: the number of frames to profile (default ``captureframes``)
+        :type frames:  ``int`` > 0
+        
+        :param path: the name of the files to write, without the extension (optional)
+        :type path:  ``str``
+        
+        :return: the capture for these frames
+        :rtype:  :class:`GCapture`
+        """
+        from .capture import GCapture
+        assert self._capture is None, 'the game is already profiling'
+        if frames is None:
+            frames = self._captureframes
+        self._capture = GCapture(frames,path)
+        return self._capture
+    
+    def watch(self,budget=None,samples=5,path=None):
+        """
+        Samples the stack of every frame that runs over budget.
+        
+        A watchdog thread samples the stack of the game while a slow frame is still
+        running.  When the frame ends, the samples are written to the given file (or 
+        to standard error) with the frame number and the result of :meth:`snapshot`.
+        See :class:`GWatchdog` for more information.
+        
+        :param budget: the time a frame may take, in seconds (default one frame at ``fps``)
+        :type budget:  ``int`` or ``float`` > 0
+        
+        :param samples: the maximum number of stack samples per frame
+        :type samples:  ``int`` > 0
+        
+        :param path: the name of the file to append reports to (optional)
+        :type path:  ``str``
+        
+        :return: the watchdog for this game
+        :rtype:  :class:`GWatchdog`
+        """
+        from .watchdog import GWatchdog
+        assert self._watchdog is None, 'the game is already watched'
+        if budget is None:
+            budget = 1.0/self.fps
+        self._watchdog = GWatchdog(budget,samples,path=path,snapshot=self.snapshot)
+        return self._watchdog
+    
+    def trace(self,path,limit=1000000):
+        """
+        Records timing spans for every frame, to be written as Chrome trace events.
+        
+        Each frame has a span for ``_refresh``, with nested spans for clearing the
+        view, each call to ``update``, ``draw`` and the debug keys.  A game can add its
+        own spans with :meth:`GTracer.span`.  The trace file is written when the game
+        stops, and can be opened in ``chrome://tracing`` or https://ui.perfetto.dev.
+        
+        :param path: the name of the .json file to write
+        :type path:  ``str``
+        
+        :param limit: the maximum number of spans to record
+        :type limit:  ``int`` > 0
+        
+        :return: the tracer for this game
+        :rtype:  :class:`GTracer`
+        """
+        assert self._tracer is None, 'the game is already tracing'
+        self._tracer = GTracer(path,limit)
+        return self._tracer
+    
+    def track(self,path=None,limit=10):
+        """
+        Tracks the memory allocated in every frame with ``tracemalloc``.
+        
+        At the end of each frame, the heap is compared to the end of the one before,
+        and each new block is charged to the line of the game (or of this package) that
+        caused it.  When the game stops, the call sites that allocated the most are
+        written to the given file (or printed), along with the number of frames that
+        allocated nothing.  See :class:`GAllocations` for more information.
+        
+        This makes every frame much slower, so it is only for finding allocations.
+        
+        :param path: the name of the file to write the report to (optional)
+        :type path:  ``str``
+        
+        :param limit: the number of call sites in the report
+        :type limit:  ``int`` > 0
+        
+        :return: the allocation tracker for this game
+        :rtype:  :class:`GAllocations`
+        """
+        import inspect
+        from .allocs import GAllocations
+        assert self._allocs is None, 'the game is already tracking allocations'
+        game = os.path.dirname(os.path.abspath(inspect.getfile(self.__class__)))
+        package = os.path.dirname(os.path.abspath(__file__))
+        self._allocs = GAllocations([game,package],limit=limit)
+        self._allocsfile = path
+        return self._allocs
+    
+    def census(self,interval=600,path=None):
+        """
+        Counts the live graphics objects of each class every few frames.
+        
+        Every :class:`GObject` created from now on is tracked with a weak reference, so
+        the registry never keeps one alive.  Every ``interval`` frames, the registry
+        counts the live objects of each class and their approximate size, along with 
+        the objects drawn to the view and the cached textures.  Each census is appended
+        to the given file, and a summary is printed when the game stops.  In a long 
+        session, a class that keeps growing is a leak.  See :class:`GRegistry` for more 
+        information.
+        
+        :param interval: the number of frames between each census
+        :type interval:  ``int`` > 0
+        
+        :param path: the name of the .jsonl file to write (optional)
+        :type path:  ``str``
+        
+        :return: the registry for this game
+        :rtype:  :class:`GRegistry`
+        """
+        from .registry import GRegistry
+        assert self._registry is None, 'the game already has a registry'
+        self._registry = GRegistry(interval,path)
+        return self._registry
+    
+    def managegc(self,path=None):
+        """
+        Manages when the garbage collector runs, and times every collection.
+        
+        Once ``start`` returns, everything loaded so far is frozen, so that it is never
+        scanned again.  After that, the game should call :meth:`holdgc` when play
+        starts, to hold back full collections, and :meth:`releasegc` at a break, to
+        run them.  When the game stops, a summary of the collections is printed and,
+        if there is a file, every collection is written to it.  This method must be
+        called before the game is started.  See :class:`GCollector` for more information.
+        
+        :param path: the name of the .csv file to write (optional)
+        :type path:  ``str``
+        
+        :return: the collector for this game
+        :rtype:  :class:`GCollector`
+        """
+        from .collector import GCollector
+        assert self._collector is None, 'the game already manages collections'
+        self._collector = GCollector()
+        self._collectorfile = path
+        return self._collector
+    
+    def holdgc(self):
+        """
+        Holds back full garbage collections, if collections are managed.
+        
+        A game should call this when play starts.  See :meth:`managegc`.
+        """
+        if not self._collector is None:
+            self._collector.hold()
+    
+    def releasegc(self):
+        """
+        Runs any held back garbage collections, if collections are managed.
+        
+        A game should call this at a natural break in play, such as a pause or a new
+        level, when a hitch will not be seen.  See :meth:`managegc`.
+        """
+        if not self._collector is None:
+            self._collector.release()
+    
+    def snapshot(self):
+        """
+        Returns: a dictionary describing the current game state, for debug reports
+        
+        The frame-spike sampler (see :meth:`watch`) logs this dictionary with every
+        slow frame.  By default it is empty.  A game can override this method to report
+        whatever explains its frame times, such as the number of objects on screen.
+        It is called at the end of the slow frame, so it should be cheap.
+        """
+        return {}
+    
     def start(self):
         """
         Initializes the game state, creating a new game.
@@ -337,7 +798,15 @@ class GameApp(kivy.app.App):
             Clock.schedule_interval(self._refresh,1.0/self.fps)
         else:
             Clock.schedule_interval(self._refresh,0)
+        self._launch()
+    
+    def _launch(self):
+        """
+        Calls ``start`` and then freezes the objects it loaded, if collections are managed.
+        """
         self.start()
+        if not self._collector is None:
+            self._collector.freeze()
     
     def _refresh(self,dt):
         """
@@ -349,9 +818,133 @@ class GameApp(kivy.app.App):
         :param dt: time in seconds since last update
         :type dt:  ``int`` or ``float``
         """
-        self.view.clear()
-        self.update(dt)
-        self.draw()
+        watchdog = self._watchdog
+        if not watchdog is None:
+            watchdog.begin()
+        if not self._recorder is None:
+            self._recorder.capture(self.input,dt)
+        span = GTracer.span
+        with span('GameApp._refresh'):
+            clock = time.perf_counter
+            t0 = clock()
+            with span('GView.clear'):
+                self.view.clear()
+            capture = self._capture
+            if not capture is None:
+                capture.enable()
+            t1 = clock()
+            self._advance(dt)
+            t2 = clock()
+            with span(self._spans[1]):
+                self.draw()
+            t3 = clock()
+            if not capture is None:
+                capture.disable()
+                if capture.finished:
+                    self._capture = None
+            self._timings = (t1-t0,t2-t1,t3-t2)
+            if not self._metrics is None:
+                self._metrics.record(dt,t2-t0,t3-t2,self.view)
+            with span('GameApp._debug'):
+                self._debug(dt)
+        if not self._allocs is None:
+            self._allocs.record()
+        if not self._registry is None:
+            self._registry.record(self.view,len(self.TEXTURE_CACHE))
+        if not self._collector is None:
+            self._collector.tick()
+        if not watchdog is None:
+            watchdog.end()
+    
+    def _advance(self,dt):
+        """
+        Advances the game state by the time since the last animation frame.
+        
+        If ``timestep`` is None, this calls ``update`` once.  Otherwise it calls it once
+        per fixed time step in the accumulator (up to ``maxsteps``), and then updates
+        the interpolation factor ``alpha``.
+        
+        :param dt: time in seconds since last update
+        :type dt:  ``int`` or ``float``
+        """
+        step = self._timestep
+        name = self._spans[0]
+        if step is None:
+            with GTracer.span(name):
+                self.update(dt)
+            return
+        
+        self._accumulator += dt
+        count = 0
+        while self._accumulator >= step and count < self._maxsteps:
+            with GTracer.span(name):
+                self.update(step)
+            self._accumulator -= step
+            count += 1
+        if self._accumulator >= step:
+            # Too far behind; drop the backlog rather than spiral
+            self._accumulator %= step
+        self._alpha = self._accumulator/step
+    
+    def _debug(self,dt):
+        """
+        Handles the debug keys and draws the frame-time overlay for the frame just processed.
+        
+        This method runs after the frame timers stop, so the overlay does not count
+        its own work.
+        
+        :param dt: time in seconds since last update
+        :type dt:  ``int`` or ``float``
+        """
+        pressed = self.input.is_key_down(self.OVERLAY_KEY)
+        if pressed and not self._toggled:
+            self._overlay = not self._overlay
+        self._toggled = pressed
+        
+        pressed = self.input.is_key_down(self.METRICS_KEY)
+        if pressed and not self._dumping and not self._metricsfile is None:
+            self._metrics.dump(self._metricsfile)
+        self._dumping = pressed
+        
+        pressed = self.input.is_key_down(self.PROFILE_KEY)
+        if pressed and not self._capturing and self._capture is None:
+            self.capture()
+        self._capturing = pressed
+        
+        if not self._overlay:
+            return
+        if self._graph is None:
+            from .overlay import GOverlay
+            self._graph = GOverlay(0,self.height,1.0/self.fps)
+        (clear, update, draw) = self._timings
+        self._graph.record(dt,clear+update,draw)
+        self._graph.draw(self.view,lambda : self.view.instruction_count)
+    
+    def _finish(self):
+        """
+        Writes the metrics, allocation and collection reports, if there are any.
+        
+        This method is called when the game stops.
+        """
+        if not self._registry is None:
+            self._registry.close()
+            print(self._registry.report())
+        if not self._collector is None:
+            self._collector.close()
+            if not self._collectorfile is None:
+                self._collector.dump(self._collectorfile)
+            print(self._collector.report())
+        if not self._allocs is None:
+            self._allocs.close()
+            if self._allocsfile is None:
+                print(self._allocs.report())
+            else:
+                self._allocs.dump(self._allocsfile)
+        if self._metrics is None:
+            return
+        if not self._metricsfile is None:
+            self._metrics.dump(self._metricsfile)
+        print(self._metrics.summary())
     
     def _setpaths(self):
         """
@@ -369,6 +962,9 @@ class GameApp(kivy.app.App):
         GameApp.sounds = str(os.path.join(path, 'Sounds'))
         GameApp.images = str(os.path.join(path, 'Images'))
         
+        if HEADLESS:
+            return
+        
         import kivy.resources
         kivy.resources.resource_add_path(GameApp.fonts)
         kivy.resources.resource_add_path(GameApp.sounds)
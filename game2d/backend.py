@@ -0,0 +1,21 @@
+"""
+The rendering backend for 2D game support.
+
+By default, this package draws with Kivy.  If the environment variable
+``GAME2D_BACKEND`` is set to ``null`` before the package is imported, it uses the
+null backend in :mod:`game2d.null` instead.  The null backend keeps the geometry and
+properties of every :class:`GObject`, but it never imports Kivy, never loads a texture
+and never opens a window.  This allows a game to be stepped in a plain Python process,
+which is useful for testing and batch simulation.
+
+The backend cannot be changed once the package is imported.
+"""
+import os
+
+#: The name of the active backend: either ``'kivy'`` or ``'null'``
+BACKEND = os.environ.get('GAME2D_BACKEND','kivy')
+
+assert BACKEND in ('kivy','null'), 'GAME2D_BACKEND %s is not a valid backend' % repr(BACKEND)
+
+#: Whether the null backend is active
+HEADLESS = BACKEND == 'null'
@@ -0,0 +1,300 @@
+"""
+Micro-benchmarks for 2D game support.
+
+This module times the operations that a game performs thousands of times a second:
+creating each kind of :class:`GObject`, setting the attributes that move and color
+them, testing whether they contain a point (rotated or not), switching the frame of a
+:class:`GSprite`, and drawing many objects to a :class:`GView`.
+
+Each run is appended as one line of JSON to a results file, tagged with the commit it
+was run on and the backend it drew with.  Two runs on the same backend can then be
+compared, and any benchmark that slowed down by more than the noise in its
+measurements is flagged as a regression.  Runs on different backends are never
+compared, as the null backend leaves out the cost of Kivy instructions and textures.
+The script ``bench.py`` in the game folder is the command line interface to this module.
+"""
+import json
+import time
+import platform
+import subprocess
+
+
+# The number of images in the filmstrip used by the sprite benchmarks
+SPRITE_FORMAT = (3,2)
+
+# The number of objects drawn by the view benchmarks
+VIEW_OBJECTS = 200
+
+
+def _benchmarks(image,strip):
+    """
+    Returns: a list of (name, function, operations) for every benchmark
+
+    Each function performs the given number of operations per call, so that cheap
+    operations can be varied without a loop in the timing.
+
+    :param image: the name of an image file in the images folder
+    :type image:  ``str``
+
+    :param strip: the name of a filmstrip with ``SPRITE_FORMAT`` frames
+    :type strip:  ``str``
+    """
+    from .grectangle import GRectangle, GImage, GLabel
+    from .gsprite import GSprite
+    from .gpath import GPath, GPolygon
+    from .gview import GView
+
+    square = [0,0,10,0,10,10,0,10]
+    makers = [
+        ('GRectangle', lambda : GRectangle(x=10,y=10,width=20,height=20,fillcolor=(1,0,0,1))),
+        ('GImage',     lambda : GImage(x=10,y=10,width=20,height=20,source=image)),
+        ('GSprite',    lambda : GSprite(x=10,y=10,width=20,height=20,source=strip,format=SPRITE_FORMAT)),
+        ('GLabel',     lambda : GLabel(text='SCORE 1000',font_size=20,x=10,y=10)),
+        ('GPath',      lambda : GPath(points=[0,0,10,10,20,0],linewidth=2,linecolor=(1,1,1,1))),
+        ('GPolygon',   lambda : GPolygon(points=square,fillcolor=(0,1,0,1))),
+    ]
+    result = [('construct.'+name,maker,1) for (name, maker) in makers]
+
+    rect = GRectangle(x=10,y=10,width=20,height=20,fillcolor=(1,0,0,1))
+    def set_x():
+        rect.x = 1.0
+        rect.x = 2.0
+    def set_y():
+        rect.y = 1.0
+        rect.y = 2.0
+    def set_angle():
+        rect.angle = 15.0
+        rect.angle = 30.0
+    def set_fillcolor():
+        rect.fillcolor = (1,0,0,1)
+        rect.fillcolor = (0,0,1,1)
+    result += [('setter.x',set_x,2),('setter.y',set_y,2),
+               ('setter.angle',set_angle,2),('setter.fillcolor',set_fillcolor,2)]
+
+    flat = GRectangle(x=10,y=10,width=20,height=20)
+    turned = GRectangle(x=10,y=10,width=20,height=20,angle=30)
+    result += [('contains.unrotated',lambda : flat.contains((12,12)),1),
+               ('contains.rotated',lambda : turned.contains((12,12)),1)]
+
+    sprite = GSprite(x=10,y=10,width=20,height=20,source=strip,format=SPRITE_FORMAT)
+    count = SPRITE_FORMAT[0]*SPRITE_FORMAT[1]
+    def switch():
+        for frame in range(count):
+            sprite.frame = frame
+    result.append(('sprite.frame',switch,count))
+
+    view = GView()
+    shapes = [GRectangle(x=pos,y=pos,width=10,height=10,fillcolor=(1,1,1,1))
+              for pos in range(VIEW_OBJECTS)]
+    def frame():
+        view.clear()
+        for shape in shapes:
+            shape.draw(view)
+    def redraw():
+        for shape in shapes:
+            shape.draw(view)
+    result += [('view.frame%d' % VIEW_OBJECTS,frame,1),
+               ('view.redraw%d' % VIEW_OBJECTS,redraw,VIEW_OBJECTS)]
+    return result
+
+
+def _time(function,operations,repeat,minimum):
+    """
+    Returns: the (median, min, spread) time of one operation, in seconds
+
+    The function is called enough times in a row that each sample takes at least
+    ``minimum`` seconds, and ``repeat`` samples are taken.  The spread is the
+    interquartile range divided by the median, which measures the noise.
+
+    :param function: the benchmark function
+    :type function:  function with no arguments
+
+    :param operations: the number of operations per call
+    :type operations:  ``int`` > 0
+
+    :param repeat: the number of samples
+    :type repeat:  ``int`` >= 3
+
+    :param minimum: the shortest time of one sample, in seconds
+    :type minimum:  ``float`` > 0
+    """
+    clock = time.perf_counter
+    calls = 1
+    while True:
+        start = clock()
+        for _ in range(calls):
+            function()
+        if clock()-start >= minimum:
+            break
+        calls *= 2
+
+    samples = []
+    for _ in range(repeat):
+        start = clock()
+        for _ in range(calls):
+            function()
+        samples.append((clock()-start)/(calls*operations))
+    samples.sort()
+    median = samples[len(samples)//2]
+    spread = (samples[(3*len(samples))//4]-samples[len(samples)//4])/median
+    return (median,samples[0],spread)
+
+
+def commit():
+    """
+    Returns: the short hash of the current git commit, with '+' if there are changes
+
+    If this is not a git repository, the result is ``'unknown'``.
+    """
+    try:
+        head = subprocess.check_output(['git','rev-parse','--short','HEAD'],
+                                       stderr=subprocess.DEVNULL).decode().strip()
+        status = subprocess.check_output(['git','status','--porcelain','--untracked-files=no'],
+                                         stderr=subprocess.DEVNULL).decode().strip()
+        return head+('+' if status else '')
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def run(image,strip,only=None,repeat=7,minimum=0.05):
+    """
+    Returns: a dictionary with the results of every benchmark, and the machine they ran on
+
+    The key ``'results'`` maps each benchmark name to a dictionary with the median and
+    minimum time of one operation, in seconds, and the spread of the samples.
+
+    :param image: the name of an image file in the images folder
+    :type image:  ``str``
+
+    :param strip: the name of a filmstrip with ``SPRITE_FORMAT`` frames
+    :type strip:  ``str``
+
+    :param only: a string that the names of the benchmarks to run must contain (optional)
+    :type only:  ``str``
+
+    :param repeat: the number of samples of each benchmark
+    :type repeat:  ``int`` >= 3
+
+    :param minimum: the shortest time of one sample, in seconds
+    :type minimum:  ``float`` > 0
+    """
+    assert type(repeat) == int and repeat >= 3, 'repeat %s is not an int >= 3' % repr(repeat)
+    from .backend import BACKEND
+    results = {}
+    for (name, function, operations) in _benchmarks(image,strip):
+        if only is None or only in name:
+            (median, best, spread) = _time(function,operations,repeat,minimum)
+            results[name] = {'median':median,'min':best,'spread':spread}
+    return {'commit':commit(),'time':time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python':platform.python_version(),'machine':platform.machine(),
+            'backend':BACKEND,'results':results}
+
+
+def save(path,record):
+    """
+    Appends the results of a run to a JSON Lines file.
+
+    :param path: the name of the results file
+    :type path:  ``str``
+
+    :param record: the results of a run
+    :type record:  ``dict``
+    """
+    with open(path,'a') as file:
+        file.write(json.dumps(record,sort_keys=True)+'\n')
+
+
+def load(path,name=None,backend=None):
+    """
+    Returns: the latest run in the results file for the given commit, or None
+
+    If name is None, this is the latest run of all.  Otherwise it is the latest run
+    whose commit starts with name.  If backend is not None, only the runs on that
+    backend are considered.
+
+    :param path: the name of the results file
+    :type path:  ``str``
+
+    :param name: the (start of the) commit hash (optional)
+    :type name:  ``str``
+
+    :param backend: the name of the backend, ``'kivy'`` or ``'null'`` (optional)
+    :type backend:  ``str``
+    """
+    found = None
+    with open(path) as file:
+        for line in file:
+            if line.strip():
+                record = json.loads(line)
+                if backend is not None and record['backend'] != backend:
+                    continue
+                if name is None or record['commit'].startswith(name):
+                    found = record
+    return found
+
+
+def runs(path,backend=None):
+    """
+    Returns: the commits in the results file, oldest first, each listed once
+
+    If backend is not None, only the commits with a run on that backend are listed.
+
+    :param path: the name of the results file
+    :type path:  ``str``
+
+    :param backend: the name of the backend, ``'kivy'`` or ``'null'`` (optional)
+    :type backend:  ``str``
+    """
+    result = []
+    with open(path) as file:
+        for line in file:
+            if line.strip():
+                record = json.loads(line)
+                if backend is not None and record['backend'] != backend:
+                    continue
+                name = record['commit']
+                if name in result:
+                    result.remove(name)
+                result.append(name)
+    return result
+
+
+def compare(base,head,threshold=0.10):
+    """
+    Returns: a (report, regressions) pair comparing two runs
+
+    A benchmark is a regression if its median time grew by more than the threshold,
+    or by more than twice the larger spread of the two runs if that is bigger.  So a
+    noisy benchmark must slow down further before it is flagged.  The two runs must
+    have been on the same backend.
+
+    :param base: the results of the earlier run
+    :type base:  ``dict``
+
+    :param head: the results of the later run
+    :type head:  ``dict``
+
+    :param threshold: the smallest relative slowdown that counts as a regression
+    :type threshold:  ``float`` >= 0
+    """
+    assert base['backend'] == head['backend'], 'runs on the %s and %s backends cannot be compared' % (
+        base['backend'],head['backend'])
+    lines = ['%-24s %12s %12s %8s  (%s)' % ('benchmark',base['commit'],head['commit'],'change',
+                                            head['backend'])]
+    regressions = []
+    for name in sorted(head['results']):
+        if not name in base['results']:
+            continue
+        before = base['results'][name]
+        after  = head['results'][name]
+        change = after['median']/before['median']-1
+        noise  = max(threshold,2*max(before['spread'],after['spread']))
+        mark = ''
+        if change > noise:
+            mark = '  REGRESSION (noise %.0f%%)' % (noise*100)
+            regressions.append(name)
+        elif change < -noise:
+            mark = '  faster'
+        lines.append('%-24s %10.3f us %10.3f us %+7.1f%%%s' %
+                     (name,before['median']*1e6,after['median']*1e6,change*100,mark))
+    return ('\n'.join(lines),regressions)
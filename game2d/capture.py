@@ -0,0 +1,115 @@
+"""
+A profiler capture of a few animation frames for 2D game support.
+
+Profiling a whole session hides the moment that matters in the frames around it.  The
+class in this module runs ``cProfile`` around the ``update`` and ``draw`` calls of a
+fixed number of frames only, and then writes the results to disk.  :class:`GameApp`
+starts a capture when its ``PROFILE_KEY`` is pressed, so that a slow moment can be
+caught while it is happening, without restarting the game.
+"""
+import cProfile
+import pstats
+import time
+
+
+class GCapture(object):
+    """
+    A class to profile the next few animation frames.
+
+    A capture profiles the code between each call to :meth:`enable` and :meth:`disable`
+    (one frame each).  Once it has seen ``frames`` frames, it writes two files: the raw
+    statistics in ``path.prof``, which can be opened with ``pstats`` or a viewer such as
+    snakeviz, and the top ``LIMIT`` functions by cumulative time in ``path.txt``.
+    """
+
+    # The number of functions in the text summary
+    LIMIT = 20
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def frames(self):
+        """
+        The number of frames to profile.
+
+        **Invariant**: Must be an int > 0.
+        """
+        return self._frames
+
+    @property
+    def remaining(self):
+        """
+        The number of frames left to profile.
+
+        **Invariant**: Must be an int in 0..frames.
+        """
+        return self._remaining
+
+    @property
+    def path(self):
+        """
+        The name of the files to write, without the extension.
+
+        **Invariant**: Must be a string.
+        """
+        return self._path
+
+    @property
+    def finished(self):
+        """
+        Whether the capture has profiled every frame and written its files.
+
+        **Invariant**: Must be a bool.
+        """
+        return self._remaining == 0
+
+    # BUILT-IN METHODS
+    def __init__(self,frames=120,path=None):
+        """
+        Creates a new capture of the given number of frames.
+
+        If path is None, the files are named after the time the capture was created,
+        as in ``profile-20170801-120000``.
+
+        :param frames: the number of frames to profile
+        :type frames:  ``int`` > 0
+
+        :param path: the name of the files to write, without the extension (optional)
+        :type path:  ``str``
+        """
+        assert type(frames) == int and frames > 0, 'frames %s is not a positive int' % repr(frames)
+        assert path is None or type(path) == str, 'path %s is not a string' % repr(path)
+        if path is None:
+            path = time.strftime('profile-%Y%m%d-%H%M%S')
+        self._frames = frames
+        self._remaining = frames
+        self._path = path
+        self._profile = cProfile.Profile()
+
+    # PUBLIC METHODS
+    def enable(self):
+        """
+        Starts profiling a frame.
+        """
+        assert not self.finished, 'the capture is finished'
+        self._profile.enable()
+
+    def disable(self):
+        """
+        Stops profiling a frame, writing the files if it was the last one.
+        """
+        self._profile.disable()
+        self._remaining -= 1
+        if self._remaining == 0:
+            self._write()
+
+    # HIDDEN METHODS
+    def _write(self):
+        """
+        Writes the statistics and the summary of the capture.
+        """
+        self._profile.dump_stats(self._path+'.prof')
+        with open(self._path+'.txt','w') as file:
+            file.write('%d frames profiled\n' % self._frames)
+            stats = pstats.Stats(self._profile,stream=file)
+            stats.sort_stats('cumulative').print_stats(self.LIMIT)
+        print('Profile of %d frames written to %s.prof' % (self._frames,self._path))
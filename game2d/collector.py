@@ -0,0 +1,235 @@
+"""
+Garbage collection policy and instrumentation for 2D game support.
+
+Steady play allocates short-lived graphics instructions and game objects, and a full
+cyclic collection can then fire in the middle of the action and cause a visible hitch.
+The class in this module lets :class:`GameApp` decide when the expensive collections
+happen.  It freezes everything loaded at startup, so no collection ever scans it again,
+holds back full collections while the game is being played, and runs them at natural
+breaks instead.  It also times every collection, so the policy can be checked.
+"""
+import gc
+import time
+import numpy as np
+
+
+class GCollector(object):
+    """
+    A class to control and time the garbage collector.
+
+    The policy has three parts:
+
+    * :meth:`freeze` collects once and then moves every object to the permanent
+      generation (Python 3.7 and later), after the game has loaded its assets.
+    * :meth:`hold` raises the threshold of the oldest generation, so that only young
+      collections run while the game is being played.
+    * :meth:`release` restores the threshold and runs a full collection, when there is
+      a break in the game.
+
+    Every collection, whatever its cause, is timed with ``gc.callbacks`` and recorded
+    with the number of the frame it fell in (see :meth:`tick`) and whether it happened
+    while collections were held.  Young collections run many times a second, so the
+    records are kept in a ring buffer of fixed size, like :class:`GMetrics`.  The
+    count, total and longest time of each generation, and the five longest
+    collections, are kept as running totals over the whole session.
+    """
+
+    # The threshold of the oldest generation while collections are held
+    HELD_THRESHOLD = 1000000
+
+    # The number of longest collections kept for the report
+    LONGEST = 5
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def capacity(self):
+        """
+        The maximum number of collections kept.
+
+        **Invariant**: Must be an int > 0.
+        """
+        return self._capacity
+
+    @property
+    def collections(self):
+        """
+        The total number of collections timed, including any that have been replaced.
+
+        **Invariant**: Must be an int >= 0.
+        """
+        return self._collections
+
+    @property
+    def pauses(self):
+        """
+        The collections kept, oldest first, as (frame, generation, seconds, collected, held) tuples.
+
+        This is a copy.  Once ``capacity`` collections are timed, each new collection
+        replaces the oldest one.
+
+        **Invariant**: Must be a list of tuples.
+        """
+        return [(int(frame),int(generation),seconds,int(collected),bool(held))
+                for (frame, generation, seconds, collected, held) in self._ordered().tolist()]
+
+    @property
+    def held(self):
+        """
+        Whether full collections are being held back.
+
+        **Invariant**: Must be a bool.
+        """
+        return self._held
+
+    @property
+    def frame(self):
+        """
+        The number of the current frame, counting from 0.
+
+        **Invariant**: Must be an int >= 0.
+        """
+        return self._frame
+
+    # BUILT-IN METHODS
+    def __init__(self,capacity=4096):
+        """
+        Creates a new collector and starts timing collections.
+
+        :param capacity: the maximum number of collections to keep
+        :type capacity:  ``int`` > 0
+        """
+        assert type(capacity) == int and capacity > 0, 'capacity %s is not a positive int' % repr(capacity)
+        self._capacity = capacity
+        # The buffer is allocated up front, so that recording does not allocate
+        self._data = np.zeros((capacity,5))
+        self._collections = 0
+        # Per generation: count, total seconds, max seconds and count while held
+        self._counts = [0,0,0]
+        self._totals = [0.0,0.0,0.0]
+        self._maxima = [0.0,0.0,0.0]
+        self._helds  = [0,0,0]
+        self._longest = []
+        self._held = False
+        self._frame = 0
+        self._begin = None
+        self._thresholds = gc.get_threshold()
+        gc.callbacks.append(self._callback)
+
+    # PUBLIC METHODS
+    def tick(self):
+        """
+        Advances the frame number that collections are recorded with.
+        """
+        self._frame += 1
+
+    def freeze(self):
+        """
+        Collects once and then moves all objects to the permanent generation.
+
+        Objects in the permanent generation are never scanned again, so the assets
+        loaded at startup no longer slow down full collections.  Before Python 3.7
+        there is no permanent generation, and this only collects.
+        """
+        gc.collect()
+        if hasattr(gc,'freeze'):
+            gc.freeze()
+
+    def hold(self):
+        """
+        Holds back full collections until the next call to :meth:`release`.
+
+        Young collections still run, so short-lived cycles are still reclaimed.
+        """
+        if self._held:
+            return
+        self._held = True
+        (first, second, third) = self._thresholds
+        gc.set_threshold(first,second,self.HELD_THRESHOLD)
+
+    def release(self):
+        """
+        Restores the normal thresholds and runs a full collection.
+        """
+        self._held = False
+        gc.set_threshold(*self._thresholds)
+        gc.collect()
+
+    def close(self):
+        """
+        Stops timing collections and restores the normal thresholds.
+        """
+        if self._callback in gc.callbacks:
+            gc.callbacks.remove(self._callback)
+        self._held = False
+        gc.set_threshold(*self._thresholds)
+
+    def report(self):
+        """
+        Returns: a multiline summary of the collections, by generation
+
+        The summary also lists the longest collections with their frames.
+        """
+        lines = ['garbage collections over %d frames' % self._frame]
+        for generation in range(3):
+            if self._counts[generation]:
+                lines.append('  gen %d: %5d, %8.3f ms total, %7.3f ms max, %d while held' %
+                             (generation,self._counts[generation],self._totals[generation]*1000,
+                              self._maxima[generation]*1000,self._helds[generation]))
+        for (seconds, frame, generation, collected, held) in self._longest:
+            lines.append('  frame %6d: gen %d took %.3f ms, %d collected%s' %
+                         (frame,generation,seconds*1000,collected,' (held)' if held else ''))
+        return '\n'.join(lines)
+
+    def dump(self,path):
+        """
+        Writes the collections kept to a CSV file, oldest first.
+
+        :param path: the name of the file to write
+        :type path:  ``str``
+        """
+        with open(path,'w') as file:
+            file.write('frame,generation,seconds,collected,held\n')
+            for (frame, generation, seconds, collected, held) in self.pauses:
+                file.write('%d,%d,%.9f,%d,%d\n' % (frame,generation,seconds,collected,held))
+
+    # HIDDEN METHODS
+    def _callback(self,phase,info):
+        """
+        Times a collection, as a callback in ``gc.callbacks``.
+
+        :param phase: either ``'start'`` or ``'stop'``
+        :type phase:  ``str``
+
+        :param info: the generation and, at the stop, the objects collected
+        :type info:  ``dict``
+        """
+        if phase == 'start':
+            self._begin = time.perf_counter()
+        elif not self._begin is None:
+            elapsed = time.perf_counter()-self._begin
+            self._begin = None
+            generation = info['generation']
+            collected = info.get('collected',0)
+            self._data[self._collections % self._capacity] = (self._frame,generation,elapsed,
+                                                             collected,self._held)
+            self._collections += 1
+            self._counts[generation] += 1
+            self._totals[generation] += elapsed
+            if elapsed > self._maxima[generation]:
+                self._maxima[generation] = elapsed
+            if self._held:
+                self._helds[generation] += 1
+            longest = self._longest
+            if len(longest) < self.LONGEST or elapsed > longest[-1][0]:
+                longest.append((elapsed,self._frame,generation,collected,self._held))
+                longest.sort(reverse=True)
+                del longest[self.LONGEST:]
+
+    def _ordered(self):
+        """
+        Returns: the rows of the collections kept, oldest first
+        """
+        if self._collections <= self._capacity:
+            return self._data[:self._collections]
+        start = self._collections % self._capacity
+        return np.concatenate((self._data[start:],self._data[:start]))
@@ -8,9 +8,15 @@ These classes will not work unless you adhere to proper subclassing practices.
 Author: Walker M. White (wmw2)
 Date:   August 1, 2017 (Python 3 version)
 """
-from kivy.graphics import *
-from kivy.graphics.instructions import *
+from .backend import HEADLESS
+if HEADLESS:
+    from .null import *
+else:
+    from kivy.graphics import *
+    from kivy.graphics.instructions import *
+import numpy as np
 from introcs.geom import Point2, Matrix
+from .registry import GRegistry
 
 def is_color(c):
     """
@@ -320,10 +326,10 @@ class GObject(object):
         if self._rotate.angle == 0.0:
             return self.x-self.width/2.0
 
-        p0 = self.matrix._transform(self.x-self.width/2.0, self.y-self.height/2.0)[0]
-        p1 = self.matrix._transform(self.x+self.width/2.0, self.y-self.height/2.0)[0]
-        p2 = self.matrix._transform(self.x+self.width/2.0, self.y+self.height/2.0)[0]
-        p3 = self.matrix._transform(self.x-self.width/2.0, self.y+self.height/2.0)[0]
+        p0 = tuple(self.matrix._transform(self.x-self.width/2.0, self.y-self.height/2.0))[0]
+        p1 = tuple(self.matrix._transform(self.x+self.width/2.0, self.y-self.height/2.0))[0]
+        p2 = tuple(self.matrix._transform(self.x+self.width/2.0, self.y+self.height/2.0))[0]
+        p3 = tuple(self.matrix._transform(self.x-self.width/2.0, self.y+self.height/2.0))[0]
         return min(p0,p1,p2,p3)
 
     @left.setter
@@ -350,10 +356,10 @@ class GObject(object):
         if self._rotate.angle == 0.0:
             return self.x+self.width/2.0
 
-        p0 = self.matrix._transform(self.x-self.width/2.0, self.y-self.height/2.0)[0]
-        p1 = self.matrix._transform(self.x+self.width/2.0, self.y-self.height/2.0)[0]
-        p2 = self.matrix._transform(self.x+self.width/2.0, self.y+self.height/2.0)[0]
-        p3 = self.matrix._transform(self.x-self.width/2.0, self.y+self.height/2.0)[0]
+        p0 = tuple(self.matrix._transform(self.x-self.width/2.0, self.y-self.height/2.0))[0]
+        p1 = tuple(self.matrix._transform(self.x+self.width/2.0, self.y-self.height/2.0))[0]
+        p2 = tuple(self.matrix._transform(self.x+self.width/2.0, self.y+self.height/2.0))[0]
+        p3 = tuple(self.matrix._transform(self.x-self.width/2.0, self.y+self.height/2.0))[0]
         return max(p0,p1,p2,p3)
 
     @right.setter
@@ -380,10 +386,10 @@ class GObject(object):
         if self._rotate.angle == 0.0:
             return self.y+self.height/2.0
 
-        p0 = self.matrix._transform(self.x-self.width/2.0, self.y-self.height/2.0)[1]
-        p1 = self.matrix._transform(self.x+self.width/2.0, self.y-self.height/2.0)[1]
-        p2 = self.matrix._transform(self.x+self.width/2.0, self.y+self.height/2.0)[1]
-        p3 = self.matrix._transform(self.x-self.width/2.0, self.y+self.height/2.0)[1]
+        p0 = tuple(self.matrix._transform(self.x-self.width/2.0, self.y-self.height/2.0))[1]
+        p1 = tuple(self.matrix._transform(self.x+self.width/2.0, self.y-self.height/2.0))[1]
+        p2 = tuple(self.matrix._transform(self.x+self.width/2.0, self.y+self.height/2.0))[1]
+        p3 = tuple(self.matrix._transform(self.x-self.width/2.0, self.y+self.height/2.0))[1]
         return max(p0,p1,p2,p3)
 
     @top.setter
@@ -411,10 +417,10 @@ class GObject(object):
         if self._rotate.angle == 0.0:
             return self.y-self.height/2.0
 
-        p0 = self.matrix._transform(self.x-self.width/2.0, self.y-self.height/2.0)[1]
-        p1 = self.matrix._transform(self.x+self.width/2.0, self.y-self.height/2.0)[1]
-        p2 = self.matrix._transform(self.x+self.width/2.0, self.y+self.height/2.0)[1]
-        p3 = self.matrix._transform(self.x-self.width/2.0, self.y+self.height/2.0)[1]
+        p0 = tuple(self.matrix._transform(self.x-self.width/2.0, self.y-self.height/2.0))[1]
+        p1 = tuple(self.matrix._transform(self.x+self.width/2.0, self.y-self.height/2.0))[1]
+        p2 = tuple(self.matrix._transform(self.x+self.width/2.0, self.y+self.height/2.0))[1]
+        p3 = tuple(self.matrix._transform(self.x-self.width/2.0, self.y+self.height/2.0))[1]
         return min(p0,p1,p2,p3)
 
 
@@ -478,6 +484,7 @@ class GObject(object):
         """
         # Set the properties.
         self._defined = False
+        GRegistry.add(self)
 
         # Create the Kivy transforms for position and size
         self._trans  = Translate(0,0,0)
@@ -559,7 +566,7 @@ class GObject(object):
         if self._rotate.angle == 0.0:
             return abs(point[0]-self.x) < self.width/2.0 and abs(point[1]-self.y) < self.height/2.0
 
-        p = self.matrix.inverse()._transform(point[0],point[1])
+        p = tuple(self.matrix.inverse()._transform(point[0],point[1]))
         return abs(p[0]) < self.width/2.0 and abs(p[1]) < self.height/2.0
 
     def transform(self,point):
@@ -581,7 +588,7 @@ class GObject(object):
             return self.inverse.transform(point)
         else:
             assert is_num_tuple(point,2), "%s is not a valid point" % repr(point)
-            p = self.inverse._transform(point[0],point[2])
+            p = tuple(self.inverse._transform(point[0],point[1]))
             return Point2(p[0],p[1])
 
     def draw(self, view):
@@ -753,6 +760,20 @@ class GScene(GObject):
 
         return None
 
+    def remove(self,child):
+        """
+        Removes a child from this scene.
+
+        This is faster than assigning a new list to ``children``, as the drawing cache
+        of the other children is left as is.
+
+        :param child: the child to remove
+        :type child:  :class:`GObject` in ``children``
+        """
+        self._children.remove(child)
+        if self._defined:
+            self._cache.remove(child._cache)
+
 
     # HIDDEN METHODS
     def _reset(self):
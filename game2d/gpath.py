@@ -8,8 +8,12 @@ Author: Walker M. White (wmw2)
 Date:   August 1, 2017 (Python 3 version)
 """
 # Lower-level kivy modules to support animation
-from kivy.graphics import *
-from kivy.graphics.instructions import *
+from .backend import HEADLESS
+if HEADLESS:
+    from .null import *
+else:
+    from kivy.graphics import *
+    from kivy.graphics.instructions import *
 from .gobject import GObject
 
 
@@ -532,7 +536,7 @@ class GPolygon(GPath):
         assert is_point_tuple(point,1), "%s is not a valid point" % repr(point)
         
         found = False
-        for i in xrange(4,len(self._points),2):
+        for i in range(4,len(self._points),2):
             t = (0,0)+self.points[i-4:i]
             found = found or in_triangle(point,t)
         
@@ -544,7 +548,7 @@ class GPolygon(GPath):
         """
         Creates the mesh for this polygon
         """
-        size = len(self.points)/2
+        size = len(self.points)//2
         try:
             texture = Image(source=self.source).texture
             texture.wrap = 'repeat'
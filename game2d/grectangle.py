@@ -8,10 +8,15 @@ to draw shapes.
 Author: Walker M. White (wmw2)
 Date:   August 1, 2017 (Python 3 version)
 """
-from kivy.graphics import *
-from kivy.graphics.instructions import *
-from kivy.uix.label import Label
-from kivy.uix.image import Image
+from .backend import HEADLESS
+if HEADLESS:
+    from .null import *
+    from .null import Label
+else:
+    from kivy.graphics import *
+    from kivy.graphics.instructions import *
+    from kivy.uix.label import Label
+    from kivy.uix.image import Image
 from .gobject import GObject
 from .app import GameApp
 
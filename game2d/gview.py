@@ -9,10 +9,15 @@ Author: Walker M. White (wmw2)
 Date:   August 1, 2017 (Python 3 version)
 """
 # Basic Kivy Modules
-from kivy.graphics import *
-from kivy.graphics.instructions import *
-from kivy.uix.floatlayout import FloatLayout
-from kivy.metrics import dp
+from .backend import HEADLESS
+if HEADLESS:
+    from .null import *
+    from .null import FloatLayout, dp
+else:
+    from kivy.graphics import *
+    from kivy.graphics.instructions import *
+    from kivy.uix.floatlayout import FloatLayout
+    from kivy.metrics import dp
 
 from introcs.geom import Point2
 
@@ -228,7 +233,7 @@ class GInput(object):
         """
         Enables keyboard events for this input handler
         """
-        if self._view is None:
+        if self._view is None or HEADLESS:
             return
         from kivy.core.window import Window
         self._keyboard = Window.request_keyboard(self._disable_keyboard, self._view, 'text')
@@ -239,7 +244,7 @@ class GInput(object):
         """
         Disables keyboard events for this input handler
         """
-        if self._view is None:
+        if self._view is None or HEADLESS:
             return
         self._keyboard.unbind(on_key_down=self._capture_key)
         self._keyboard.unbind(on_key_up=self._release_key)
@@ -310,6 +315,238 @@ class GInput(object):
         self._touch = None
 
 
+class GScriptedInput(GInput):
+    """
+    A class representing an input handler that plays back a timeline of key events
+
+    A scripted input handler ignores the keyboard.  Instead, it has a timeline of key
+    presses and releases, each scheduled for a specific animation frame.  The method
+    :meth:`advance` applies the events for the next frame.  It should be called once at
+    the start of every frame, before the game is updated.
+
+    The events are applied to the same key dictionary as :class:`GInput`.  Hence the
+    methods :meth:`is_key_down`, :attr:`keys` and :attr:`key_count` are inherited
+    unchanged, and cost no more than they do for the keyboard.
+
+    Frames are numbered from 0.  The first call to :meth:`advance` applies the events
+    for frame 0.
+
+    A timeline may also repeat forever, with a ``period``.  Then the events for frame
+    ``n`` are those scheduled for frame ``n % period``, and keys held at the end of one
+    cycle stay held into the next unless the timeline releases them.
+    """
+
+    # IMMUTABLE ATTRIBUTES
+    @property
+    def frame(self):
+        """
+        The number of frames advanced so far.
+
+        **Immutable**: This value cannot be altered.
+
+        **Invariant**: Must be an int >= 0.
+        """
+        return self._frame
+
+    @property
+    def dt(self):
+        """
+        The time step scripted for the current frame, or None if there is none.
+
+        A plain timeline only scripts keys, so this is always None.  Subclasses that
+        also script the time step override it.
+
+        **Immutable**: This value cannot be altered.
+        """
+        return None
+
+    @property
+    def period(self):
+        """
+        The number of frames after which the timeline repeats, or None if it does not.
+
+        **Immutable**: This value cannot be altered.
+
+        **Invariant**: Must be None or an int > 0.
+        """
+        return self._period
+
+    @property
+    def finished(self):
+        """
+        Whether every event in the timeline has been applied.
+
+        A repeating timeline is never finished.
+
+        **Immutable**: This value cannot be altered.
+
+        **Invariant**: Must be a bool
+        """
+        return self._period is None and self._next >= len(self._events)
+
+
+    # BUILT-IN METHODS
+    def __init__(self,events=(),period=None):
+        """
+        Creates a new scripted input handler
+
+        Each event is a triple ``(frame, key, down)``, where ``frame`` is the frame to
+        apply it on, ``key`` is the name of the key, and ``down`` is True for a press
+        and False for a release.  The events do not need to be sorted.
+
+        :param events: the initial timeline of events
+        :type events:  iterable of (``int``, ``str``, ``bool``)
+
+        :param period: the number of frames after which the timeline repeats (optional)
+        :type period:  ``int`` > 0
+        """
+        assert period is None or (type(period) == int and period > 0), 'period %s is not a positive int' % repr(period)
+        GInput.__init__(self)
+        self._period = period
+        self._events = []
+        self._sorted = True
+        self._frame  = 0
+        self._next   = 0
+        for (frame, key, down) in events:
+            self.schedule(frame,key,down)
+
+
+    # PUBLIC METHODS
+    def schedule(self,frame,key,down):
+        """
+        Adds a key event to the timeline.
+
+        Events scheduled for a frame that has already been advanced past are never
+        applied, unless the timeline repeats.  Then they are applied from the next
+        cycle on.  Events for the same frame are applied in the order scheduled.
+
+        :param frame: the frame to apply the event on
+        :type frame:  ``int`` >= 0
+
+        :param key: the name of the key
+        :type key:  ``str``
+
+        :param down: True for a key press; False for a key release
+        :type down:  ``bool``
+        """
+        assert type(frame) == int and frame >= 0, 'frame %s is not a non-negative int' % repr(frame)
+        assert type(key) == str, 'key %s is not a string' % repr(key)
+        assert type(down) == bool, 'down %s is not a bool' % repr(down)
+        assert self._period is None or frame < self._period, 'frame %s is not within the period' % repr(frame)
+        if self._events and frame < self._events[-1][0]:
+            self._sorted = False
+        self._events.append((frame,key,down))
+
+    def press(self,frame,key):
+        """
+        Schedules a key press on the given frame.
+
+        :param frame: the frame to press the key on
+        :type frame:  ``int`` >= 0
+
+        :param key: the name of the key
+        :type key:  ``str``
+        """
+        self.schedule(frame,key,True)
+
+    def release(self,frame,key):
+        """
+        Schedules a key release on the given frame.
+
+        :param frame: the frame to release the key on
+        :type frame:  ``int`` >= 0
+
+        :param key: the name of the key
+        :type key:  ``str``
+        """
+        self.schedule(frame,key,False)
+
+    def hold(self,start,stop,key):
+        """
+        Schedules a key to be held down from frame ``start`` up to (but not including)
+        frame ``stop``.
+
+        :param start: the frame to press the key on
+        :type start:  ``int`` >= 0
+
+        :param stop: the frame to release the key on
+        :type stop:  ``int`` > start
+
+        :param key: the name of the key
+        :type key:  ``str``
+        """
+        assert type(stop) == int and stop > start, 'stop %s is not after start' % repr(stop)
+        self.schedule(start,key,True)
+        self.schedule(stop,key,False)
+
+    def advance(self):
+        """
+        Applies the key events for the next frame.
+
+        Only the events for that frame are examined, so this method is constant time
+        per event no matter how long the timeline is.
+        """
+        if not self._sorted:
+            # Stable, so events for the same frame keep their order
+            if self._period is None:
+                done = self._events[:self._next]
+                rest = sorted(self._events[self._next:],key=lambda event: event[0])
+                self._events = done+rest
+            else:
+                # Every event comes round again, so sort them all and find our place
+                self._events.sort(key=lambda event: event[0])
+                current = self._frame % self._period
+                pos = 0
+                while pos < len(self._events) and self._events[pos][0] < current:
+                    pos += 1
+                self._next = pos
+            self._sorted = True
+
+        events = self._events
+        state  = self._keystate
+        frame  = self._frame
+        pos = self._next
+        if not self._period is None:
+            frame %= self._period
+            if frame == 0:
+                pos = 0
+        while pos < len(events) and events[pos][0] <= frame:
+            (when, key, down) = events[pos]
+            if when == frame:
+                held = state.get(key,False)
+                if down and not held:
+                    self._keycount += 1
+                elif held and not down:
+                    self._keycount -= 1
+                state[key] = down
+            pos += 1
+        self._next  = pos
+        self._frame += 1
+
+    def reset(self):
+        """
+        Rewinds the timeline to frame 0 and releases every key.
+        """
+        self._frame = 0
+        self._next  = 0
+        self._keystate = {}
+        self._keycount = 0
+
+
+    # HIDDEN METHODS
+    def _enable_keyboard(self):
+        """
+        Does nothing, as a scripted input handler ignores the keyboard
+        """
+        pass
+
+    def _disable_keyboard(self):
+        """
+        Does nothing, as a scripted input handler ignores the keyboard
+        """
+        pass
+
+
 # #mark -
 class GView(FloatLayout):
     """
@@ -343,6 +580,31 @@ class GView(FloatLayout):
         self._contents = set()
 
 
+    # IMMUTABLE ATTRIBUTES
+    @property
+    def instruction_count(self):
+        """
+        The number of graphics instructions drawn to this view since it was cleared.
+
+        Instruction groups are counted along with every instruction inside of them,
+        so this is the work the renderer does for the frame.  Counting walks every
+        group, so this attribute should not be read every frame.
+
+        **Immutable**: This value cannot be altered.
+
+        **Invariant**: Must be an int >= 0.
+        """
+        count = 0
+        stack = list(self._frame.children)
+        while stack:
+            cmd = stack.pop()
+            count += 1
+            children = getattr(cmd,'children',None)
+            if children:
+                stack.extend(children)
+        return count
+
+
     # PUBLIC METHODS
     def draw(self,cmd):
         """
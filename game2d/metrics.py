@@ -0,0 +1,236 @@
+"""
+Per-frame metrics for 2D game support.
+
+The class in this module records one row of numbers per animation frame into a ring
+buffer of fixed size, so that it can be left on for a long session without growing.
+The rows can be written to a CSV or JSON Lines file, and summarized as percentiles.
+
+Every row has the standard columns in ``GMetrics.COLUMNS``.  A game can add its own
+columns (such as the number of enemies on screen) by registering a function for each
+one before the first frame is recorded.
+"""
+import os
+import json
+import numpy as np
+
+
+def resident_memory():
+    """
+    Returns: the resident set size of this process in bytes, or 0 if it is unknown
+
+    On Linux this is the current size, read from ``/proc``.  Elsewhere it is the peak
+    size reported by the ``resource`` module, if that module exists.
+    """
+    try:
+        with open('/proc/self/statm') as file:
+            return int(file.read().split()[1])*os.sysconf('SC_PAGE_SIZE')
+    except (IOError, OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource, sys
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports kilobytes, but macOS reports bytes
+        return peak if sys.platform == 'darwin' else peak*1024
+    except ImportError:
+        return 0
+
+
+class GMetrics(object):
+    """
+    A class to record metrics for every animation frame in a ring buffer.
+
+    The standard columns are
+
+    * ``frame``: the number of the frame, counting from 0
+    * ``dt``: the time since the previous frame, in seconds
+    * ``update``: the time to clear the view and update the game, in seconds
+    * ``draw``: the time to draw the game, in seconds
+    * ``total``: the sum of ``update`` and ``draw``
+    * ``instructions``: the number of graphics instructions in the view
+    * ``rss``: the resident memory of the process, in bytes
+
+    Counting instructions and reading the memory size are slow compared to a frame,
+    so these two columns are only sampled every ``interval`` frames, and repeat the
+    last sample in between.
+
+    Once ``capacity`` frames are recorded, each new frame replaces the oldest one.
+    """
+
+    # The standard columns of every row
+    COLUMNS = ('frame','dt','update','draw','total','instructions','rss')
+
+    # The percentiles in a summary
+    PERCENTILES = (50,95,99)
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def capacity(self):
+        """
+        The maximum number of frames kept.
+
+        **Invariant**: Must be an int > 0.
+        """
+        return self._capacity
+
+    @property
+    def columns(self):
+        """
+        The names of the columns, standard ones first.
+
+        **Invariant**: Must be a tuple of strings.
+        """
+        return self.COLUMNS+tuple(self._names)
+
+    @property
+    def frames(self):
+        """
+        The total number of frames recorded, including any that have been replaced.
+
+        **Invariant**: Must be an int >= 0.
+        """
+        return self._frames
+
+    # BUILT-IN METHODS
+    def __init__(self,capacity=3600,interval=30):
+        """
+        Creates a new, empty metrics buffer.
+
+        :param capacity: the maximum number of frames to keep
+        :type capacity:  ``int`` > 0
+
+        :param interval: the number of frames between samples of the slow columns
+        :type interval:  ``int`` > 0
+        """
+        assert type(capacity) == int and capacity > 0, 'capacity %s is not a positive int' % repr(capacity)
+        assert type(interval) == int and interval > 0, 'interval %s is not a positive int' % repr(interval)
+        self._capacity = capacity
+        self._interval = interval
+        self._names    = []
+        self._getters  = []
+        self._data     = None
+        self._frames   = 0
+        self._instructions = 0
+        self._rss = 0
+
+    def __len__(self):
+        """
+        Returns: the number of frames currently kept
+        """
+        return min(self._frames,self._capacity)
+
+    # PUBLIC METHODS
+    def register(self,name,getter):
+        """
+        Adds a column whose value is returned by the given function.
+
+        The function is called once per frame, with no arguments, and must return a
+        number.  Columns can only be registered before the first frame is recorded.
+
+        :param name: the name of the column
+        :type name:  ``str``
+
+        :param getter: the function returning the value for each frame
+        :type getter:  function with no arguments
+        """
+        assert self._data is None, 'columns cannot be added after recording starts'
+        assert type(name) == str and not name in self.columns, 'name %s is not a new column' % repr(name)
+        assert callable(getter), '%s is not a function' % repr(getter)
+        self._names.append(name)
+        self._getters.append(getter)
+
+    def record(self,dt,update,draw,view=None):
+        """
+        Adds a row for the frame just processed.
+
+        :param dt: the time since the previous frame, in seconds
+        :type dt:  ``int`` or ``float``
+
+        :param update: the time to clear the view and update the game, in seconds
+        :type update:  ``int`` or ``float``
+
+        :param draw: the time to draw the game, in seconds
+        :type draw:  ``int`` or ``float``
+
+        :param view: the view to count instructions in (optional)
+        :type view:  :class:`GView`
+        """
+        if self._data is None:
+            self._data = np.zeros((self._capacity,len(self.columns)))
+        if self._frames % self._interval == 0:
+            self._rss = resident_memory()
+            if not view is None:
+                self._instructions = view.instruction_count
+
+        row = self._data[self._frames % self._capacity]
+        row[:7] = (self._frames,dt,update,draw,update+draw,self._instructions,self._rss)
+        for pos in range(len(self._getters)):
+            row[7+pos] = self._getters[pos]()
+        self._frames += 1
+
+    def column(self,name):
+        """
+        Returns: a copy of the values of the named column, oldest frame first
+
+        :param name: the name of the column
+        :type name:  ``str``
+        """
+        assert name in self.columns, '%s is not a column' % repr(name)
+        return self._ordered()[:,self.columns.index(name)].copy()
+
+    def percentiles(self,name='total'):
+        """
+        Returns: a dictionary of the percentiles of the named column, plus its maximum
+
+        The keys are ``'p50'``, ``'p95'``, ``'p99'`` and ``'max'``.  The values are all
+        0 if no frames have been recorded.
+
+        :param name: the name of the column
+        :type name:  ``str``
+        """
+        values = self.column(name)
+        result = {}
+        for pct in self.PERCENTILES:
+            result['p%d' % pct] = float(np.percentile(values,pct)) if len(values) else 0.0
+        result['max'] = float(values.max()) if len(values) else 0.0
+        return result
+
+    def summary(self):
+        """
+        Returns: a one-line summary of the frame time percentiles, in milliseconds
+        """
+        stats = self.percentiles('total')
+        parts = ['%s %.3f' % (key,stats[key]*1000) for key in stats]
+        return 'frame time (ms) over %d frames: %s' % (len(self),', '.join(parts))
+
+    def dump(self,path):
+        """
+        Writes the frames kept to a file, oldest first.
+
+        The file is written as JSON Lines if its name ends in ``.jsonl`` and as CSV
+        otherwise.  Either way, the first value (or key) of each row is ``frame``.
+
+        :param path: the name of the file to write
+        :type path:  ``str``
+        """
+        names = self.columns
+        rows  = self._ordered().tolist()
+        with open(path,'w') as file:
+            if path.endswith('.jsonl'):
+                for row in rows:
+                    file.write(json.dumps(dict(zip(names,row)))+'\n')
+            else:
+                file.write(','.join(names)+'\n')
+                for row in rows:
+                    file.write(','.join('%.17g' % value for value in row)+'\n')
+
+    # HIDDEN METHODS
+    def _ordered(self):
+        """
+        Returns: the rows kept, oldest first, as a 2D numpy array
+        """
+        if self._data is None:
+            return np.zeros((0,len(self.columns)))
+        if self._frames <= self._capacity:
+            return self._data[:self._frames]
+        split = self._frames % self._capacity
+        return np.concatenate((self._data[split:],self._data[:split]))
@@ -0,0 +1,489 @@
+"""
+The null backend for 2D game support.
+
+This module provides stand-ins for the Kivy classes used by this package.  They have
+the same attributes as the Kivy originals, so that a :class:`GObject` can keep its
+position, size and colors, but they draw nothing.  Nothing in this module imports Kivy,
+loads a texture, plays a sound or needs a window.
+
+**You should never use this module directly**.  It is selected for you by setting the
+environment variable ``GAME2D_BACKEND`` to ``null``.  See :mod:`game2d.backend`.
+"""
+
+__all__ = ['Instruction', 'InstructionGroup', 'PushMatrix', 'PopMatrix', 'Translate',
+           'Rotate', 'Scale', 'Color', 'Rectangle', 'Ellipse', 'Line', 'Mesh']
+
+
+# #mark Graphics Instructions
+class Instruction(object):
+    """
+    A class representing a graphics instruction that draws nothing.
+
+    Any keywords given to the constructor are stored as attributes.
+    """
+
+    def __init__(self,*args,**keywords):
+        """
+        Creates a new instruction.
+
+        :param keywords: dictionary of keyword arguments
+        :type keywords:  keys are attribute names
+        """
+        for key in keywords:
+            setattr(self,key,keywords[key])
+
+
+class InstructionGroup(Instruction):
+    """
+    A class representing a list of graphics instructions.
+
+    The group keeps its children, so that they can still be counted.
+    """
+
+    def __init__(self,**keywords):
+        """
+        Creates a new, empty instruction group.
+
+        :param keywords: dictionary of keyword arguments
+        :type keywords:  keys are attribute names
+        """
+        Instruction.__init__(self,**keywords)
+        self.children = []
+
+    def add(self,c):
+        """
+        Adds an instruction to the end of this group.
+
+        :param c: the instruction to add
+        :type c:  :class:`Instruction`
+        """
+        self.children.append(c)
+
+    def remove(self,c):
+        """
+        Removes an instruction from this group.
+
+        :param c: the instruction to remove
+        :type c:  :class:`Instruction`
+        """
+        self.children.remove(c)
+
+    def clear(self):
+        """
+        Removes all instructions from this group.
+        """
+        del self.children[:]
+
+
+class PushMatrix(Instruction):
+    """
+    A class representing an instruction to save the current transform.
+    """
+    pass
+
+
+class PopMatrix(Instruction):
+    """
+    A class representing an instruction to restore the last saved transform.
+    """
+    pass
+
+
+class Translate(Instruction):
+    """
+    A class representing a translation.
+    """
+
+    def __init__(self,x=0,y=0,z=0):
+        """
+        Creates a new translation.
+
+        :param x: the horizontal offset
+        :type x:  ``int`` or ``float``
+
+        :param y: the vertical offset
+        :type y:  ``int`` or ``float``
+
+        :param z: the depth offset
+        :type z:  ``int`` or ``float``
+        """
+        self.x = x
+        self.y = y
+        self.z = z
+
+
+class Rotate(Instruction):
+    """
+    A class representing a rotation.
+    """
+
+    def __init__(self,angle=0,axis=(0,0,1)):
+        """
+        Creates a new rotation.
+
+        :param angle: the rotation angle in degrees
+        :type angle:  ``int`` or ``float``
+
+        :param axis: the axis of rotation
+        :type axis:  3-element tuple of numbers
+        """
+        self.angle = angle
+        self.axis = axis
+
+
+class Scale(Instruction):
+    """
+    A class representing a scaling factor.
+    """
+
+    def __init__(self,x=1,y=1,z=1):
+        """
+        Creates a new scaling factor.
+
+        :param x: the horizontal scale
+        :type x:  ``int`` or ``float``
+
+        :param y: the vertical scale
+        :type y:  ``int`` or ``float``
+
+        :param z: the depth scale
+        :type z:  ``int`` or ``float``
+        """
+        self.x = x
+        self.y = y
+        self.z = z
+
+
+class Color(Instruction):
+    """
+    A class representing the current drawing color.
+    """
+
+    def __init__(self,r=1,g=1,b=1,a=1):
+        """
+        Creates a new color.
+
+        :param r: the red component in 0..1
+        :type r:  ``int`` or ``float``
+
+        :param g: the green component in 0..1
+        :type g:  ``int`` or ``float``
+
+        :param b: the blue component in 0..1
+        :type b:  ``int`` or ``float``
+
+        :param a: the alpha component in 0..1
+        :type a:  ``int`` or ``float``
+        """
+        self.rgba = [r,g,b,a]
+
+
+class Rectangle(Instruction):
+    """
+    A class representing a (possibly textured) rectangle.
+    """
+    pass
+
+
+class Ellipse(Instruction):
+    """
+    A class representing an ellipse.
+    """
+    pass
+
+
+class Line(Instruction):
+    """
+    A class representing a line or outline.
+    """
+    pass
+
+
+class Mesh(Instruction):
+    """
+    A class representing a triangle mesh.
+    """
+    pass
+
+
+# #mark -
+def dp(value):
+    """
+    Returns: the number of pixels for the given number of density-independent pixels.
+
+    As there is no screen, one density-independent pixel is always one pixel.
+
+    :param value: the number of density-independent pixels
+    :type value:  ``int`` or ``float``
+    """
+    return value
+
+
+class FloatLayout(object):
+    """
+    A class representing a widget without a window.
+
+    It has a canvas so that a :class:`GView` can build its drawing instructions, but
+    that canvas is never displayed.
+    """
+
+    def __init__(self,**keywords):
+        """
+        Creates a new widget.
+
+        :param keywords: dictionary of keyword arguments
+        :type keywords:  keys are attribute names
+        """
+        self.canvas = InstructionGroup()
+        self.pos  = (0,0)
+        self.size = (100,100)
+        self.size_hint = (1,1)
+        for key in keywords:
+            setattr(self,key,keywords[key])
+
+    def bind(self,**keywords):
+        """
+        Does nothing, as a widget without a window has no events.
+        """
+        pass
+
+    def unbind(self,**keywords):
+        """
+        Does nothing, as a widget without a window has no events.
+        """
+        pass
+
+
+class Label(FloatLayout):
+    """
+    A class representing a text label that is never rendered.
+
+    As there are no fonts to measure with, the size of the text is estimated from the
+    font size and the number of characters.
+    """
+
+    # The width of a character and the height of a line, relative to the font size
+    CHAR_WIDTH  = 0.6
+    LINE_HEIGHT = 1.2
+
+    @property
+    def width(self):
+        """
+        The width of this label.
+        """
+        return self.size[0]
+
+    @width.setter
+    def width(self,value):
+        self.size = (value,self.size[1])
+
+    @property
+    def height(self):
+        """
+        The height of this label.
+        """
+        return self.size[1]
+
+    @height.setter
+    def height(self,value):
+        self.size = (self.size[0],value)
+
+    @property
+    def right(self):
+        """
+        The right edge of this label.
+        """
+        return self.x+self.width
+
+    @right.setter
+    def right(self,value):
+        self.x = value-self.width
+
+    @property
+    def top(self):
+        """
+        The top edge of this label.
+        """
+        return self.y+self.height
+
+    @top.setter
+    def top(self,value):
+        self.y = value-self.height
+
+    @property
+    def bottom(self):
+        """
+        The bottom edge of this label.
+        """
+        return self.y
+
+    @bottom.setter
+    def bottom(self,value):
+        self.y = value
+
+    @property
+    def center(self):
+        """
+        The center of this label.
+        """
+        return (self.x+self.width/2.0,self.y+self.height/2.0)
+
+    @center.setter
+    def center(self,value):
+        self.x = value[0]-self.width/2.0
+        self.y = value[1]-self.height/2.0
+
+    def __init__(self,**keywords):
+        """
+        Creates a new text label.
+
+        :param keywords: dictionary of keyword arguments
+        :type keywords:  keys are attribute names
+        """
+        self.x = 0
+        self.y = 0
+        self.text = ''
+        self.font_size = 15
+        self.font_name = 'Roboto'
+        self.bold = False
+        self.halign = 'left'
+        self.valign = 'bottom'
+        self.color  = [1,1,1,1]
+        self.texture_size = [0,0]
+        FloatLayout.__init__(self,**keywords)
+        self.texture_update()
+
+    def texture_update(self):
+        """
+        Estimates the size of the text.
+        """
+        lines = str(self.text).split('\n')
+        size  = float(self.font_size)
+        self.texture_size = [max(len(line) for line in lines)*size*self.CHAR_WIDTH,
+                             len(lines)*size*self.LINE_HEIGHT]
+
+
+# #mark -
+class Config(object):
+    """
+    A class representing an application configuration that is ignored.
+    """
+
+    @classmethod
+    def set(cls,section,key,value):
+        """
+        Does nothing, as there is no window to configure.
+        """
+        pass
+
+
+class Clock(object):
+    """
+    A class representing a clock that never fires.
+
+    There is no event loop in the null backend, so scheduled callbacks are never
+    called.  The game must be stepped by hand instead.
+    """
+
+    @classmethod
+    def schedule_once(cls,callback,timeout=0):
+        """
+        Does nothing, as there is no event loop.
+        """
+        pass
+
+    @classmethod
+    def schedule_interval(cls,callback,timeout):
+        """
+        Does nothing, as there is no event loop.
+        """
+        pass
+
+    @classmethod
+    def unschedule(cls,callback):
+        """
+        Does nothing, as there is no event loop.
+        """
+        pass
+
+
+class App(object):
+    """
+    A class representing an application without a window.
+    """
+
+    def __init__(self,**keywords):
+        """
+        Creates a new application.
+
+        :param keywords: dictionary of keyword arguments
+        :type keywords:  keys are attribute names
+        """
+        self.root = None
+
+    def build(self):
+        """
+        Returns: the root widget of this application.
+        """
+        return None
+
+    def run(self):
+        """
+        Builds the root widget of this application.
+
+        Unlike Kivy, this method returns immediately, as there is no event loop.
+        """
+        self.root = self.build()
+
+    def stop(self):
+        """
+        Does nothing, as there is no event loop to stop.
+        """
+        pass
+
+
+# #mark -
+class NullSound(object):
+    """
+    A class representing a sound that is never played.
+    """
+
+    def __init__(self,source):
+        """
+        Creates a new silent sound.
+
+        :param source: the name of the sound file
+        :type source:  ``str``
+        """
+        self.source = source
+        self.volume = 1
+        self.loop   = False
+        self.state  = 'stop'
+
+    def play(self):
+        """
+        Marks this sound as playing.
+        """
+        self.state = 'play'
+
+    def stop(self):
+        """
+        Marks this sound as stopped.
+        """
+        self.state = 'stop'
+
+
+class SoundLoader(object):
+    """
+    A class representing a sound loader that never reads a file.
+    """
+
+    @classmethod
+    def load(cls,source):
+        """
+        Returns: a silent sound for the given file name.
+
+        :param source: the name of the sound file
+        :type source:  ``str``
+        """
+        return NullSound(source)
@@ -0,0 +1,202 @@
+"""
+A frame-time profiler overlay for 2D game support.
+
+The overlay is drawn by :class:`GameApp` on top of the game when its ``overlay``
+attribute is True (or after the ``OVERLAY_KEY`` is pressed).  It shows the rolling
+average of the update, draw and total frame times, the frame rate and the number of
+graphics instructions in the view, together with a graph of recent frame times.
+
+The overlay is built to stay out of its own measurements.  The text is only rebuilt a
+few times a second, and each frame changes a single bar of the graph, which is a
+transform and not a rebuild.  All of this happens after the frame timers stop.
+"""
+from .grectangle import GRectangle, GLabel
+
+
+class GOverlay(object):
+    """
+    A class to display frame timings on top of a game.
+
+    The overlay keeps a ring of the most recent frames.  Each frame is recorded with
+    :meth:`record` and then the overlay is drawn with :meth:`draw`.  The graph shows one
+    bar per frame in the ring, drawn as a sweep from left to right, with a line at the
+    frame budget (one frame at the target fps).
+    """
+
+    # The number of frames in the history
+    HISTORY  = 120
+    # The number of seconds between text refreshes
+    INTERVAL = 0.25
+    # The pixels of graph height per millisecond of frame time
+    PIXELS_PER_MS = 2.0
+    # The height of the graph in pixels
+    GRAPH_HEIGHT  = 50
+    # The width of a bar in the graph
+    BAR_WIDTH = 2
+    # The margin around the overlay contents
+    MARGIN = 6
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def update_time(self):
+        """
+        The average time to update the game over the history, in seconds.
+
+        **Invariant**: Must be a float >= 0.
+        """
+        return self._average(self._updates)
+
+    @property
+    def draw_time(self):
+        """
+        The average time to draw the game over the history, in seconds.
+
+        **Invariant**: Must be a float >= 0.
+        """
+        return self._average(self._draws)
+
+    @property
+    def frame_time(self):
+        """
+        The average time to update and draw the game over the history, in seconds.
+
+        This is the work done by the game in each frame, not the time between frames
+        (see :attr:`interval`).
+
+        **Invariant**: Must be a float >= 0.
+        """
+        return self._average(self._totals)
+
+    @property
+    def interval(self):
+        """
+        The average time between frames over the history, in seconds.
+
+        **Invariant**: Must be a float >= 0.
+        """
+        return self._average(self._frames)
+
+    @property
+    def fps(self):
+        """
+        The average frame rate over the history.
+
+        This is based on the time between frames, not on :attr:`frame_time`.
+
+        **Invariant**: Must be a float >= 0.
+        """
+        interval = self.interval
+        return 1.0/interval if interval > 0 else 0.0
+
+    # BUILT-IN METHODS
+    def __init__(self,left,top,budget):
+        """
+        Creates a new overlay with its top left corner at the given position.
+
+        :param left: the left edge of the overlay
+        :type left:  ``int`` or ``float``
+
+        :param top: the top edge of the overlay
+        :type top:  ``int`` or ``float``
+
+        :param budget: the target time per frame, in seconds
+        :type budget:  ``int`` or ``float`` > 0
+        """
+        self._updates = [0.0]*self.HISTORY
+        self._draws   = [0.0]*self.HISTORY
+        self._totals  = [0.0]*self.HISTORY
+        self._frames  = [0.0]*self.HISTORY
+        self._samples = 0
+        self._cursor  = 0
+        self._elapsed = self.INTERVAL
+
+        width = self.HISTORY*self.BAR_WIDTH
+        self._text = GLabel(text='',font_size=12,halign='left',valign='top',
+                            linecolor=(1,1,1,1),width=width,height=80)
+        self._text.left = left+self.MARGIN
+        self._text.top  = top-self.MARGIN
+
+        base = self._text.bottom-self.MARGIN-self.GRAPH_HEIGHT
+        self._base = base
+        self._panel = GRectangle(left=left,bottom=base-self.MARGIN,
+                                 width=width+2*self.MARGIN,height=top-base+self.MARGIN,
+                                 fillcolor=(0,0,0,0.6))
+        self._bars = []
+        for pos in range(self.HISTORY):
+            bar = GRectangle(width=self.BAR_WIDTH,height=1,fillcolor=(0.3,0.9,0.3,1))
+            bar.left = left+self.MARGIN+pos*self.BAR_WIDTH
+            bar.y = base+0.5
+            self._bars.append(bar)
+        level = min(budget*1000*self.PIXELS_PER_MS,self.GRAPH_HEIGHT)
+        self._budget = GRectangle(left=left+self.MARGIN,y=base+level,width=width,height=1,
+                                  fillcolor=(1,0.3,0.3,1))
+        self._cursorbar = GRectangle(x=left+self.MARGIN,y=base+self.GRAPH_HEIGHT/2,
+                                     width=1,height=self.GRAPH_HEIGHT,fillcolor=(1,1,1,0.5))
+
+    # PUBLIC METHODS
+    def record(self,frame,update,draw):
+        """
+        Adds the timings of one frame to the history.
+
+        :param frame: the time since the previous frame, in seconds
+        :type frame:  ``int`` or ``float``
+
+        :param update: the time to update the game, in seconds
+        :type update:  ``int`` or ``float``
+
+        :param draw: the time to draw the game, in seconds
+        :type draw:  ``int`` or ``float``
+        """
+        pos = self._cursor
+        self._updates[pos] = update
+        self._draws[pos]   = draw
+        self._totals[pos]  = update+draw
+        self._frames[pos]  = frame
+        self._samples = min(self._samples+1,self.HISTORY)
+        self._elapsed += frame
+
+        # Only the newest bar changes
+        height = min(max((update+draw)*1000*self.PIXELS_PER_MS,1),self.GRAPH_HEIGHT)
+        bar = self._bars[pos]
+        bar.scale = (1,height)
+        bar.y = self._base+height/2.0
+        self._cursor = (pos+1) % self.HISTORY
+        self._cursorbar.x = self._bars[self._cursor].x
+
+    def draw(self,view,instructions=None):
+        """
+        Draws this overlay to the view.
+
+        The text is only rebuilt once every ``INTERVAL`` seconds.  The function
+        ``instructions`` is only called then as well, as counting can be slow.
+
+        :param view: the view to draw to
+        :type view:  :class:`GView`
+
+        :param instructions: a function returning the number of instructions drawn
+        :type instructions:  function with no arguments, or None
+        """
+        if self._elapsed >= self.INTERVAL:
+            self._elapsed = 0.0
+            count = '-' if instructions is None else str(instructions())
+            self._text.text = ('update %6.2f ms\ndraw   %6.2f ms\nframe  %6.2f ms\n'
+                               'fps    %6.1f\ninstr  %s') % (self.update_time*1000,
+                               self.draw_time*1000,self.frame_time*1000,self.fps,count)
+        self._panel.draw(view)
+        for bar in self._bars:
+            bar.draw(view)
+        self._budget.draw(view)
+        self._cursorbar.draw(view)
+        self._text.draw(view)
+
+    # HIDDEN METHODS
+    def _average(self,values):
+        """
+        Returns: the average of the recorded samples in values
+
+        :param values: one of the history rings
+        :type values:  ``list`` of ``float``
+        """
+        if self._samples == 0:
+            return 0.0
+        return sum(values)/self._samples
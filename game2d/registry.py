@@ -0,0 +1,185 @@
+"""
+A registry of live graphics objects for 2D game support.
+
+Games create and drop graphics objects all the time, and a stray reference (from a
+cache, a view, or a bound callback) can keep them alive for the rest of the session.
+The class in this module keeps a weak reference to every :class:`GObject` created
+while it is active, grouped by class.  A weak reference does not keep an object
+alive, so the registry only ever counts objects that something else is holding on to.
+
+Taking a census of the registry every few hundred frames, over a long session, shows
+any class whose count or memory grows steadily.
+"""
+import sys
+import json
+import weakref
+
+
+def approximate_size(obj):
+    """
+    Returns: the approximate memory used by obj and its attributes, in bytes
+
+    This is the size of the object, its attribute dictionary and the value of each
+    attribute, but not anything those values refer to.  So it counts the graphics
+    instructions owned by a :class:`GObject`, but not shared data such as textures.
+
+    :param obj: the object to measure
+    :type obj:  any
+    """
+    size = sys.getsizeof(obj)
+    attributes = getattr(obj,'__dict__',None)
+    if not attributes is None:
+        size += sys.getsizeof(attributes)
+        for value in attributes.values():
+            size += sys.getsizeof(value)
+    return size
+
+
+class GRegistry(object):
+    """
+    A class to track the live graphics objects of a game.
+
+    Every :class:`GObject` adds itself with :meth:`add` when it is created.  This does
+    nothing unless a registry is active, and only one registry can be active at a time.
+    While it is active, the registry keeps a ``WeakSet`` of the instances of each class.
+
+    The registry takes a census every ``interval`` frames (see :meth:`record`).  A census
+    has the number and approximate size of the live objects of each class, the number
+    of objects drawn to the view, and the number of cached textures.  Each census is
+    appended to a JSON Lines file if there is one, and kept for :meth:`report`.
+    """
+
+    # The registry that objects are added to, if any
+    _active = None
+
+    # CLASS METHODS
+    @classmethod
+    def add(cls,obj):
+        """
+        Adds an object to the active registry, if there is one.
+
+        :param obj: the object to add
+        :type obj:  :class:`GObject`
+        """
+        registry = cls._active
+        if not registry is None:
+            live = registry._live
+            kind = type(obj).__name__
+            if not kind in live:
+                live[kind] = weakref.WeakSet()
+            live[kind].add(obj)
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def interval(self):
+        """
+        The number of frames between each census.
+
+        **Invariant**: Must be an int > 0.
+        """
+        return self._interval
+
+    @property
+    def samples(self):
+        """
+        The censuses taken so far, oldest first.
+
+        Each census is a dictionary with the keys ``'frame'``, ``'contents'``,
+        ``'textures'`` and ``'classes'``.  The last one maps each class name to a list
+        of its live count and their approximate size in bytes.
+
+        **Invariant**: Must be a list of dictionaries.
+        """
+        return self._samples
+
+    # BUILT-IN METHODS
+    def __init__(self,interval=600,path=None):
+        """
+        Creates a new registry and makes it the active one.
+
+        Only objects created after this registry are tracked.
+
+        :param interval: the number of frames between each census
+        :type interval:  ``int`` > 0
+
+        :param path: the name of the .jsonl file to append each census to (optional)
+        :type path:  ``str``
+        """
+        assert type(interval) == int and interval > 0, 'interval %s is not a positive int' % repr(interval)
+        assert path is None or type(path) == str, 'path %s is not a string' % repr(path)
+        assert GRegistry._active is None, 'a registry is already active'
+        self._interval = interval
+        self._live = {}
+        self._frame = 0
+        self._samples = []
+        self._file = None if path is None else open(path,'w',buffering=1)
+        GRegistry._active = self
+
+    # PUBLIC METHODS
+    def census(self):
+        """
+        Returns: a dictionary from each class name to a [count, bytes] list of its live objects
+        """
+        result = {}
+        for kind in sorted(self._live):
+            objects = list(self._live[kind])
+            result[kind] = [len(objects),sum(approximate_size(obj) for obj in objects)]
+        return result
+
+    def record(self,view=None,textures=0):
+        """
+        Takes a census, if this is one of every ``interval`` frames.
+
+        :param view: the view whose drawn objects are counted (optional)
+        :type view:  :class:`GView`
+
+        :param textures: the number of cached textures
+        :type textures:  ``int`` >= 0
+        """
+        frame = self._frame
+        self._frame += 1
+        if frame % self._interval != 0:
+            return
+        sample = {'frame':frame,'contents':0 if view is None else len(view._contents),
+                  'textures':textures,'classes':self.census()}
+        self._samples.append(sample)
+        if not self._file is None:
+            self._file.write(json.dumps(sample)+'\n')
+
+    def report(self):
+        """
+        Returns: a multiline summary of the live objects of each class
+
+        Each class shows its count and size at the first and last census, and the
+        largest count in between, so that steady growth stands out.
+        """
+        if not self._samples:
+            return 'no census taken'
+        first = self._samples[0]
+        last  = self._samples[-1]
+        lines = ['live objects from frame %d to frame %d (%d censuses)' %
+                 (first['frame'],last['frame'],len(self._samples))]
+        kinds = set()
+        for sample in self._samples:
+            kinds.update(sample['classes'])
+        for kind in sorted(kinds):
+            (count0, size0) = first['classes'].get(kind,[0,0])
+            (count1, size1) = last['classes'].get(kind,[0,0])
+            peak = max(sample['classes'].get(kind,[0,0])[0] for sample in self._samples)
+            lines.append('  %-12s %6d -> %6d (peak %6d, %+d)  %9d -> %9d B' %
+                         (kind,count0,count1,peak,count1-count0,size0,size1))
+        for key in ('contents','textures'):
+            lines.append('  %-12s %6d -> %6d' % (key,first[key],last[key]))
+        return '\n'.join(lines)
+
+    def close(self):
+        """
+        Deactivates this registry and closes its file.
+
+        This method does nothing if the registry is already closed.
+        """
+        if GRegistry._active is self:
+            GRegistry._active = None
+        if not self._file is None:
+            self._file.close()
+            self._file = None
@@ -0,0 +1,440 @@
+"""
+Input recording and replay for 2D game support.
+
+A game is deterministic if it is given the same input on every frame, the same time
+step on every frame, and the same seed for the ``random`` module.  The classes in this
+module record exactly that information, so that a session can be replayed frame for
+frame (and as fast as the CPU allows) with a :class:`HeadlessRunner`.
+
+A recording is a binary file with four parts:
+
+* A fixed-size header with the seed, the fixed time step of the game (if any), the
+  number of frames and the location of the other parts.
+* One record per frame.  A record has a flag byte, a count byte, the time step as a
+  double (omitted if it is the same as the previous frame) and then ``count`` key
+  bytes.  Most records are *deltas*: each key byte is the id of a key that changed,
+  with the high bit set if the key was pressed.  Every ``interval`` frames, the record
+  is a *keyframe* instead: it always has a time step, and its key bytes are the ids of
+  every key held down, so decoding can begin there.
+* An index of the keyframes, as pairs of frame number and file offset.
+* The names of the keys, one per line, in order of id.
+
+The reader memory-maps the file, so seeking to a frame only decodes the records from
+the keyframe before it.
+"""
+import mmap
+import random
+import struct
+import bisect
+from .gview import GScriptedInput
+
+# The header: magic, version, keyframe interval, seed, fixed time step (0 if none), maximum
+# steps per frame, frames, keyframes, index and key table offsets
+_HEADER = struct.Struct('<4sHHqdHIIQQ')
+# The start of a frame record: flags and number of key bytes
+_RECORD = struct.Struct('<BB')
+# The time step of a frame record
+_STEP   = struct.Struct('<d')
+# An entry in the keyframe index: frame and file offset
+_ENTRY  = struct.Struct('<IQ')
+
+_MAGIC   = b'G2DR'
+_VERSION = 1
+
+# The flag bit marking a keyframe record
+_KEYFRAME = 1
+# The flag bit marking a record that repeats the previous time step
+_SAMESTEP = 2
+# The bit marking a key press in a delta record
+_PRESSED  = 0x80
+
+
+class GRecorder(object):
+    """
+    A class to record the input and time step of every animation frame.
+
+    The recorder seeds the ``random`` module when it is created.  It should therefore
+    be created before the game is started, and :meth:`capture` should be called once
+    per frame, before the game is updated.  The file is not complete until the method
+    :meth:`close` is called.
+    """
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def seed(self):
+        """
+        The seed given to the ``random`` module.
+
+        **Invariant**: Must be an int >= 0.
+        """
+        return self._seed
+
+    @property
+    def frames(self):
+        """
+        The number of frames recorded so far.
+
+        **Invariant**: Must be an int >= 0.
+        """
+        return self._frames
+
+    @property
+    def closed(self):
+        """
+        Whether this recorder is closed.
+
+        **Invariant**: Must be a bool.
+        """
+        return self._file is None
+
+    # BUILT-IN METHODS
+    def __init__(self,path,seed=None,interval=600,timestep=None,maxsteps=5):
+        """
+        Creates a new recorder writing to the given file.
+
+        If the seed is None, a seed is chosen at random.  Either way, the ``random``
+        module is seeded with it.  The fixed time step settings of the game are saved
+        so that playback can restore them (see :attr:`GameApp.timestep`).
+
+        :param path: the name of the file to record to
+        :type path:  ``str``
+
+        :param seed: the seed for the ``random`` module (optional)
+        :type seed:  ``int`` >= 0
+
+        :param interval: the number of frames between keyframes
+        :type interval:  ``int`` > 0
+
+        :param timestep: the fixed time step of the game (optional)
+        :type timestep:  ``int`` or ``float`` > 0
+
+        :param maxsteps: the maximum number of fixed time steps per frame
+        :type maxsteps:  ``int`` > 0
+        """
+        assert seed is None or (type(seed) == int and seed >= 0), 'seed %s is not a non-negative int' % repr(seed)
+        assert type(interval) == int and interval > 0, 'interval %s is not a positive int' % repr(interval)
+        self._seed = random.randrange(2**63) if seed is None else seed
+        self._interval = interval
+        self._timestep = timestep
+        self._maxsteps = maxsteps
+        self._frames = 0
+        self._index  = []
+        self._ids    = {}
+        self._names  = []
+        self._held   = set()
+        self._step   = None
+        self._file   = open(path,'wb')
+        self._file.write(b'\0'*_HEADER.size)
+        random.seed(self._seed)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self,type,value,traceback):
+        self.close()
+
+    # PUBLIC METHODS
+    def capture(self,input,dt):
+        """
+        Records the keys held down in the input handler for the next frame.
+
+        :param input: the input handler for the game
+        :type input:  :class:`GInput`
+
+        :param dt: the time step of this frame
+        :type dt:  ``int`` or ``float``
+        """
+        assert not self.closed, 'recorder is closed'
+        held = set(self._id(key) for key in input.keys)
+        if self._frames % self._interval == 0:
+            self._index.append((self._frames,self._file.tell()))
+            data = sorted(held)
+            flags = _KEYFRAME
+        else:
+            data = [code|_PRESSED for code in sorted(held-self._held)]
+            data.extend(sorted(self._held-held))
+            flags = 0
+        if dt == self._step and not flags & _KEYFRAME:
+            flags |= _SAMESTEP
+        self._file.write(_RECORD.pack(flags,len(data)))
+        if not flags & _SAMESTEP:
+            self._file.write(_STEP.pack(dt))
+        self._file.write(bytes(data))
+        self._step = dt
+        self._held = held
+        self._frames += 1
+
+    def close(self):
+        """
+        Writes the index and key names, completes the header and closes the file.
+
+        This method does nothing if the recorder is already closed.
+        """
+        if self.closed:
+            return
+        out = self._file
+        index = out.tell()
+        for entry in self._index:
+            out.write(_ENTRY.pack(*entry))
+        table = out.tell()
+        out.write('\n'.join(self._names).encode('utf-8'))
+        out.seek(0)
+        timestep = 0.0 if self._timestep is None else self._timestep
+        out.write(_HEADER.pack(_MAGIC,_VERSION,self._interval,self._seed,timestep,
+                               self._maxsteps,self._frames,len(self._index),index,table))
+        out.close()
+        self._file = None
+
+    # HIDDEN METHODS
+    def _id(self,key):
+        """
+        Returns: the id of the given key name, assigning a new one if necessary
+
+        :param key: the key name
+        :type key:  ``str``
+        """
+        code = self._ids.get(key)
+        if code is None:
+            code = len(self._names)
+            assert code < _PRESSED, 'too many distinct keys to record'
+            self._ids[key] = code
+            self._names.append(key)
+        return code
+
+
+class GReplay(object):
+    """
+    A class to read a recording made by :class:`GRecorder`.
+
+    The file is memory-mapped.  Frames are decoded on demand, starting from the nearest
+    keyframe, so a long recording can be seeked without reading it all.
+    """
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def seed(self):
+        """
+        The seed given to the ``random`` module when recording.
+
+        **Invariant**: Must be an int >= 0.
+        """
+        return self._seed
+
+    @property
+    def frames(self):
+        """
+        The number of frames in this recording.
+
+        **Invariant**: Must be an int >= 0.
+        """
+        return self._frames
+
+    @property
+    def timestep(self):
+        """
+        The fixed time step of the game when recording, or None if it had none.
+
+        **Invariant**: Must be None or a float > 0.
+        """
+        return self._timestep
+
+    @property
+    def maxsteps(self):
+        """
+        The maximum number of fixed time steps per frame when recording.
+
+        **Invariant**: Must be an int > 0.
+        """
+        return self._maxsteps
+
+    @property
+    def keyframes(self):
+        """
+        The frame numbers of the keyframes in this recording.
+
+        **Invariant**: Must be a list of ints in ascending order.
+        """
+        return list(self._kframes)
+
+    # BUILT-IN METHODS
+    def __init__(self,path):
+        """
+        Opens the given recording.
+
+        :param path: the name of the recording file
+        :type path:  ``str``
+        """
+        self._file = open(path,'rb')
+        self._data = mmap.mmap(self._file.fileno(),0,access=mmap.ACCESS_READ)
+        data = self._data
+        (magic, version, self._interval, self._seed, timestep, self._maxsteps,
+         self._frames, count, index, table) = _HEADER.unpack_from(data,0)
+        self._timestep = timestep if timestep > 0 else None
+        if magic != _MAGIC or version != _VERSION:
+            raise IOError('Module game2d cannot read the recording %s' % repr(path))
+        entries = [_ENTRY.unpack_from(data,index+pos*_ENTRY.size) for pos in range(count)]
+        self._kframes  = [entry[0] for entry in entries]
+        self._koffsets = [entry[1] for entry in entries]
+        text = data[table:].decode('utf-8')
+        self._names = text.split('\n') if text else []
+
+    def __len__(self):
+        return self._frames
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self,type,value,traceback):
+        self.close()
+
+    # PUBLIC METHODS
+    def close(self):
+        """
+        Closes the recording file.
+        """
+        if not self._data is None:
+            self._data.close()
+            self._file.close()
+            self._data = None
+
+    def iterate(self,start=0):
+        """
+        Returns: a generator of (dt, keys) pairs, one per frame, beginning at ``start``
+
+        Each ``keys`` is a tuple of the names of the keys held down on that frame.
+        Decoding begins at the last keyframe at or before ``start``.
+
+        :param start: the first frame to generate
+        :type start:  ``int`` in 0..frames
+        """
+        assert type(start) == int and 0 <= start <= self._frames, 'start %s is out of range' % repr(start)
+        if start == self._frames:
+            return
+        data  = self._data
+        names = self._names
+        pos   = bisect.bisect_right(self._kframes,start)-1
+        frame = self._kframes[pos]
+        offset = self._koffsets[pos]
+        held = set()
+        dt = None
+        while frame < self._frames:
+            (flags, count) = _RECORD.unpack_from(data,offset)
+            offset += _RECORD.size
+            if not flags & _SAMESTEP:
+                dt = _STEP.unpack_from(data,offset)[0]
+                offset += _STEP.size
+            codes = data[offset:offset+count]
+            offset += count
+            if flags & _KEYFRAME:
+                held = set(codes)
+            else:
+                for code in codes:
+                    if code & _PRESSED:
+                        held.add(code & ~_PRESSED)
+                    else:
+                        held.discard(code)
+            if frame >= start:
+                yield (dt, tuple(names[code] for code in sorted(held)))
+            frame += 1
+
+    def keys_at(self,frame):
+        """
+        Returns: a tuple of the names of the keys held down on the given frame.
+
+        :param frame: the frame to seek to
+        :type frame:  ``int`` in 0..frames-1
+        """
+        assert type(frame) == int and 0 <= frame < self._frames, 'frame %s is out of range' % repr(frame)
+        return next(self.iterate(frame))[1]
+
+    def input(self):
+        """
+        Returns: a new input handler that plays back this recording from frame 0.
+        """
+        return GReplayInput(self)
+
+    def play(self,app):
+        """
+        Replays this recording on the given application as fast as possible.
+
+        This method restores the fixed time step settings of the application, seeds
+        the ``random`` module, starts the application and then processes every frame
+        with its recorded input and time step.
+
+        :param app: the application to replay on (not yet started)
+        :type app:  :class:`GameApp`
+
+        :return: the runner used for the playback, with its timings
+        :rtype:  :class:`HeadlessRunner`
+        """
+        from .runner import HeadlessRunner
+        input  = self.input()
+        runner = HeadlessRunner(app,input=input)
+        app.timestep = self._timestep
+        app.maxsteps = self._maxsteps
+        random.seed(self._seed)
+        runner.start()
+        while not input.finished:
+            runner.step()
+        return runner
+
+
+class GReplayInput(GScriptedInput):
+    """
+    A class representing an input handler that plays back a recording.
+
+    Each call to :meth:`advance` sets the keys held down to those of the next frame
+    of the recording, and sets :attr:`dt` to the recorded time step.
+    """
+
+    # IMMUTABLE ATTRIBUTES
+    @property
+    def dt(self):
+        """
+        The recorded time step of the last frame advanced, or None before the first.
+
+        **Immutable**: This value cannot be altered.
+        """
+        return self._dt
+
+    @property
+    def finished(self):
+        """
+        Whether every frame of the recording has been played.
+
+        **Immutable**: This value cannot be altered.
+
+        **Invariant**: Must be a bool
+        """
+        return self._frame >= self._replay.frames
+
+    # BUILT-IN METHODS
+    def __init__(self,replay):
+        """
+        Creates a new input handler for the given recording.
+
+        :param replay: the recording to play back
+        :type replay:  :class:`GReplay`
+        """
+        GScriptedInput.__init__(self)
+        self._replay = replay
+        self._stream = replay.iterate()
+        self._dt = None
+
+    # PUBLIC METHODS
+    def advance(self):
+        """
+        Sets the keys held down to those of the next frame of the recording.
+        """
+        (self._dt, keys) = next(self._stream)
+        self._keystate = dict.fromkeys(keys,True)
+        self._keycount = len(keys)
+        self._frame += 1
+
+    def reset(self):
+        """
+        Rewinds the recording to frame 0 and releases every key.
+        """
+        GScriptedInput.reset(self)
+        self._stream = self._replay.iterate()
+        self._dt = None
@@ -0,0 +1,198 @@
+"""
+A headless runner for 2D game support.
+
+A :class:`GameApp` normally hands control to the Kivy event loop, which calls the
+methods ``update`` and ``draw`` at the configured ``fps``.  The class in this module
+drives those methods directly, in a tight loop and with a synthetic time step.  This
+allows a game to be measured at uncapped speed on a machine with no display.
+
+The runner should be used with the null backend (see :mod:`game2d.backend`), as there
+is no window for the Kivy backend to draw to.
+"""
+import time
+from .backend import HEADLESS
+from .app import GameApp
+from .gview import GScriptedInput
+
+
+class HeadlessRunner(object):
+    """
+    A class to step a :class:`GameApp` without an event loop.
+
+    Each frame is processed by :meth:`GameApp._refresh`, exactly as in the event loop:
+    the view is cleared, the game is updated (in fixed time steps, if the application
+    has a ``timestep``) and the game is drawn.  The runner totals the time of each of
+    these three phases (see :attr:`GameApp.timings`), and times the call to ``start``.
+    It also times each call to ``_refresh`` as a whole, which includes the work done
+    outside the three phases, such as the overlay and any instrumentation.  The frame
+    rate is based on this whole time.
+
+    The runner does not create the application.  You should construct the application
+    as usual (but never call ``run``), and pass it to the runner.
+
+    If the runner is given a :class:`GScriptedInput`, that handler replaces the input
+    attribute of the application, and it is advanced one frame before each update.  If
+    the handler scripts a time step (see :attr:`GScriptedInput.dt`), that time step is
+    used in place of :attr:`dt`.  If the application is recording (see
+    :meth:`GameApp.record`), every frame is captured.
+    """
+
+    # The names of the timed phases, in the order they are processed
+    PHASES = ('clear','update','draw')
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def app(self):
+        """
+        The application driven by this runner.
+
+        **Invariant**: Must be an instance of :class:`GameApp`
+        """
+        return self._app
+
+    @property
+    def dt(self):
+        """
+        The synthetic time since the last frame, in seconds.
+
+        **Invariant**: Must be an int or float > 0.
+        """
+        return self._dt
+
+    @property
+    def input(self):
+        """
+        The scripted input handler for the application, if any.
+
+        **Invariant**: Must be an instance of :class:`GScriptedInput` or None
+        """
+        return self._input
+
+    @property
+    def frames(self):
+        """
+        The number of frames processed so far.
+
+        **Invariant**: Must be an int >= 0.
+        """
+        return self._frames
+
+    @property
+    def elapsed(self):
+        """
+        The wall-clock time spent processing frames, in seconds.
+
+        This is the time of each whole call to ``_refresh``, so it includes the
+        overlay and any instrumentation.  It does not include the time to start the
+        application.
+
+        **Invariant**: Must be a float >= 0.
+        """
+        return self._elapsed
+
+    @property
+    def fps(self):
+        """
+        The number of frames processed per second of wall-clock time.
+
+        **Invariant**: Must be a float >= 0.
+        """
+        elapsed = self.elapsed
+        return self._frames/elapsed if elapsed > 0 else 0.0
+
+    # BUILT-IN METHODS
+    def __init__(self,app,dt=None,input=None):
+        """
+        Creates a new runner for the given application.
+
+        The time step defaults to one frame at the ``fps`` of the application.
+
+        :param app: the application to drive
+        :type app:  :class:`GameApp`
+
+        :param dt: the time since the last frame (optional)
+        :type dt:  ``int`` or ``float`` > 0
+
+        :param input: the scripted input for the application (optional)
+        :type input:  :class:`GScriptedInput`
+        """
+        assert isinstance(app,GameApp), '%s is not a GameApp' % repr(app)
+        assert dt is None or (type(dt) in [int,float] and dt > 0), 'dt %s is not a positive number' % repr(dt)
+        assert input is None or isinstance(input,GScriptedInput), '%s is not a GScriptedInput' % repr(input)
+        assert HEADLESS, 'HeadlessRunner requires GAME2D_BACKEND=null'
+        self._app = app
+        self._dt  = 1.0/app.fps if dt is None else dt
+        self._input = input
+        self._started = False
+        self._startup = 0.0
+        self._frames  = 0
+        self._totals  = dict.fromkeys(self.PHASES,0.0)
+        self._elapsed = 0.0
+
+    # PUBLIC METHODS
+    def start(self):
+        """
+        Builds the application and calls its ``start`` method.
+
+        This method does nothing if the application is already started.
+        """
+        if self._started:
+            return
+        self._app.run()
+        if not self._input is None:
+            self._app._input = self._input
+            self._input._register(self._app.view)
+        begin = time.perf_counter()
+        self._app._launch()
+        self._startup = time.perf_counter()-begin
+        self._started = True
+
+    def step(self):
+        """
+        Processes a single animation frame, timing the whole frame and each phase.
+        """
+        app = self._app
+        dt = self._dt
+        if not self._input is None:
+            self._input.advance()
+            if not self._input.dt is None:
+                dt = self._input.dt
+
+        begin = time.perf_counter()
+        app._refresh(dt)
+        self._elapsed += time.perf_counter()-begin
+        (clear, update, draw) = app.timings
+        totals = self._totals
+        totals['clear']  += clear
+        totals['update'] += update
+        totals['draw']   += draw
+        self._frames += 1
+
+    def run(self,frames):
+        """
+        Starts the application (if necessary) and processes the given number of frames.
+
+        :param frames: the number of frames to process
+        :type frames:  ``int`` >= 0
+        """
+        assert type(frames) == int and frames >= 0, 'frames %s is not a non-negative int' % repr(frames)
+        self.start()
+        for _ in range(frames):
+            self.step()
+
+    def report(self):
+        """
+        Returns: a multi-line summary of the frame rate and the per-phase timings.
+
+        Each phase is reported as its total time and its average time per frame.
+        The line ``other`` is the rest of the time in ``_refresh``, outside the phases.
+        """
+        lines = ['frames  %d in %.3f s (%.1f fps, dt %.4f s)' % (self._frames,self.elapsed,self.fps,self._dt),
+                 'start   %9.3f ms' % (self._startup*1000)]
+        count = max(self._frames,1)
+        for phase in self.PHASES:
+            total = self._totals[phase]
+            lines.append('%-7s %9.3f ms total %9.4f ms/frame' % (phase,total*1000,total*1000/count))
+        other = max(self._elapsed-sum(self._totals.values()),0.0)
+        lines.append('%-7s %9.3f ms total %9.4f ms/frame' % ('other',other*1000,other*1000/count))
+        return '\n'.join(lines)
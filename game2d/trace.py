@@ -0,0 +1,189 @@
+"""
+Trace-event export for 2D game support.
+
+The class in this module records nested timing spans and writes them in the Chrome
+trace-event format, so that a session can be opened in a trace viewer such as
+``chrome://tracing`` or https://ui.perfetto.dev.  :class:`GameApp` puts spans around
+each frame and its phases, and a game can add its own with::
+
+    with GTracer.span('Wave.update'):
+        ...
+
+When no tracer is active, :meth:`GTracer.span` returns a shared object that does
+nothing, so spans can be left in the game at (almost) no cost.
+"""
+import os
+import json
+import time
+import threading
+
+
+class _NullSpan(object):
+    """
+    A span that records nothing, used when no tracer is active.
+    """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self,type,value,tb):
+        return False
+
+
+class _Span(object):
+    """
+    A span that adds one complete event to a tracer when it exits.
+    """
+
+    def __init__(self,tracer,name,args):
+        self._tracer = tracer
+        self._name = name
+        self._args = args
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self,type,value,tb):
+        self._tracer._add(self._name,self._start,time.perf_counter(),self._args)
+        return False
+
+
+# The span returned when no tracer is active
+_NULL_SPAN = _NullSpan()
+
+
+class GTracer(object):
+    """
+    A class to record timing spans and write them as Chrome trace events.
+
+    Only one tracer is active at a time, and it is the one that :meth:`span` records
+    to.  A tracer is active from the time it is created until it is closed, at which
+    point it writes its file.  Each span becomes a complete (``"ph": "X"``) event, and
+    spans that nest in time are shown nested by the viewer.
+
+    To bound its memory, a tracer stops recording after ``limit`` events.
+    """
+
+    # The tracer that spans are recorded to, if any
+    _active = None
+
+    # CLASS METHODS
+    @classmethod
+    def span(cls,name,args=None):
+        """
+        Returns: a context manager that times its block as a span with the given name
+
+        If no tracer is active, this returns a shared span that records nothing.
+
+        :param name: the name of the span
+        :type name:  ``str``
+
+        :param args: extra values to show with the span (optional)
+        :type args:  ``dict``
+        """
+        tracer = cls._active
+        if tracer is None:
+            return _NULL_SPAN
+        return _Span(tracer,name,args)
+
+    @classmethod
+    def active(cls):
+        """
+        Returns: the active tracer, or None if no tracer is active
+        """
+        return cls._active
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def path(self):
+        """
+        The name of the file to write.
+
+        **Invariant**: Must be a string.
+        """
+        return self._path
+
+    @property
+    def events(self):
+        """
+        The number of events recorded so far.
+
+        **Invariant**: Must be an int >= 0.
+        """
+        return len(self._events)
+
+    # BUILT-IN METHODS
+    def __init__(self,path,limit=1000000):
+        """
+        Creates a new tracer and makes it the active one.
+
+        :param path: the name of the .json file to write
+        :type path:  ``str``
+
+        :param limit: the maximum number of events to record
+        :type limit:  ``int`` > 0
+        """
+        assert type(path) == str, 'path %s is not a string' % repr(path)
+        assert type(limit) == int and limit > 0, 'limit %s is not a positive int' % repr(limit)
+        assert GTracer._active is None, 'a tracer is already active'
+        self._path = path
+        self._limit = limit
+        self._events = []
+        self._origin = time.perf_counter()
+        GTracer._active = self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self,type,value,tb):
+        self.close()
+        return False
+
+    # PUBLIC METHODS
+    def close(self):
+        """
+        Writes the trace file and deactivates this tracer.
+
+        This method does nothing if the tracer is already closed.
+        """
+        if not GTracer._active is self:
+            return
+        GTracer._active = None
+
+        pid = os.getpid()
+        threads = {}
+        for thread in threading.enumerate():
+            threads[thread.ident] = thread.name
+        records = []
+        for (name, start, stop, tid, args) in self._events:
+            event = {'name':name,'cat':'game','ph':'X','pid':pid,'tid':tid,
+                     'ts':(start-self._origin)*1e6,'dur':(stop-start)*1e6}
+            if not args is None:
+                event['args'] = args
+            records.append(event)
+        for tid in set(event[3] for event in self._events):
+            records.append({'name':'thread_name','ph':'M','pid':pid,'tid':tid,
+                            'args':{'name':threads.get(tid,str(tid))}})
+        with open(self._path,'w') as file:
+            json.dump({'traceEvents':records,'displayTimeUnit':'ms'},file)
+
+    # HIDDEN METHODS
+    def _add(self,name,start,stop,args):
+        """
+        Adds a complete event to this tracer.
+
+        :param name: the name of the span
+        :type name:  ``str``
+
+        :param start: the time the span started, from ``time.perf_counter``
+        :type start:  ``float``
+
+        :param stop: the time the span stopped, from ``time.perf_counter``
+        :type stop:  ``float``
+
+        :param args: extra values to show with the span
+        :type args:  ``dict`` or None
+        """
+        if len(self._events) < self._limit:
+            self._events.append((name,start,stop,threading.get_ident(),args))
@@ -0,0 +1,218 @@
+"""
+A frame-spike sampler for 2D game support.
+
+Averages hide hitches: a single frame that takes 80 ms barely moves the mean of a
+thousand frames, but the player sees it.  The class in this module runs a watchdog
+thread next to the game.  Whenever an animation frame runs past its budget, the thread
+samples the stack of the game thread a few times while the frame is still running.
+When the frame ends, the samples are logged with the frame number and a snapshot of
+the game state, so that a spike can be traced to the code that caused it.
+"""
+import sys
+import time
+import threading
+import traceback
+
+
+class GWatchdog(object):
+    """
+    A class to sample the stack of the game thread when a frame runs over budget.
+
+    The game thread calls :meth:`begin` at the start of each frame and :meth:`end` at
+    its finish.  Everything else happens on the watchdog thread, which sleeps until the
+    frame would be over budget.  If the frame is still running then, the watchdog takes
+    up to ``samples`` stack samples, ``interval`` seconds apart, and stops when the frame
+    ends.  Each sample is kept as soon as it is taken, so a frame that ends part way
+    through still has the samples taken so far.  The report is written by :meth:`end`
+    on the game thread, so the snapshot function never races the game.
+
+    Every frame that takes longer than the budget counts as a spike and is reported,
+    even if it ended before the watchdog thread got to sample it.
+
+    Identical stacks are merged in the report, with a count of how many samples they
+    account for.  The innermost call is last, as in a traceback.
+
+    The watchdog thread can only run when the game thread gives up the interpreter
+    lock, which it does every ``sys.getswitchinterval()`` seconds (5 ms by default).
+    So the first sample of a frame may come a few milliseconds after the budget.
+    """
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def budget(self):
+        """
+        The time a frame may take before it is sampled, in seconds.
+
+        **Invariant**: Must be a float > 0.
+        """
+        return self._budget
+
+    @property
+    def spikes(self):
+        """
+        The number of frames that have run over budget.
+
+        **Invariant**: Must be an int >= 0.
+        """
+        return self._spikes
+
+    @property
+    def frame(self):
+        """
+        The number of the current (or last) frame, counting from 0.
+
+        **Invariant**: Must be an int >= -1.
+        """
+        return self._frame
+
+    # BUILT-IN METHODS
+    def __init__(self,budget,samples=5,interval=0.002,path=None,snapshot=None):
+        """
+        Creates and starts a new watchdog.
+
+        :param budget: the time a frame may take before it is sampled, in seconds
+        :type budget:  ``int`` or ``float`` > 0
+
+        :param samples: the maximum number of stack samples per frame
+        :type samples:  ``int`` > 0
+
+        :param interval: the time between stack samples, in seconds
+        :type interval:  ``int`` or ``float`` > 0
+
+        :param path: the name of the file to append reports to (default standard error)
+        :type path:  ``str``
+
+        :param snapshot: a function returning the game state, as a dictionary
+        :type snapshot:  function with no arguments, or None
+        """
+        assert type(budget) in [int,float] and budget > 0, 'budget %s is not a positive number' % repr(budget)
+        assert type(samples) == int and samples > 0, 'samples %s is not a positive int' % repr(samples)
+        assert type(interval) in [int,float] and interval > 0, 'interval %s is not a positive number' % repr(interval)
+        assert path is None or type(path) == str, 'path %s is not a string' % repr(path)
+        assert snapshot is None or callable(snapshot), '%s is not a function' % repr(snapshot)
+        self._budget = float(budget)
+        self._samples = samples
+        self._interval = interval
+        self._path = path
+        self._snapshot = snapshot
+        self._spikes = 0
+
+        # Shared with the watchdog thread
+        self._frame = -1
+        self._started = None
+        self._thread = None
+        self._stacks = []
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        self._watcher = threading.Thread(target=self._watch,name='GWatchdog')
+        self._watcher.daemon = True
+        self._watcher.start()
+
+    # PUBLIC METHODS
+    def begin(self):
+        """
+        Marks the start of a frame on the game thread.
+        """
+        with self._lock:
+            self._thread = threading.get_ident()
+            self._stacks = []
+            self._frame += 1
+            self._started = time.perf_counter()
+        self._wake.set()
+
+    def end(self):
+        """
+        Marks the end of a frame on the game thread, reporting it if it was over budget.
+        """
+        with self._lock:
+            elapsed = time.perf_counter()-self._started
+            self._started = None
+            stacks = self._stacks
+        if elapsed > self._budget or stacks:
+            self._spikes += 1
+            self._report(elapsed,stacks)
+
+    def close(self):
+        """
+        Stops the watchdog thread.
+        """
+        self._closed = True
+        self._wake.set()
+        self._watcher.join()
+
+    # HIDDEN METHODS
+    def _watch(self):
+        """
+        Runs the watchdog thread, sampling every frame that runs over budget.
+        """
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            if self._closed:
+                return
+            frame = self._frame
+            started = self._started
+            if started is None:
+                continue
+
+            delay = started+self._budget-time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            for _ in range(self._samples):
+                stack = sys._current_frames().get(self._thread)
+                if stack is None:
+                    break
+                sample = traceback.extract_stack(stack)
+                with self._lock:
+                    if not self._running(frame,started):
+                        break
+                    self._stacks.append(sample)
+                time.sleep(self._interval)
+
+    def _running(self,frame,started):
+        """
+        Returns: True if the given frame is still running
+
+        :param frame: the number of the frame
+        :type frame:  ``int``
+
+        :param started: the time the frame started
+        :type started:  ``float``
+        """
+        return not self._closed and self._frame == frame and self._started == started
+
+    def _report(self,elapsed,stacks):
+        """
+        Writes the report of a frame that ran over budget.
+
+        :param elapsed: the time the frame took, in seconds
+        :type elapsed:  ``float``
+
+        :param stacks: the stack samples of the frame
+        :type stacks:  ``list`` of ``traceback.StackSummary``
+        """
+        state = {} if self._snapshot is None else self._snapshot()
+        lines = ['frame %d took %.1f ms (budget %.1f ms) %s' %
+                 (self._frame,elapsed*1000,self._budget*1000,
+                  ' '.join('%s=%s' % (key,state[key]) for key in state))]
+        counts = {}
+        order  = []
+        for stack in stacks:
+            text = ''.join(traceback.format_list(stack))
+            if not text in counts:
+                counts[text] = 0
+                order.append(text)
+            counts[text] += 1
+        for text in order:
+            lines.append('  %d of %d samples:' % (counts[text],len(stacks)))
+            lines.append(text.rstrip('\n'))
+        if not stacks:
+            lines.append('  no samples: the frame ended before the watchdog could run')
+        report = '\n'.join(lines)+'\n'
+
+        if self._path is None:
+            sys.stderr.write(report)
+        else:
+            with open(self._path,'a') as file:
+                file.write(report)
@@ -0,0 +1,161 @@
+"""
+A script to run Alien Invaders without a window
+
+This script builds the Invaders application on the null backend and steps it at
+uncapped speed with a fixed time step, reporting the frame rate and the time spent
+clearing, updating and drawing.  It can be run on machines with no display:
+
+    python headless.py --frames=3600 --dt=0.0166
+
+The optional flags are
+
+    --frames=N    (the number of frames to process; default 3600)
+    --dt=SECONDS  (the time between frames; default 1/60)
+    --timestep=SECONDS (simulate in fixed time steps; default is one update per frame)
+    --maxsteps=N  (the cap on fixed time steps per frame; default 5)
+    --overlay=1   (draw the frame-time overlay, to measure its cost)
+    --metrics=FILE (write per-frame metrics to a .csv or .jsonl file)
+    --capture=N   (profile frames from frame N on, as if the profile key were pressed)
+    --profile=N   (the number of frames to profile; default 120)
+    --watch=SECONDS (sample the stack of every frame slower than this budget)
+    --spikes=FILE (write the stack samples to a file; default standard error)
+    --trace=FILE  (write the frame phases as Chrome trace events to a .json file)
+    --allocs=1    (report the call sites that allocate memory in each frame)
+    --gc=1        (hold back full garbage collections during play, and time them)
+    --census=N    (count the live graphics objects of each class every N frames)
+    --censusfile=FILE (write each count to a .jsonl file)
+    --seed=N      (the seed of the random module; default is unseeded)
+    --idle=1      (never press any keys; by default the script plays the game)
+    --record=FILE (record the session so that it can be replayed)
+    --replay=FILE (replay a recorded session instead, ignoring the other flags)
+
+Positional arguments still set the number of rows, aliens per row and alien speed,
+exactly as they do for the game itself.
+"""
+import os
+import sys
+import random
+
+# The backend must be chosen before game2d is imported
+os.environ['GAME2D_BACKEND'] = 'null'
+
+
+def autoplay(frames):
+    """
+    Returns: a scripted input that plays the game for the given number of frames
+
+    The script taps 'p' once a second (to start the game, or to continue after losing
+    a life), holds the spacebar to fire whenever it can, and sweeps the ship back and
+    forth across the screen.
+
+    Parameter frames: The number of frames to script
+    Precondition: frames is an int >= 0
+    """
+    from game2d import GScriptedInput
+    script = GScriptedInput()
+    for start in range(0,frames,60):
+        script.hold(start,start+1,'p')
+    if frames > 0:
+        script.press(0,'spacebar')
+    for start in range(0,frames,180):
+        script.hold(start,start+90,'left')
+        script.hold(start+90,start+180,'right')
+    return script
+
+
+def flag(name,default,convert):
+    """
+    Returns: the value of the command line flag --name=value, or default if it is absent
+
+    Parameter name: The name of the flag
+    Precondition: name is a nonempty string
+
+    Parameter default: The value to use when the flag is absent
+    Precondition: default is any value
+
+    Parameter convert: The function to convert the flag text
+    Precondition: convert is a function taking one string
+    """
+    prefix = '--'+name+'='
+    for arg in sys.argv[1:]:
+        if arg.startswith(prefix):
+            return convert(arg[len(prefix):])
+    return default
+
+
+if __name__ == '__main__':
+    from consts import *
+    from app import Invaders
+    from game2d import HeadlessRunner, GReplay
+
+    frames = flag('frames',3600,int)
+    dt = flag('dt',1.0/60,float)
+    seed = flag('seed',None,int)
+    idle = flag('idle',0,int)
+    record = flag('record',None,str)
+    replay = flag('replay',None,str)
+    timestep = flag('timestep',None,float)
+    maxsteps = flag('maxsteps',5,int)
+    overlay = bool(flag('overlay',0,int))
+    metrics = flag('metrics',None,str)
+    capture = flag('capture',None,int)
+    profile = flag('profile',120,int)
+    watch = flag('watch',None,float)
+    spikes = flag('spikes',None,str)
+    trace = flag('trace',None,str)
+    allocs = bool(flag('allocs',0,int))
+    collect = bool(flag('gc',0,int))
+    census = flag('census',None,int)
+    censusfile = flag('censusfile',None,str)
+
+    game = Invaders(width=GAME_WIDTH,height=GAME_HEIGHT,timestep=timestep,maxsteps=maxsteps,
+                    overlay=overlay,captureframes=profile)
+    if not metrics is None:
+        game.measure(metrics,max(frames,1))
+    if not watch is None:
+        game.watch(watch,path=spikes)
+    if not trace is None:
+        tracer = game.trace(trace)
+    if allocs:
+        game.track()
+    if collect:
+        game.managegc()
+    if not census is None:
+        game.census(census,censusfile)
+    if not replay is None:
+        with GReplay(replay) as session:
+            runner = session.play(game)
+    else:
+        recorder = None
+        if not record is None:
+            recorder = game.record(record,seed)
+        elif not seed is None:
+            random.seed(seed)
+        script = None if idle else autoplay(frames)
+        runner = HeadlessRunner(game,dt,script)
+        if not capture is None and capture < frames:
+            runner.run(capture)
+            game.capture()
+            runner.run(frames-capture)
+        else:
+            runner.run(frames)
+        if not recorder is None:
+            recorder.close()
+    print(runner.report())
+    if not trace is None:
+        tracer.close()
+    if allocs:
+        game.allocations.close()
+        print(game.allocations.report())
+    if collect:
+        game.collector.close()
+        print(game.collector.report())
+    if not census is None:
+        game.registry.close()
+        print(game.registry.report())
+    if not watch is None:
+        game.watchdog.close()
+        print('%d frames over the %.1f ms budget' % (game.watchdog.spikes,watch*1000))
+    if not metrics is None:
+        game.metrics.dump(metrics)
+        print(game.metrics.summary())
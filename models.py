@@ -9,6 +9,8 @@ Trisha Guttal, tkg32
 from consts import *
 from game2d import *
 import introcs
+import random
+import numpy as np
 
 # PRIMARY RULE: Models are not allowed to access anything in any module other than
 # consts.py.  If you need extra information from Gameplay, then it should be
@@ -18,6 +20,11 @@ import introcs
 class Ship(GImage):
     """
     A class to represent the game ship.
+
+    INSTANCE ATTRIBUTES:
+        _previous:  the x coordinate of the ship before the last update [float]
+        _proxy:     the image drawn in place of the ship when it is drawn between two
+                    updates [GImage, or None until needed]
     """
 
     # INITIALIZER TO CREATE A NEW SHIP
@@ -28,46 +35,83 @@ class Ship(GImage):
         The ship is an image that shoots bolts. It is controlled by the player.
         """
         super().__init__(x=GAME_WIDTH/2, y=SHIP_BOTTOM, width=SHIP_WIDTH, height=SHIP_HEIGHT, source='ship.png')
+        self._previous = self.x
+        self._proxy = None
 
     # METHODS TO MOVE THE SHIP AND CHECK FOR COLLISIONS
-    def shipright(self):
+    def shipright(self, dt):
         """
-        This method moves the ship right by SHIP_MOVEMENT steps.
+        This method moves the ship right at SHIP_MOVEMENT pixels per second.
+
+        It stops the ship at the right boundary, so that it never goes beyond this
+        boundary and off the screen, however long the frame was.
 
-        It checks if the ship is not at the right boundary, and stops it from
-        going beyond this boundary and off the screen.
+        Parameter dt: The time in seconds since last update
+        Precondition: dt is a number (int or float) >= 0
         """
-        if self.x+SHIP_WIDTH/2 < GAME_WIDTH:
-            self.x = self.x + SHIP_MOVEMENT
-        else:
-            self.x = GAME_WIDTH - SHIP_WIDTH/2
+        self.x = min(self.x + SHIP_MOVEMENT*dt, GAME_WIDTH - SHIP_WIDTH/2)
 
-    def shipleft(self):
+    def shipleft(self, dt):
         """
-        This method moves the ship leftt by SHIP_MOVEMENT steps.
+        This method moves the ship left at SHIP_MOVEMENT pixels per second.
 
-        It checks if the ship is not at the left boundary, and stops it from
-        going beyond this boundary and off the screen.
+        It stops the ship at the left boundary, so that it never goes beyond this
+        boundary and off the screen, however long the frame was.
+
+        Parameter dt: The time in seconds since last update
+        Precondition: dt is a number (int or float) >= 0
         """
-        if self.x-SHIP_WIDTH/2 > 0:
-            self.x = self.x - SHIP_MOVEMENT
-        else:
-            self.x = SHIP_WIDTH/2
+        self.x = max(self.x - SHIP_MOVEMENT*dt, SHIP_WIDTH/2)
+
+    def remember(self):
+        """
+        Records the position of the ship, before an update moves it.
+        """
+        self._previous = self.x
+
+    def draw(self, view, alpha=1.0):
+        """
+        Draws the ship at the given fraction of the way from its previous position.
 
-    def collides(self,bolt):
+        The ship itself stays where the simulation put it, as it is used to test for
+        collisions. When it is drawn between two updates, a copy of the ship is
+        moved to the blended position and drawn instead.
+
+        Parameter view: the view to draw to
+        Precondition: view is a GView
+
+        Parameter alpha: the fraction of the way from the previous position
+        Precondition: alpha is a number in 0..1
         """
-        Returns: True if the bolt was fired by the alien and collides with this ship
+        if alpha >= 1 or self._previous == self.x:
+            super().draw(view)
+            return
+        if self._proxy is None:
+            self._proxy = GImage(x=self.x, y=self.y, width=SHIP_WIDTH, height=SHIP_HEIGHT, source='ship.png')
+        self._proxy.x = self._previous*(1-alpha) + self.x*alpha
+        self._proxy.draw(view)
+
+    def collidesPath(self,x,y0,y1):
+        """
+        Returns: True if a bolt moving from (x,y0) to (x,y1) collides with this ship
+
+        The whole path of the bolt is tested, so a fast bolt or a long frame cannot
+        carry a bolt through the ship. The bolt and the ship touch if their rectangles
+        overlap at any point along the path.
 
-        Parameter bolt: The laser bolt to check
-        Precondition: bolt is of class Bolt
+        Parameter x: the x coordinate of the bolt center
+        Precondition: x is a number (int or float)
+
+        Parameter y0: the y coordinate of the bolt center before the step
+        Precondition: y0 is a number (int or float)
+
+        Parameter y1: the y coordinate of the bolt center after the step
+        Precondition: y1 is a number (int or float)
         """
-        if bolt.isPlayerBolt() == False:
-            if self.contains((bolt.x - BOLT_WIDTH/2,bolt.y + BOLT_HEIGHT/2)) \
-            or self.contains((bolt.x - BOLT_WIDTH/2,bolt.y - BOLT_HEIGHT/2)) \
-            or self.contains((bolt.x + BOLT_WIDTH/2,bolt.y + BOLT_HEIGHT/2)) \
-            or self.contains((bolt.x + BOLT_WIDTH/2,bolt.y - BOLT_HEIGHT/2)):
-                return True
-        return False
+        if abs(x - self.x) >= (SHIP_WIDTH + BOLT_WIDTH)/2:
+            return False
+        reach = (SHIP_HEIGHT + BOLT_HEIGHT)/2
+        return min(y0,y1) - reach < self.y < max(y0,y1) + reach
 
 
 class Alien(GSprite):
@@ -80,10 +124,13 @@ class Alien(GSprite):
         """
         Initializes the Alien class.
 
-        Parameter x: the x value of the alien on the screen.
+        Aliens are drawn inside the wave's formation scene, so their position is
+        relative to the alien in the first column of the top row.
+
+        Parameter x: the x value of the alien in the formation.
         Precondition: x is an integer value
 
-        Parameter y: the y value of the alien on the screen.
+        Parameter y: the y value of the alien in the formation.
         Precondition: y is an integer value
 
         Paramter source: the image source.
@@ -91,28 +138,311 @@ class Alien(GSprite):
         """
         super().__init__(x=x,y=y,width=ALIEN_WIDTH,height=ALIEN_HEIGHT,source=source, format=(3,2))
 
-    # METHOD TO CHECK FOR COLLISION (IF DESIRED)
-    def collides(self,bolt):
+
+class Formation(object):
+    """
+    A class to store the positions and living aliens of a wave as NumPy arrays.
+
+    The aliens sit on a grid that only ever moves as a whole. The alien in row r and
+    column c is at (x + c*ALIEN_COL_STEP, y - r*ALIEN_ROW_STEP), where (x,y) is the
+    position of the alien in the first column of the top row. Row 0 is the top row.
+
+    Stepping and hit tests are array operations, and the edges, the lowest row and
+    the alien count are cached. None of them loop over the aliens in Python, so a
+    formation can have thousands of aliens.
+
+    INSTANCE ATTRIBUTES:
+        _x:         the x coordinate of the first column [float]
+        _y:         the y coordinate of the top row [float]
+        _previous:  the (x, y) of the formation before the last update [tuple of float]
+        _alive:     whether each alien is still alive [numpy array of bool, rows x cols]
+        _frame:     the animation frame shared by every alien [int 0 or 1]
+        _colcount:  the number of living aliens in each column [numpy array of int]
+        _rowcount:  the number of living aliens in each row [numpy array of int]
+        _count:     the number of living aliens [int >= 0]
+        _left:      the leftmost column with a living alien [int, -1 if no aliens]
+        _right:     the rightmost column with a living alien [int, -1 if no aliens]
+        _bottom:    the lowest row with a living alien [int, -1 if no aliens]
+        _colbottom: the lowest living row in each column [numpy array of int, -1 if empty]
+        _firecols:  the columns that still have a living alien, in any order [list of int]
+        _firepos:   the position of each column in _firecols [list of int, -1 if empty]
+        _upto:      the lowest living row at or above each cell, for bolts moving up
+                    [numpy array of int, rows x cols, -1 if none; None until needed]
+        _downto:    the highest living row at or below each cell, for bolts moving down
+                    [numpy array of int, rows x cols, rows if none; None until needed]
+    """
+
+    # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
+    def getRows(self):
+        """
+        Returns the number of rows in this formation.
+        """
+        return self._alive.shape[0]
+
+    def getCols(self):
+        """
+        Returns the number of columns in this formation.
+        """
+        return self._alive.shape[1]
+
+    def getX(self):
+        """
+        Returns the x coordinate of the first column.
+        """
+        return self._x
+
+    def getY(self):
+        """
+        Returns the y coordinate of the top row.
+        """
+        return self._y
+
+    def getCount(self):
+        """
+        Returns the number of living aliens.
+        """
+        return self._count
+
+    def getLeft(self):
+        """
+        Returns the x coordinate of the leftmost living alien, or None if there are none.
+        """
+        if self._left < 0:
+            return None
+        return self._x + self._left*ALIEN_COL_STEP
+
+    def getRight(self):
+        """
+        Returns the x coordinate of the rightmost living alien, or None if there are none.
+        """
+        if self._right < 0:
+            return None
+        return self._x + self._right*ALIEN_COL_STEP
+
+    def getBottom(self):
+        """
+        Returns the y coordinate of the lowest living alien, or None if there are none.
+        """
+        if self._bottom < 0:
+            return None
+        return self._y - self._bottom*ALIEN_ROW_STEP
+
+    def getPosition(self, alpha=1.0):
+        """
+        Returns the (x, y) of the first column and top row, blended with the previous one.
+
+        The result is the given fraction of the way from where the formation was
+        before the last update to where it is now.
+
+        Parameter alpha: the fraction of the way from the previous position
+        Precondition: alpha is a number in 0..1
+        """
+        x0, y0 = self._previous
+        return (x0 + (self._x - x0)*alpha, y0 + (self._y - y0)*alpha)
+
+    def getFrame(self):
+        """
+        Returns the animation frame of the aliens.
+
+        The aliens all step together, so they are always on the same frame.
+        """
+        return self._frame
+
+    def isAlive(self, row, col):
+        """
+        Returns True if the alien at the given row and column is alive.
+
+        Parameter row: the row of the alien
+        Precondition: row is an int in 0..getRows()-1
+
+        Parameter col: the column of the alien
+        Precondition: col is an int in 0..getCols()-1
+        """
+        return bool(self._alive[row, col])
+
+    # INITIALIZER TO CREATE A FORMATION
+    def __init__(self, rows, cols, x, y):
+        """
+        Initializes a formation where every alien is alive.
+
+        Parameter rows: the number of rows of aliens
+        Precondition: rows is an int > 0
+
+        Parameter cols: the number of aliens in each row
+        Precondition: cols is an int > 0
+
+        Parameter x: the x coordinate of the first column
+        Precondition: x is a number (int or float)
+
+        Parameter y: the y coordinate of the top row
+        Precondition: y is a number (int or float)
+        """
+        self._x = x
+        self._y = y
+        self._previous = (x, y)
+        self._alive = np.ones((rows, cols), dtype=bool)
+        self._frame = 0
+        self._colcount = np.full(cols, rows)
+        self._rowcount = np.full(rows, cols)
+        self._count = rows*cols
+        self._left = 0
+        self._right = cols-1
+        self._bottom = rows-1
+        self._colbottom = np.full(cols, rows-1)
+        self._firecols = list(range(cols))
+        self._firepos = list(range(cols))
+        self._upto = None
+        self._downto = None
+
+    # METHODS TO MOVE, HIT AND REMOVE ALIENS
+    def remember(self):
+        """
+        Records the position of the formation, before an update moves it.
+        """
+        self._previous = (self._x, self._y)
+
+    def step(self, dx, dy):
+        """
+        Moves the whole formation and advances the aliens to their next animation frame.
+
+        Parameter dx: the number of pixels to move right
+        Precondition: dx is a number (int or float)
+
+        Parameter dy: the number of pixels to move up
+        Precondition: dy is a number (int or float)
+        """
+        self._x = self._x + dx
+        self._y = self._y + dy
+        self._frame ^= 1
+
+    def hitsPath(self, xs, y0s, y1s):
+        """
+        Returns the rows and columns of the first living aliens hit by moving bolts.
+
+        Bolt i moved straight up or down from (xs[i], y0s[i]) to (xs[i], y1s[i]) this
+        step. The whole path is tested, not just where the bolt ended up, so a fast
+        bolt or a long frame cannot carry a bolt through an alien. If the path crosses
+        more than one living alien, the first one the bolt reached is returned.
+
+        The result is a pair of int arrays with one entry per bolt; a bolt that hits
+        nothing has row and column -1. A bolt and an alien touch if their rectangles
+        overlap.
+
+        Parameter xs: the x coordinates of the bolt centers
+        Precondition: xs is a sequence of numbers
+
+        Parameter y0s: the y coordinates of the bolt centers before the step
+        Precondition: y0s is a sequence of numbers the same length as xs
+
+        Parameter y1s: the y coordinates of the bolt centers after the step
+        Precondition: y1s is a sequence of numbers the same length as xs
+        """
+        xs = np.asarray(xs, dtype=float)
+        y0s = np.asarray(y0s, dtype=float)
+        y1s = np.asarray(y1s, dtype=float)
+        rows = self.getRows()
+        cols = self.getCols()
+        reach_x = (ALIEN_WIDTH + BOLT_WIDTH)/2
+        reach_y = (ALIEN_HEIGHT + BOLT_HEIGHT)/2
+
+        # Bolts only move vertically, so each one can only touch one column
+        col = np.rint((xs - self._x)/ALIEN_COL_STEP).astype(int)
+        found = (col >= 0) & (col < cols) & (np.abs(xs - self._x - col*ALIEN_COL_STEP) < reach_x)
+        col = np.where(found, col, 0)
+
+        # The rows whose rectangles overlap the swept path (row 0 is the highest)
+        low = np.minimum(y0s, y1s)
+        high = np.maximum(y0s, y1s)
+        first = np.floor((self._y - high - reach_y)/ALIEN_ROW_STEP).astype(int) + 1
+        last = np.ceil((self._y - low + reach_y)/ALIEN_ROW_STEP).astype(int) - 1
+        first = np.maximum(first, 0)
+        last = np.minimum(last, rows-1)
+        found &= first <= last
+
+        # A bolt moving up reaches the lowest living row first, and one moving down the highest
+        up = y1s >= y0s
+        upto, downto = self._reach()
+        row = np.where(up, upto[np.clip(last, 0, rows-1), col], downto[np.clip(first, 0, rows-1), col])
+        found &= (row >= first) & (row <= last)
+        return np.where(found, row, -1), np.where(found, col, -1)
+
+    def shooter(self):
+        """
+        Returns the (row, column) of the alien that fires next, or None if there are none.
+
+        A column with a living alien is picked at random, and the lowest living alien
+        in that column fires, as nothing is below it to block the shot. Both lookups
+        are cached, so picking a shooter does not scan the formation.
         """
-        Returns: True if the bolt was fired by the player and collides with this alien
+        if self._firecols == []:
+            return None
+        col = random.choice(self._firecols)
+        return (int(self._colbottom[col]), col)
 
-        Parameter bolt: The laser bolt to check
-        Precondition: bolt is of class Bolt
+    def kill(self, row, col):
         """
-        if bolt.isPlayerBolt() == True:
-            if self.contains((bolt.x - BOLT_WIDTH/2,bolt.y + BOLT_HEIGHT/2)) \
-            or self.contains((bolt.x - BOLT_WIDTH/2,bolt.y - BOLT_HEIGHT/2)) \
-            or self.contains((bolt.x + BOLT_WIDTH/2,bolt.y + BOLT_HEIGHT/2)) \
-            or self.contains((bolt.x + BOLT_WIDTH/2,bolt.y - BOLT_HEIGHT/2)):
-                return True
-        return False
+        Removes the alien at the given row and column from the formation.
+
+        The counts go down by one, and an emptied column is taken out of the columns
+        that can fire. If this empties an edge column or the lowest row, that edge
+        moves to the next column or row with a living alien. If it was the lowest
+        alien in its column, the next living alien up that column becomes the lowest.
+
+        Parameter row: the row of the alien to remove
+        Precondition: row is an int and the alien at (row, col) is alive
+
+        Parameter col: the column of the alien to remove
+        Precondition: col is an int and the alien at (row, col) is alive
+        """
+        self._alive[row, col] = False
+        self._count -= 1
+        self._rowcount[row] -= 1
+        self._colcount[col] -= 1
+        if self._colbottom[col] == row:
+            above = np.flatnonzero(self._alive[:row, col])
+            self._colbottom[col] = above[-1] if len(above) > 0 else -1
+        if self._colcount[col] == 0:
+            pos = self._firepos[col]
+            last = self._firecols.pop()
+            if last != col:
+                self._firecols[pos] = last
+                self._firepos[last] = pos
+            self._firepos[col] = -1
+            cols = np.flatnonzero(self._colcount)
+            self._left = int(cols[0]) if len(cols) > 0 else -1
+            self._right = int(cols[-1]) if len(cols) > 0 else -1
+        if self._rowcount[row] == 0:
+            rows = np.flatnonzero(self._rowcount)
+            self._bottom = int(rows[-1]) if len(rows) > 0 else -1
+        self._upto = None
+        self._downto = None
+
+    def _reach(self):
+        """
+        Returns the tables of the nearest living rows used by hitsPath().
+
+        The first table holds, for each cell, the largest living row at or above it in
+        its column (-1 if none), which is the first alien a bolt moving up from that
+        cell reaches. The second holds the smallest living row at or below it (getRows()
+        if none), for bolts moving down. The tables are rebuilt only after an alien
+        has been killed.
+        """
+        if self._upto is None:
+            rows = self.getRows()
+            index = np.arange(rows)[:, np.newaxis]
+            self._upto = np.maximum.accumulate(np.where(self._alive, index, -1), axis=0)
+            below = np.where(self._alive, index, rows)[::-1]
+            self._downto = np.minimum.accumulate(below, axis=0)[::-1]
+        return self._upto, self._downto
 
 
 class Bolt(GRectangle):
     """
-    A class representing a laser bolt.
+    A class representing the image of a laser bolt.
+
+    Bolts do not move themselves. Their positions live in a BoltField, which
+    copies them into Bolt objects only when the bolts are drawn.
     """
-    # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
 
     def __init__(self,x,y):
         """
@@ -125,28 +455,184 @@ class Bolt(GRectangle):
         Precondition: y is an integer value
         """
         super().__init__(x=x, y=y , width=BOLT_WIDTH, height=BOLT_HEIGHT, fillcolor= introcs.RGB(255, 255, 255))
-        self._velocity = 0
-        if self.y + BOLT_HEIGHT/2 < DEFENSE_LINE:
-            self._velocity = BOLT_SPEED
-        else:
-            self._velocity = -BOLT_SPEED
 
-    # ADD MORE METHODS (PROPERLY SPECIFIED) AS NECESSARY
-    def isout(self):
+
+class BoltField(object):
+    """
+    A class to store all of the laser bolts on screen as parallel arrays.
+
+    Bolt i is described by slot i of each array, and only the first _count slots are
+    in use. Moving the bolts is a single array operation. Bolts that leave the screen
+    or hit something are removed in bulk by moving the last bolts into their slots.
+
+    INSTANCE ATTRIBUTES:
+        _x:         the x coordinate of each bolt [numpy array of float]
+        _y:         the y coordinate of each bolt [numpy array of float]
+        _y0:        the y coordinate of each bolt before the last move [numpy array of float]
+        _velocity:  the number of pixels each bolt moves per second [numpy array of float]
+        _owner:     whether each bolt was fired by the player [numpy array of bool]
+        _alive:     whether each bolt is still in play [numpy array of bool]
+        _count:     the number of slots in use [int >= 0]
+        _proxies:   the Bolt objects used to draw the bolts [list of Bolt, possibly empty]
+    """
+
+    def __init__(self, capacity=16):
         """
-        Returns True if the current bolt is beyond the game's screen.
+        Initializes an empty BoltField.
+
+        Parameter capacity: the number of bolts to make room for at the start
+        Precondition: capacity is an int > 0
         """
-        if self.y + BOLT_HEIGHT/2 > GAME_HEIGHT or self.y + BOLT_HEIGHT/2 < 0:
-            return True
+        self._x = np.zeros(capacity)
+        self._y = np.zeros(capacity)
+        self._y0 = np.zeros(capacity)
+        self._velocity = np.zeros(capacity)
+        self._owner = np.zeros(capacity, dtype=bool)
+        self._alive = np.zeros(capacity, dtype=bool)
+        self._count = 0
+        self._proxies = []
 
-    def isPlayerBolt(self):
+    def __len__(self):
+        """
+        Returns the number of bolts currently in the field.
         """
-        Returns True if the current bolt has been released by the ship.
+        return self._count
 
-        Checks if the bolt has a positive speed value, therefore implying that
-        the bolt has been released upwards by the ship.
+    def fire(self, x, y, player):
         """
-        if self._velocity == BOLT_SPEED:
-            return True
+        Adds a new bolt to the field.
+
+        Player bolts move up and alien bolts move down at BOLT_SPEED pixels per second.
+
+        Parameter x: the x value of the bolt on the screen.
+        Precondition: x is a number (int or float)
+
+        Parameter y: the y value of the bolt on the screen.
+        Precondition: y is a number (int or float)
+
+        Parameter player: whether the bolt was fired by the ship
+        Precondition: player is a bool
+        """
+        if self._count == len(self._x):
+            self.grow()
+        n = self._count
+        self._x[n] = x
+        self._y[n] = y
+        self._y0[n] = y
+        self._velocity[n] = BOLT_SPEED if player else -BOLT_SPEED
+        self._owner[n] = player
+        self._alive[n] = True
+        self._count = n+1
+
+    def grow(self):
+        """
+        Doubles the number of bolts this field can hold.
+        """
+        size = 2*len(self._x)
+        self._x = np.resize(self._x, size)
+        self._y = np.resize(self._y, size)
+        self._y0 = np.resize(self._y0, size)
+        self._velocity = np.resize(self._velocity, size)
+        self._owner = np.resize(self._owner, size)
+        self._alive = np.resize(self._alive, size)
+
+    def hasPlayerBolt(self):
+        """
+        Returns True if a bolt fired by the ship is still in play.
+        """
+        n = self._count
+        return bool(np.any(self._owner[:n] & self._alive[:n]))
+
+    def items(self):
+        """
+        Returns a list of (index, x, y0, y, player) tuples, one for each bolt in play.
+
+        The bolt moved from (x, y0) to (x, y) in the last call to move(). The index
+        can be passed to kill() to remove that bolt.
+        """
+        live = np.flatnonzero(self._alive[:self._count])
+        return list(zip(live.tolist(), self._x[live].tolist(), self._y0[live].tolist(),
+                        self._y[live].tolist(), self._owner[live].tolist()))
+
+    def kill(self, index):
+        """
+        Marks the bolt at the given index as no longer in play.
+
+        The bolt is not removed until the next call to cull().
+
+        Parameter index: the slot of the bolt to remove
+        Precondition: index is an int, 0 <= index < len(self)
+        """
+        self._alive[index] = False
+
+    def remember(self):
+        """
+        Records the position of every bolt, before an update moves them.
+
+        Bolts that do not move in the update are then drawn where they are.
+        """
+        n = self._count
+        self._y0[:n] = self._y[:n]
+
+    def move(self, dt):
+        """
+        Moves every bolt by its velocity over the given time.
+
+        The old positions are kept, so that collisions can be tested along the path
+        each bolt took.
+
+        Parameter dt: The time in seconds since last update
+        Precondition: dt is a number (int or float) >= 0
+        """
+        n = self._count
+        self._y0[:n] = self._y[:n]
+        self._y[:n] += self._velocity[:n]*dt
+
+    def cull(self):
+        """
+        Removes every bolt that is off screen or has been killed.
+
+        A bolt is off screen if its top is above GAME_HEIGHT or below 0. The removed
+        slots are filled by moving the remaining bolts down from the end of the arrays,
+        so the bolts do not keep their order.
+        """
+        n = self._count
+        top = self._y[:n] + BOLT_HEIGHT/2
+        self._alive[:n] &= (top <= GAME_HEIGHT) & (top >= 0)
+        alive = self._alive[:n]
+        size = int(np.count_nonzero(alive))
+        if size == n:
+            return
+        holes = np.flatnonzero(~alive[:size])
+        moves = np.flatnonzero(alive[size:]) + size
+        for array in (self._x, self._y, self._y0, self._velocity, self._owner, self._alive):
+            array[holes] = array[moves]
+        self._count = size
+
+    def draw(self, view, alpha=1.0):
+        """
+        Draws the bolts to the view, the given fraction of the way along their last move.
+
+        The position of each bolt is copied into a Bolt object just before it is
+        drawn. These objects are kept and reused, so drawing does not create new
+        Bolt objects unless there are more bolts than ever before.
+
+        Parameter view: the view to draw to
+        Precondition: view is a GView
+
+        Parameter alpha: the fraction of the way from the previous position
+        Precondition: alpha is a number in 0..1
+        """
+        n = self._count
+        while len(self._proxies) < n:
+            self._proxies.append(Bolt(0, 0))
+        xs = self._x[:n].tolist()
+        if alpha >= 1:
+            ys = self._y[:n].tolist()
         else:
-            return False
+            ys = (self._y0[:n] + (self._y[:n] - self._y0[:n])*alpha).tolist()
+        for i in range(n):
+            proxy = self._proxies[i]
+            proxy.x = xs[i]
+            proxy.y = ys[i]
+            proxy.draw(view)
@@ -0,0 +1,201 @@
+"""
+A script to soak test Alien Invaders over a long session
+
+This script plays the game without a window, one game after another, for hours of game
+time at uncapped speed.  At the end of every game it takes a garbage collection and
+samples the resident memory, the live graphics objects of each class, the texture
+cache and the frame time percentiles of that game.  It then flags every measure that
+grew steadily from game to game, and exits with status 1 if there are any, so that it
+can be used as a regression gate against leaks that only show up after many waves:
+
+    python soak.py --hours=2 --output=soak.csv
+
+The optional flags are
+
+    --hours=H     (the hours of game time to play; default 1)
+    --waves=N     (stop after N games instead, if that comes first)
+    --dt=SECONDS  (the time between frames; default 1/60)
+    --seed=N      (the seed of the random module; default 0)
+    --warmup=N    (the games to ignore before looking for growth; default 2)
+    --slack=BYTES (the memory growth to allow before flagging it; default 1 MB)
+    --drift=RATIO (the growth of the p95 frame time to allow; default 0.25)
+    --output=FILE (write one row per game to a CSV file)
+
+Positional arguments still set the number of rows, aliens per row and alien speed,
+exactly as they do for the game itself.
+"""
+import os
+import sys
+import gc
+import random
+
+# The backend must be chosen before game2d is imported
+os.environ['GAME2D_BACKEND'] = 'null'
+
+# The most frames one game may last, in case the autopilot never ends it
+MAX_FRAMES = 100000
+
+
+def autopilot():
+    """
+    Returns: a scripted input that plays the game forever
+
+    The script repeats every three seconds. It taps 'p' once a second (to continue
+    after losing a life), holds the spacebar to fire whenever it can, and sweeps the
+    ship left and then right across the screen.
+    """
+    from game2d import GScriptedInput
+    script = GScriptedInput(period=180)
+    script.press(0,'spacebar')
+    script.release(0,'right')
+    script.press(0,'left')
+    script.release(90,'left')
+    script.press(90,'right')
+    for start in range(0,180,60):
+        script.press(start,'p')
+        script.release(start+1,'p')
+    return script
+
+
+def growing(values, slack):
+    """
+    Returns True if values never decrease, rise in at least half of the games and grow
+    by more than slack in total.
+
+    A measure that leaks rises from game to game, while a healthy one goes up and
+    down. So only a series that never falls is flagged, and a single step up (such
+    as a ship that happens to be alive at the end) is not enough.
+
+    Parameter values: The measure at the end of each game, in order
+    Precondition: values is a list of numbers with at least 2 elements
+
+    Parameter slack: The total growth to allow
+    Precondition: slack is a number >= 0
+    """
+    rises = 0
+    for pos in range(1,len(values)):
+        if values[pos] < values[pos-1]:
+            return False
+        if values[pos] > values[pos-1]:
+            rises += 1
+    return 2*rises >= len(values)-1 and values[-1]-values[0] > slack
+
+
+def drifting(values, ratio):
+    """
+    Returns True if the last third of values averages more than ratio above the first.
+
+    Frame times are noisy, so they are compared in thirds rather than game by game.
+
+    Parameter values: The frame time percentile of each game, in order
+    Precondition: values is a list of numbers with at least 3 elements
+
+    Parameter ratio: The relative growth to allow
+    Precondition: ratio is a number >= 0
+    """
+    third = len(values)//3
+    first = sum(values[:third])/third
+    last = sum(values[-third:])/third
+    return last > first*(1+ratio)
+
+
+def play(game, runner, registry, limit):
+    """
+    Returns a dictionary of measures for one game, played until it is complete.
+
+    The game is restarted first. The measures are taken after a full garbage
+    collection, so that only objects that are still referenced are counted.
+
+    Parameter game: The game to play
+    Precondition: game is a started Invaders object
+
+    Parameter runner: The runner stepping the game
+    Precondition: runner is a HeadlessRunner for game
+
+    Parameter registry: The registry of live graphics objects
+    Precondition: registry is the active GRegistry
+
+    Parameter limit: The most frames to play
+    Precondition: limit is an int > 0
+    """
+    import numpy as np
+    from consts import STATE_COMPLETE
+    from game2d import GameApp
+    from game2d.metrics import resident_memory
+
+    game.restart()
+    times = []
+    while len(times) < limit:
+        runner.step()
+        (clear, update, draw) = game.timings
+        times.append(clear+update+draw)
+        if game.getState() == STATE_COMPLETE:
+            break
+    complete = game.getState() == STATE_COMPLETE
+    gc.collect()
+    times = np.array(times)*1000
+    row = {'frames': len(times), 'complete': int(complete), 'p50': np.percentile(times,50),
+           'p95': np.percentile(times,95), 'p99': np.percentile(times,99),
+           'max': times.max(), 'rss': resident_memory(),
+           'textures': len(GameApp.TEXTURE_CACHE), 'instructions': game.view.instruction_count}
+    census = registry.census()
+    row['objects'] = sum(census[kind][0] for kind in census)
+    for kind in census:
+        row['live.'+kind] = census[kind][0]
+    return row
+
+
+if __name__ == '__main__':
+    from consts import *
+    from app import Invaders
+    from game2d import HeadlessRunner, GRegistry
+    from headless import flag
+
+    hours = flag('hours',1.0,float)
+    waves = flag('waves',None,int)
+    dt = flag('dt',1.0/60,float)
+    seed = flag('seed',0,int)
+    warmup = flag('warmup',2,int)
+    slack = flag('slack',1 << 20,int)
+    drift = flag('drift',0.25,float)
+    output = flag('output',None,str)
+
+    random.seed(seed)
+    registry = GRegistry()
+    game = Invaders(width=GAME_WIDTH,height=GAME_HEIGHT)
+    runner = HeadlessRunner(game,dt,autopilot())
+    runner.start()
+
+    rows = []
+    frames = int(hours*3600/dt)
+    while runner.frames < frames and (waves is None or len(rows) < waves):
+        row = play(game,runner,registry,min(MAX_FRAMES,frames-runner.frames))
+        row['wave'] = len(rows)+1
+        rows.append(row)
+        print('game %4d: %6d frames, p95 %.3f ms, rss %.1f MB, %d objects' %
+              (row['wave'],row['frames'],row['p95'],row['rss']/2**20,row['objects']))
+    registry.close()
+
+    columns = ['wave','complete','frames','p50','p95','p99','max','rss','textures','instructions','objects']
+    kinds = sorted(set(key for row in rows for key in row if key.startswith('live.')))
+    if output is not None:
+        with open(output,'w') as file:
+            file.write(','.join(columns+kinds)+'\n')
+            for row in rows:
+                file.write(','.join(str(row.get(key,0)) for key in columns+kinds)+'\n')
+
+    flagged = []
+    # A game cut short by the time limit is not comparable
+    measured = [row for row in rows[warmup:] if row['complete']]
+    if len(measured) >= 2:
+        for key in ['rss','textures','instructions','objects']+kinds:
+            series = [row.get(key,0) for row in measured]
+            if growing(series, slack if key == 'rss' else 0):
+                flagged.append('%s grew from %d to %d' % (key,series[0],series[-1]))
+    if len(measured) >= 3 and drifting([row['p95'] for row in measured], drift):
+        flagged.append('p95 frame time drifted upwards')
+
+    print('%d games, %d frames, %.1f hours of game time' % (len(rows),runner.frames,runner.frames*dt/3600))
+    for line in flagged:
+        print('FLAG: '+line)
+    sys.exit(1 if flagged else 0)
@@ -0,0 +1,246 @@
+"""
+A script to measure how a wave of Alien Invaders scales
+
+The command line arguments of the game cap a wave at 10 rows of 15 aliens.  This
+script builds waves directly instead, from a single alien up to thousands, and keeps
+a fixed number of laser bolts on the screen by firing new ones at random places as
+the old ones leave.  It times Wave.update and Wave.draw in every frame, and prints two
+scaling curves: frame time against the number of aliens (at a fixed number of bolts)
+and frame time against the number of bolts (for a fixed wave).  Each curve ends with
+its growth exponent, the slope of log time against log size, which is about 1 for
+linear work and 0 for constant work:
+
+    python stress.py --sizes=1x1,5x12,20x50,50x100 --bolts=0,100,1000
+
+The optional flags are
+
+    --sizes=LIST  (the waves to build, as ROWSxCOLS; default 1x1 to 50x100)
+    --bolts=LIST  (the bolt counts to test; default 0 to 1000)
+    --load=N      (the bolts on screen while the waves are measured; default 10)
+    --wave=RxC    (the wave used while the bolts are measured; default the game's)
+    --frames=N    (the frames to time for each point; default 120)
+    --warmup=N    (the frames to play before timing; default 10)
+    --dt=SECONDS  (the time between frames; default 1/60)
+    --seed=N      (the seed of the random module; default 0)
+    --output=FILE (write one row per point to a CSV file)
+
+Half of the bolts move up, as if fired by the ship, and are tested against the wave.
+They are aimed just outside the columns of the wave, so they go through every step of
+the hit test but never kill an alien, and each point times a full wave.  The alive
+column confirms this.  A wave wider than the screen starts past its right edge, so
+it steps down every time it turns, which is a larger share of the work than in play.
+
+The waves are drawn with Kivy if it can be imported and can open a window, exactly
+as in bench.py, so that the draw times include its instructions.  Otherwise they are
+drawn with the null backend, and the draw times only measure the game's own work.
+Set GAME2D_BACKEND=null to choose the null backend.  The backend is printed with
+each curve.
+"""
+import os
+import random
+
+# The default waves, as (rows, columns)
+SIZES = [(1,1),(2,5),(5,12),(10,15),(20,25),(20,50),(40,50),(50,100)]
+
+# The default numbers of bolts
+BOLTS = [0,1,10,100,300,1000]
+
+
+def size(text):
+    """
+    Returns the (rows, columns) pair written as ROWSxCOLS.
+
+    Parameter text: The text of the wave size, like '5x12'
+    Precondition: text is two positive ints separated by an 'x'
+    """
+    rows, cols = text.lower().split('x')
+    return (int(rows), int(cols))
+
+
+def listof(convert):
+    """
+    Returns a function that converts a comma separated list with convert.
+
+    Parameter convert: The function to convert each item
+    Precondition: convert is a function taking one string
+    """
+    return lambda text: [convert(item) for item in text.split(',') if item]
+
+
+def reload(wave, bolts):
+    """
+    Fires bolts at random places until the wave has the given number on screen.
+
+    Half of the new bolts move up and half move down. They start anywhere between
+    the defense line and the top of the screen. The bolts moving up are placed to
+    the left or right of the wave, with room for the wave to step towards them, so
+    they cannot hit an alien. The bolts moving down can still hit the ship.
+
+    Parameter wave: The wave to add bolts to
+    Precondition: wave is a Wave object
+
+    Parameter bolts: The number of bolts to keep on screen
+    Precondition: bolts is an int >= 0
+    """
+    from consts import (GAME_WIDTH, GAME_HEIGHT, DEFENSE_LINE, ALIEN_WIDTH,
+                        ALIEN_H_WALK, BOLT_WIDTH)
+    # Far enough that two steps towards the bolt still leave a gap
+    margin = (ALIEN_WIDTH + BOLT_WIDTH)/2 + 2*ALIEN_H_WALK
+    while wave.getBoltCount() < bolts:
+        y = random.uniform(DEFENSE_LINE,GAME_HEIGHT)
+        if wave.getBoltCount() % 2 == 0:
+            if random.random() < 0.5:
+                x = wave.getLeftAlien() - margin - random.uniform(0,GAME_WIDTH/4)
+            else:
+                x = wave.getRightAlien() + margin + random.uniform(0,GAME_WIDTH/4)
+            wave.fireBolt(x,y,True)
+        else:
+            wave.fireBolt(random.uniform(0,GAME_WIDTH),y,False)
+
+
+def measure(rows, cols, bolts, frames, warmup, dt):
+    """
+    Returns a dictionary with the frame times of a new wave under a load of bolts.
+
+    The bolts are topped up and the ship is replaced before every frame, outside of
+    the timing, so that every timed frame has the same load. Times are in milliseconds.
+    The update and draw times are means, so that they include the frames in which the
+    wave steps; p50 and p95 are percentiles of the whole frame.
+
+    Parameter rows: The number of rows of aliens
+    Precondition: rows is an int > 0
+
+    Parameter cols: The number of aliens in each row
+    Precondition: cols is an int > 0
+
+    Parameter bolts: The number of bolts to keep on screen
+    Precondition: bolts is an int >= 0
+
+    Parameter frames: The number of frames to time
+    Precondition: frames is an int > 0
+
+    Parameter warmup: The number of frames to play before timing
+    Precondition: warmup is an int >= 0
+
+    Parameter dt: The time between frames
+    Precondition: dt is a number > 0
+    """
+    import time
+    import numpy as np
+    from game2d import GView, GScriptedInput
+    from wave import Wave
+
+    clock = time.perf_counter
+    wave = Wave(rows, cols)
+    view = GView()
+    input = GScriptedInput()
+    update = []
+    draw = []
+    for frame in range(warmup+frames):
+        reload(wave, bolts)
+        if wave.getShip() is None:
+            wave.newShip()
+        view.clear()
+        start = clock()
+        wave.update(dt, input)
+        middle = clock()
+        wave.draw(view)
+        end = clock()
+        if frame >= warmup:
+            update.append(middle-start)
+            draw.append(end-middle)
+    update = np.array(update)*1000
+    draw = np.array(draw)*1000
+    total = update+draw
+    return {'rows': rows, 'cols': cols, 'aliens': rows*cols, 'bolts': bolts,
+            'alive': wave.getAlienCount(), 'update': update.mean(),
+            'draw': draw.mean(), 'p50': np.median(total), 'p95': np.percentile(total,95)}
+
+
+def exponent(sizes, times):
+    """
+    Returns the slope of log time against log size, or None if it cannot be fit.
+
+    Sizes of 0 cannot be put on a log scale, so they are left out.
+
+    Parameter sizes: The size of each point
+    Precondition: sizes is a list of numbers >= 0
+
+    Parameter times: The time of each point
+    Precondition: times is a list of numbers > 0, the same length as sizes
+    """
+    import numpy as np
+    points = [(n, t) for (n, t) in zip(sizes, times) if n > 0]
+    if len(points) < 2 or len(set(n for (n, t) in points)) < 2:
+        return None
+    logs = np.log([[n, t] for (n, t) in points])
+    return np.polyfit(logs[:,0], logs[:,1], 1)[0]
+
+
+def curve(title, rows, key):
+    """
+    Prints a table of frame times against one measure, and its growth exponent.
+
+    Parameter title: The heading of the table
+    Precondition: title is a string
+
+    Parameter rows: The measurements, in order
+    Precondition: rows is a list of dictionaries returned by measure
+
+    Parameter key: The measure on the x axis, either 'aliens' or 'bolts'
+    Precondition: key is a string and a key of every row
+    """
+    print(title)
+    print('%5s x %-5s %7s %7s %7s %11s %11s %11s %11s' %
+          ('rows','cols','aliens','bolts','alive','update avg','draw avg','p50 ms','p95 ms'))
+    for row in rows:
+        print('%5d x %-5d %7d %7d %7d %11.3f %11.3f %11.3f %11.3f' %
+              (row['rows'],row['cols'],row['aliens'],row['bolts'],row['alive'],
+               row['update'],row['draw'],row['p50'],row['p95']))
+    for part in ('update','draw'):
+        slope = exponent([row[key] for row in rows], [row[part] for row in rows])
+        if slope is not None:
+            print('%s grows as %s^%.2f' % (part,key,slope))
+    print('')
+
+
+if __name__ == '__main__':
+    from bench import choose
+    choose()
+    # The headless module selects the null backend, so game2d must be imported first
+    from game2d import GameApp
+    from game2d.backend import BACKEND as backend
+    from consts import *
+    from headless import flag
+
+    sizes = flag('sizes',SIZES,listof(size))
+    counts = flag('bolts',BOLTS,listof(int))
+    load = flag('load',10,int)
+    (rows, cols) = flag('wave',(ALIEN_ROWS,ALIENS_IN_ROW),size)
+    frames = flag('frames',120,int)
+    warmup = flag('warmup',10,int)
+    dt = flag('dt',1.0/60,float)
+    seed = flag('seed',0,int)
+    output = flag('output',None,str)
+
+    folder = os.path.dirname(os.path.abspath(__file__))
+    GameApp.images = os.path.join(folder,'Images')
+    GameApp.sounds = os.path.join(folder,'Sounds')
+    if backend == 'kivy':
+        # Kivy finds the textures and sounds through its resource path
+        import kivy.resources
+        kivy.resources.resource_add_path(GameApp.images)
+        kivy.resources.resource_add_path(GameApp.sounds)
+
+    random.seed(seed)
+    byaliens = [measure(r,c,load,frames,warmup,dt) for (r, c) in sizes]
+    curve('frame time against aliens, with %d bolts (%s backend)' % (load,backend), byaliens, 'aliens')
+    bybolts = [measure(rows,cols,n,frames,warmup,dt) for n in counts]
+    curve('frame time against bolts, with %d x %d aliens (%s backend)' % (rows,cols,backend), bybolts, 'bolts')
+
+    if output is not None:
+        columns = ['rows','cols','aliens','bolts','alive','update','draw','p50','p95']
+        with open(output,'w') as file:
+            file.write(','.join(columns)+'\n')
+            for row in byaliens+bybolts:
+                file.write(','.join(str(row[key]) for key in columns)+'\n')
@@ -0,0 +1,19 @@
+"""
+Shared setup for the Alien Invaders tests
+
+The tests run on the null backend, so they need no window, and import the game
+modules from the folder above this one. The game finds its images and sounds in
+the folders of the game, as it does when it is run.
+"""
+import os
+import sys
+
+# The backend must be chosen before game2d is imported
+os.environ['GAME2D_BACKEND'] = 'null'
+
+FOLDER = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, FOLDER)
+
+from game2d import GameApp
+GameApp.images = os.path.join(FOLDER,'Images')
+GameApp.sounds = os.path.join(FOLDER,'Sounds')
@@ -0,0 +1,181 @@
+"""
+Tests for the Formation and BoltField models
+"""
+import random
+from consts import *
+from models import Formation, BoltField
+
+
+def scan(formation):
+    """
+    Returns the edges, lowest row and count of a formation, found by looking at every alien.
+
+    The result is (left, right, bottom, count) in the same form as the cached values,
+    with -1 for the edges when no alien is alive.
+
+    Parameter formation: The formation to scan
+    Precondition: formation is a Formation object
+    """
+    cells = [(row, col) for row in range(formation.getRows())
+             for col in range(formation.getCols()) if formation.isAlive(row, col)]
+    if cells == []:
+        return (-1, -1, -1, 0)
+    cols = [col for (row, col) in cells]
+    rows = [row for (row, col) in cells]
+    return (min(cols), max(cols), max(rows), len(cells))
+
+
+def test_step_moves_and_flips_the_frame():
+    formation = Formation(2, 3, 100, 500)
+    formation.remember()
+    formation.step(ALIEN_H_WALK, 0)
+    assert (formation.getX(), formation.getY()) == (100+ALIEN_H_WALK, 500)
+    assert formation.getFrame() == 1
+    assert formation.getPosition(0.5) == (100+ALIEN_H_WALK/2, 500)
+    formation.step(0, -ALIEN_V_WALK)
+    assert formation.getY() == 500-ALIEN_V_WALK
+    assert formation.getFrame() == 0
+
+
+def test_edges_follow_the_living_columns():
+    formation = Formation(3, 4, 100, 500)
+    assert formation.getLeft() == 100
+    assert formation.getRight() == 100+3*ALIEN_COL_STEP
+    assert formation.getBottom() == 500-2*ALIEN_ROW_STEP
+    for row in range(3):
+        formation.kill(row, 3)
+    assert formation.getRight() == 100+2*ALIEN_COL_STEP
+    for row in range(3):
+        formation.kill(row, 0)
+    assert formation.getLeft() == 100+ALIEN_COL_STEP
+    formation.kill(2, 1)
+    formation.kill(2, 2)
+    assert formation.getBottom() == 500-ALIEN_ROW_STEP
+    assert formation.getCount() == 4
+
+
+def test_march_bounds_follow_the_edges():
+    from wave import Wave
+    # The last of 17 columns is past the right bound, and the one before it is not
+    wave = Wave(2, 17)
+    assert not wave.canmoveRight()
+    wave.removealien(0, 16)
+    assert not wave.canmoveRight()
+    wave.removealien(1, 16)
+    assert wave.getRightAlien() == wave.getLeftAlien()+15*ALIEN_COL_STEP
+    assert wave.canmoveRight()
+
+
+def test_kill_keeps_the_caches_in_step_with_a_scan():
+    random.seed(1)
+    formation = Formation(5, 7, 100, 600)
+    cells = [(row, col) for row in range(5) for col in range(7)]
+    random.shuffle(cells)
+    for (row, col) in cells:
+        formation.kill(row, col)
+        left, right, bottom, count = scan(formation)
+        assert formation.getCount() == count
+        if count > 0:
+            assert formation.getLeft() == 100+left*ALIEN_COL_STEP
+            assert formation.getRight() == 100+right*ALIEN_COL_STEP
+            assert formation.getBottom() == 600-bottom*ALIEN_ROW_STEP
+    assert formation.getLeft() is None
+    assert formation.getRight() is None
+    assert formation.getBottom() is None
+    assert formation.shooter() is None
+
+
+def test_shooter_is_the_lowest_alien_of_a_living_column():
+    random.seed(2)
+    formation = Formation(4, 3, 100, 600)
+    formation.kill(3, 0)
+    formation.kill(2, 0)
+    for row in range(4):
+        formation.kill(row, 1)
+    for _ in range(50):
+        row, col = formation.shooter()
+        assert col in (0, 2)
+        assert row == (1 if col == 0 else 3)
+
+
+def test_reach_tables_match_the_living_rows():
+    formation = Formation(4, 2, 100, 600)
+    formation.kill(1, 0)
+    formation.kill(3, 0)
+    upto, downto = formation._reach()
+    assert upto[:, 0].tolist() == [0, 0, 2, 2]
+    assert downto[:, 0].tolist() == [0, 2, 2, 4]
+    assert upto[:, 1].tolist() == [0, 1, 2, 3]
+    # A kill rebuilds the tables
+    formation.kill(2, 0)
+    upto, downto = formation._reach()
+    assert upto[:, 0].tolist() == [0, 0, 0, 0]
+    assert downto[:, 0].tolist() == [0, 4, 4, 4]
+
+
+def test_bolt_moving_up_hits_the_lowest_alien_on_its_path():
+    formation = Formation(3, 2, 100, 600)
+    bottom = 600-2*ALIEN_ROW_STEP
+    rows, cols = formation.hitsPath([100, 100+ALIEN_COL_STEP/2], [bottom-60]*2, [bottom]*2)
+    assert rows.tolist() == [2, -1]
+    assert cols.tolist() == [0, -1]
+    formation.kill(2, 0)
+    rows, cols = formation.hitsPath([100], [bottom-60], [600])
+    assert (rows.tolist(), cols.tolist()) == ([1], [0])
+
+
+def test_fire_adds_bolts_past_the_capacity():
+    field = BoltField(2)
+    for i in range(5):
+        field.fire(10*i, 100, i % 2 == 0)
+    assert len(field) == 5
+    assert [(x, y, player) for (_, x, _, y, player) in field.items()] == \
+        [(0, 100, True), (10, 100, False), (20, 100, True), (30, 100, False), (40, 100, True)]
+
+
+def test_move_goes_up_for_the_player_and_down_for_aliens():
+    field = BoltField()
+    field.fire(10, 300, True)
+    field.fire(20, 300, False)
+    field.move(0.5)
+    assert [(y0, y) for (_, _, y0, y, _) in field.items()] == \
+        [(300, 300+BOLT_SPEED/2), (300, 300-BOLT_SPEED/2)]
+
+
+def test_cull_keeps_positions_paired_with_owners():
+    field = BoltField(4)
+    for i in range(8):
+        field.fire(i, 100+i, i % 3 == 0)
+    expected = {(i, 100+i, i % 3 == 0) for i in range(8)}
+    for index in (0, 2, 3, 7):
+        field.kill(index)
+        expected.discard((index, 100+index, index % 3 == 0))
+    field.cull()
+    assert len(field) == 4
+    assert {(x, y, player) for (_, x, _, y, player) in field.items()} == expected
+    # The surviving bolts are packed into the first slots
+    assert [index for (index, _, _, _, _) in field.items()] == [0, 1, 2, 3]
+
+
+def test_cull_removes_bolts_off_screen():
+    field = BoltField()
+    field.fire(10, GAME_HEIGHT-1, True)
+    field.fire(20, 1, False)
+    field.fire(30, GAME_HEIGHT/2, True)
+    field.move(0.1)
+    field.cull()
+    assert [(x, player) for (_, x, _, _, player) in field.items()] == [(30, True)]
+
+
+def test_has_player_bolt_ignores_killed_and_alien_bolts():
+    field = BoltField()
+    assert not field.hasPlayerBolt()
+    field.fire(10, 100, False)
+    assert not field.hasPlayerBolt()
+    field.fire(20, 100, True)
+    assert field.hasPlayerBolt()
+    field.kill(1)
+    assert not field.hasPlayerBolt()
+    field.cull()
+    assert not field.hasPlayerBolt()
+    assert len(field) == 1
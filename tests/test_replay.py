@@ -0,0 +1,100 @@
+"""
+Tests that a recorded session of Alien Invaders replays frame for frame
+"""
+import os
+import shutil
+import pytest
+from consts import *
+from app import Invaders
+from headless import autoplay
+from game2d import GameApp, HeadlessRunner, GReplay
+
+# Enough frames for three keyframes, with the default interval of 600
+FRAMES = 1300
+
+
+class Traced(Invaders):
+    """
+    A game that keeps its snapshot and the keys held down after every update.
+
+    INSTANCE ATTRIBUTES:
+        trail: the (snapshot, keys) of each update [list of tuple]
+    """
+
+    def start(self):
+        """
+        Starts the game with an empty trail.
+        """
+        self.trail = []
+        super().start()
+
+    def update(self, dt):
+        """
+        Updates the game and appends its state to the trail.
+
+        Parameter dt: The time in seconds since last update
+        Precondition: dt is a number (int or float)
+        """
+        super().update(dt)
+        self.trail.append((self.snapshot(), tuple(sorted(self.input.keys))))
+
+
+@pytest.fixture
+def assets(tmp_path, monkeypatch):
+    """
+    Points the game at a copy of its assets, with stand-ins for the files not in the repo.
+
+    The background music and image are not checked in. The null backend never reads
+    the files, so any sound and image will do in their place. A game looks for its
+    assets next to the module of its class, which for Traced is this folder, so the
+    paths are set here instead.
+    """
+    folder = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    images = tmp_path/'Images'
+    sounds = tmp_path/'Sounds'
+    shutil.copytree(os.path.join(folder,'Images'), images)
+    shutil.copytree(os.path.join(folder,'Sounds'), sounds)
+    if not (images/'stars.jpg').exists():
+        shutil.copy(images/'alien1.png', images/'stars.jpg')
+    if not (sounds/'bgmusic.mp3').exists():
+        shutil.copy(sounds/'laser.wav', sounds/'bgmusic.mp3')
+    def setpaths(self):
+        GameApp.images = str(images)
+        GameApp.sounds = str(sounds)
+    monkeypatch.setattr(GameApp, '_setpaths', setpaths)
+    # Restore the folders that the other tests use afterwards
+    monkeypatch.setattr(GameApp, 'images', GameApp.images)
+    monkeypatch.setattr(GameApp, 'sounds', GameApp.sounds)
+
+
+def test_replay_matches_the_recording(assets, tmp_path):
+    path = str(tmp_path/'session.g2dr')
+    game = Traced(width=GAME_WIDTH, height=GAME_HEIGHT)
+    recorder = game.record(path, 7)
+    HeadlessRunner(game, 1.0/60, autoplay(FRAMES)).run(FRAMES)
+    recorder.close()
+    recorded = game.trail
+
+    replayed = Traced(width=GAME_WIDTH, height=GAME_HEIGHT)
+    with GReplay(path) as session:
+        assert session.frames == FRAMES
+        session.play(replayed)
+    assert len(replayed.trail) == FRAMES
+    assert replayed.trail == recorded
+    # The game got far enough to fight, so the comparison is not trivial
+    assert any(snapshot['bolts'] > 0 for (snapshot, keys) in recorded)
+
+
+def test_keys_at_seeks_from_the_keyframes(assets, tmp_path):
+    path = str(tmp_path/'session.g2dr')
+    game = Traced(width=GAME_WIDTH, height=GAME_HEIGHT)
+    recorder = game.record(path, 7)
+    HeadlessRunner(game, 1.0/60, autoplay(FRAMES)).run(FRAMES)
+    recorder.close()
+    keys = [keys for (snapshot, keys) in game.trail]
+
+    with GReplay(path) as session:
+        assert session.keyframes == [0, 600, 1200]
+        for frame in (0, 1, 599, 600, 601, 1199, 1200, FRAMES-1):
+            assert tuple(sorted(session.keys_at(frame))) == keys[frame]
+        assert [tuple(sorted(keys)) for (dt, keys) in session.iterate(590)] == keys[590:]
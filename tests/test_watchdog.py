@@ -0,0 +1,62 @@
+"""
+Tests for the frame-spike sampler in game2d.watchdog
+"""
+import time
+from game2d.watchdog import GWatchdog
+
+
+def busy(seconds):
+    """
+    Keeps the game thread busy for the given number of seconds, as a slow frame would.
+
+    Parameter seconds: The time to stay busy
+    Precondition: seconds is a number >= 0
+    """
+    end = time.perf_counter()+seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def test_frame_just_over_budget_is_a_spike(tmp_path):
+    path = str(tmp_path/'spikes.txt')
+    watchdog = GWatchdog(0.010,samples=5,path=path)
+    try:
+        for _ in range(10):
+            watchdog.begin()
+            busy(0.015)
+            watchdog.end()
+    finally:
+        watchdog.close()
+    assert watchdog.spikes == 10
+    with open(path) as file:
+        assert file.read().count('(budget 10.0 ms)') == 10
+
+
+def test_frame_within_budget_is_not_a_spike(tmp_path):
+    path = str(tmp_path/'spikes.txt')
+    watchdog = GWatchdog(0.050,path=path)
+    try:
+        for _ in range(5):
+            watchdog.begin()
+            busy(0.001)
+            watchdog.end()
+    finally:
+        watchdog.close()
+    assert watchdog.spikes == 0
+
+
+def test_samples_kept_when_frame_ends_early(tmp_path):
+    path = str(tmp_path/'spikes.txt')
+    # The frame ends long before all of the samples could be taken
+    watchdog = GWatchdog(0.005,samples=50,interval=0.002,path=path)
+    try:
+        watchdog.begin()
+        time.sleep(0.030)
+        watchdog.end()
+    finally:
+        watchdog.close()
+    assert watchdog.spikes == 1
+    with open(path) as file:
+        text = file.read()
+    assert 'samples:' in text
+    assert 'test_samples_kept_when_frame_ends_early' in text
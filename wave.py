@@ -24,8 +24,9 @@ class Wave(object):
 
     INSTANCE ATTRIBUTES:
         _ship:              the player ship to control [Ship]
-        _aliens:            the 2d list of aliens in the wave [rectangular 2d list of Alien or None]
-        _bolts:             the laser bolts currently on screen [list of Bolt, possibly empty]
+        _aliens:            the 2d list of aliens in the wave, each one a sprite for each
+                            animation frame [rectangular 2d list of (Alien, Alien) or None]
+        _bolts:             the laser bolts currently on screen [BoltField]
         _dline:             the defensive line being protected [GPath]
         _lives:             the number of lives left  [int >= 0]
         _time:              the amount of time since the last Alien "step" [number >= 0]
@@ -34,6 +35,11 @@ class Wave(object):
         _boltrate:          a random number of steps at which the alien begins to fire [number >= 0]
         _laser:             a music file that plays when the spacebar is pressed, firing a bolt from the ship [string]
         _alienrun:          determines the alien speed, which is increased as aliens are killed [int > 0]
+        _formation:         the positions and living aliens of the wave [Formation]
+        _scenes:            the scenes drawing the living aliens, one for each animation
+                            frame; their x and y follow the position of the first column
+                            and top row of _formation [list of two GScene]
+        _tests:             the number of collision tests in the last call to collisionaction [int >= 0]
     """
 
     # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
@@ -53,6 +59,27 @@ class Wave(object):
         """
         return self._lives
 
+    def getAlienCount(self):
+        """
+        Returns the number of living aliens in the wave.
+        """
+        return self._formation.getCount()
+
+    def getBoltCount(self):
+        """
+        Returns the number of laser bolts on screen.
+        """
+        return len(self._bolts)
+
+    def getCollisionTests(self):
+        """
+        Returns the number of collision tests done in the last call to collisionaction().
+
+        Each player bolt is one test against the whole formation, and each alien bolt
+        checked against the ship is one more.
+        """
+        return self._tests
+
     def setLives(self, num):
         assert type(num) == int
         self._lives = num
@@ -62,41 +89,36 @@ class Wave(object):
         Returns the x attribute of the rightmost alien in the alien wave.
 
         This getter method is to protect access to the alien wave.
-        It returns the alien closest to the right edge of the screen.
-        """
-        max = 0
-        acc = self._aliens[0][0]
-        for nums in range(len(self._aliens[0])):
-            for aliens in range(len(self._aliens)):
-                if not self._aliens[aliens][nums] is None:
-                    if max < self._aliens[aliens][nums].x:
-                        if not self._aliens[aliens][nums].x is None:
-                            max = self._aliens[aliens][nums].x
-                        if not self._aliens[aliens][nums] is None:
-                            acc = self._aliens[aliens][nums]
-        return acc.x
+        It returns the x of the alien closest to the right edge of the screen, or
+        None if there are no aliens left. The value comes from the cached rightmost
+        column, so the wave is not scanned.
+        """
+        return self._formation.getRight()
 
     def getLeftAlien(self):
         """
         Returns the x attribute of the leftmost alien in the alien wave.
 
         This getter method is to protect access to the alien wave.
-        It returns the alien closest to the left edge of the screen.
-        """
-        min = GAME_WIDTH
-        acc = self._aliens[ALIEN_ROWS-1][ALIENS_IN_ROW-1]
-        for aliens in range(len(self._aliens)):
-            for nums in range(len(self._aliens[0])):
-                if not self._aliens[aliens][nums] is None:
-                    if min > self._aliens[aliens][nums].x:
-                        if not self._aliens[aliens][nums].x is None:
-                            min = self._aliens[aliens][nums].x
-                        if not self._aliens[aliens][nums] is None:
-                            acc = self._aliens[aliens][nums]
-        return acc.x
+        It returns the x of the alien closest to the left edge of the screen, or
+        None if there are no aliens left. The value comes from the cached leftmost
+        column, so the wave is not scanned.
+        """
+        return self._formation.getLeft()
+
+    def getBottomAlien(self):
+        """
+        Returns the y attribute of the lowest alien in the alien wave.
+
+        This getter method is to protect access to the alien wave.
+        It returns the y of the lowest row that still has a living alien, or None
+        if there are no aliens left. The value comes from the cached lowest row,
+        so the wave is not scanned.
+        """
+        return self._formation.getBottom()
 
     # INITIALIZER (standard form) TO CREATE SHIP AND ALIENS
-    def __init__(self):
+    def __init__(self, rows=ALIEN_ROWS, cols=ALIENS_IN_ROW):
         """
         Initializes a new wave.
 
@@ -105,18 +127,27 @@ class Wave(object):
         while also initializing instance attributes.
         In the end of the initializer, the alienrows() method is called to create this
         table of aliens.
+
+        Parameter rows: the number of rows of aliens
+        Precondition: rows is an int > 0
+
+        Parameter cols: the number of aliens in each row
+        Precondition: cols is an int > 0
         """
         self._dline = GPath(points=[0,DEFENSE_LINE,GAME_WIDTH,DEFENSE_LINE], \
         linecolor=introcs.RGB(51, 204, 255), linewidth=1.5)
         self._ship = Ship()
         self._time = 0
-        self._bolts = []
+        self._bolts = BoltField()
         self._aliens = []
         self._alienrun = ALIEN_SPEED
         self._lives = 3
         self._horizontalmove = False
         self._laser = Sound('laser.wav')
         self._boltrate = 0
+        self._tests = 0
+        self._formation = Formation(rows, cols, ALIEN_H_SEP + ALIEN_WIDTH/2,
+                                    GAME_HEIGHT - ALIEN_CEILING - ALIEN_ROW_STEP)
         self.alienrows()
 
     def canmoveRight(self):
@@ -141,10 +172,11 @@ class Wave(object):
         covered the entire distance from its position minus half of its width to
         the the alien's walk.
         """
-        if (self.getLeftAlien() - ALIEN_WIDTH/2 > ALIEN_H_WALK):
-            return True
-        else:
-            return False
+        if self.getLeftAlien() is not None:
+            if (self.getLeftAlien() - ALIEN_WIDTH/2 > ALIEN_H_WALK):
+                return True
+            else:
+                return False
 
     def alienrows(self):
         """
@@ -153,25 +185,47 @@ class Wave(object):
         This method lines up the aliens neatly into columns by looping through
         all the aliens in the two dmensional list and printing different alien
         shapes for different row numbers.
+
+        The aliens are placed relative to the alien in the first column of the top
+        row. Each alien gets one sprite for each of its two animation frames, and the
+        sprites for a frame are all stored in one GScene. Moving the scenes moves the
+        whole wave at once, and only the scene for the current frame is drawn.
         """
-        x = ALIEN_H_SEP + ALIEN_WIDTH/2
-        y = GAME_HEIGHT - ALIEN_CEILING
+        rows = self._formation.getRows()
         source = 'alien-strip1.png'
-        for row in range(ALIEN_ROWS):
+        for row in range(rows):
             new = []
-            if (ALIEN_ROWS-1-row) % 6 == 0 or (ALIEN_ROWS-1-row) % 6 == 1:
+            if (rows-1-row) % 6 == 0 or (rows-1-row) % 6 == 1:
                 source = 'alien-strip1.png'
-            elif (ALIEN_ROWS-1-row) % 6 == 2 or (ALIEN_ROWS-1-row) % 6 == 3:
+            elif (rows-1-row) % 6 == 2 or (rows-1-row) % 6 == 3:
                 source = 'alien-strip2.png'
-            elif (ALIEN_ROWS-1-row) % 6 == 4 or (ALIEN_ROWS-1-row) % 6 == 5:
+            elif (rows-1-row) % 6 == 4 or (rows-1-row) % 6 == 5:
                 source = 'alien-strip3.png'
-            y = y - ALIEN_HEIGHT - ALIEN_V_SEP
-            x = ALIEN_H_SEP + ALIEN_WIDTH/2
-            for col in range(ALIENS_IN_ROW):
-                alienobject = Alien(x, y, source)
-                x = x + ALIEN_WIDTH + ALIEN_H_SEP
-                new.append(alienobject)
+            for col in range(self._formation.getCols()):
+                still = Alien(col*ALIEN_COL_STEP, -row*ALIEN_ROW_STEP, source)
+                moved = Alien(col*ALIEN_COL_STEP, -row*ALIEN_ROW_STEP, source)
+                moved.frame = 1
+                new.append((still, moved))
             self._aliens.append(new)
+        self._scenes = [GScene(children=[pair[frame] for new in self._aliens for pair in new],
+                               x=self._formation.getX(), y=self._formation.getY())
+                        for frame in range(2)]
+
+    def stepaliens(self, dx, dy):
+        """
+        This method moves the wave of aliens and moves them on to their next animation frame.
+
+        The formation does the moving. The next draw moves the scene for the new
+        animation frame to match it. No alien is touched, so a step costs the same
+        however large the wave is.
+
+        Parameter dx: the number of pixels to move right
+        Precondition: dx is a number (int or float)
+
+        Parameter dy: the number of pixels to move up
+        Precondition: dy is a number (int or float)
+        """
+        self._formation.step(dx, dy)
 
     def aliensright(self, time):
         """
@@ -182,11 +236,7 @@ class Wave(object):
         It is added to the _time attribute in each animation frame.
         """
         if self._time > self._alienrun:
-            for num in range(ALIEN_ROWS):
-                for alien in range(ALIENS_IN_ROW):
-                    if not self._aliens[num][alien] is None:
-                        self._aliens[num][alien].x = self._aliens[num][alien].x + ALIEN_H_WALK
-                        self._aliens[num][alien].frame = (self._aliens[num][alien].frame+1) % 2
+            self.stepaliens(ALIEN_H_WALK, 0)
             self._time = 0
         self._time = time + self._time
 
@@ -197,11 +247,7 @@ class Wave(object):
         Parameter time: counts the number of seconds that have passed since the last animation frame.
         It is added to the _time attribute in each animation frame.
         """
-        for num in range(ALIEN_ROWS):
-            for alien in range(ALIENS_IN_ROW):
-                if not self._aliens[num][alien] is None:
-                    self._aliens[num][alien].y = self._aliens[num][alien].y - ALIEN_V_SEP
-                    self._aliens[num][alien].frame = (self._aliens[num][alien].frame+1) % 2
+        self.stepaliens(0, -ALIEN_V_SEP)
         self._horizontalmove = not self._horizontalmove
 
     def aliensleft(self, time):
@@ -212,11 +258,7 @@ class Wave(object):
         It is added to the _time attribute in each animation frame.
         """
         if self._time > self._alienrun:
-            for num in range(ALIEN_ROWS):
-                for alien in range(ALIENS_IN_ROW):
-                    if not self._aliens[num][alien] is None:
-                        self._aliens[num][alien].x = self._aliens[num][alien].x - ALIEN_H_WALK
-                        self._aliens[num][alien].frame = (self._aliens[num][alien].frame+1) % 2
+            self.stepaliens(-ALIEN_H_WALK, 0)
             self._time = 0
         self._time = time + self._time
 
@@ -226,69 +268,61 @@ class Wave(object):
         This method calls methods aliensright(), aliensleft() and aliensdown() according
         to certain conditions, allowing the aliens to move in the correct areas of the screen
         and not leave the screen.
-        """
-        if self._horizontalmove == False and self.canmoveRight():
-            self.aliensright(time)
-        if self._horizontalmove == False and self.canmoveRight() == False:
-            self.aliensdown(time)
-            self._horizontalmove = True
-        if self._horizontalmove == True and self.canmoveLeft() == True:
-            self.aliensleft(time)
-        if  self._horizontalmove == True and self.canmoveLeft() == False:
-            self.aliensdown(time)
-            self._horizontalmove = False
-        state = True
-        for bolt in self._bolts:
-            if bolt.isPlayerBolt():
-                state = False
-        if input.is_key_down('spacebar') and state == True:
-            self._laser = Sound('laser.wav')
-            self._laser.play()
-            self._bolts.append(Bolt(self._ship.x, self._ship.y + SHIP_HEIGHT/2))
-        if (not self._bolts == []):
-            self.boltpass()
-        self.alienbolt()
-        self.collisionaction()
-
-    def movebolt(self):
-        """
-        This method moves the bolt up or down.
-
-        It determines the direction of the bolt's movement by calling isPlayerBolt()
-        to check if the bolt is from the ship or from the aliens.
-        """
-        for bolt in self._bolts:
-            if not bolt.isout():
-                if bolt.isPlayerBolt():
-                    bolt.y += bolt._velocity
-                else:
-                    bolt.y += bolt._velocity
-
-    def boltpass(self):
-        """
-        This method deletes the bolts when they move offscreen.
-
-        It first calls the movebolt() method and then calls the isout() method.
-        If isout() returns True, the bolt at that specific list index is deleted.
-        """
-        for bolt in self._bolts:
-            self.movebolt()
-            if bolt.isout():
-                boltindex = self._bolts.index(bolt)
-                del self._bolts[boltindex]
+
+        Each phase is timed as a span when the game is traced (see GTracer).
+        """
+        span = GTracer.span
+        with span('Wave.update'):
+            with span('Wave.formation'):
+                if self._horizontalmove == False and self.canmoveRight():
+                    self.aliensright(time)
+                if self._horizontalmove == False and self.canmoveRight() == False:
+                    self.aliensdown(time)
+                    self._horizontalmove = True
+                if self._horizontalmove == True and self.canmoveLeft() == True:
+                    self.aliensleft(time)
+                if  self._horizontalmove == True and self.canmoveLeft() == False:
+                    self.aliensdown(time)
+                    self._horizontalmove = False
+            if input.is_key_down('spacebar') and not self._bolts.hasPlayerBolt():
+                with span('Wave.fire'):
+                    self._laser = Sound('laser.wav')
+                    self._laser.play()
+                    self._bolts.fire(self._ship.x, self._ship.y + SHIP_HEIGHT/2, True)
+            if len(self._bolts) > 0:
+                with span('Wave.movebolt'):
+                    self.movebolt(time)
+            with span('Wave.alienbolt'):
+                self.alienbolt()
+            with span('Wave.collisionaction'):
+                self.collisionaction()
+
+    def movebolt(self, time):
+        """
+        This method moves the bolts up or down.
+
+        Every bolt moves by its own velocity, which is positive for bolts from the
+        ship and negative for bolts from the aliens. All bolts move in one step.
+
+        Parameter time: The time in seconds since last update
+        Precondition: time is a number (int or float) >= 0
+        """
+        self._bolts.move(time)
 
     def alienbolt(self):
         """
         This method allows random aliens to shoot bolts.
 
         The method first selects a nonempty column of aliens at random.
-        Then, it finds the alien at the bottom of the column and creates a Bolt object.
+        Then, it picks a random living alien in that column and fires a bolt from it.
+        Both choices only consider living aliens, so the shooter is never None.
         """
-        num = random.randint(0, ALIEN_ROWS-1)
-        randalien = random.choice(self._aliens[num])
-        if not randalien is None:
+        shooter = self._formation.shooter()
+        if shooter is not None:
             if self._time/self._alienrun >= self._boltrate:
-                self._bolts.append(Bolt(randalien.x, randalien.y - ALIEN_HEIGHT/2))
+                x = self._formation.getX() + shooter[1]*ALIEN_COL_STEP
+                y = self._formation.getY() - shooter[0]*ALIEN_ROW_STEP
+                self._bolts.fire(x, y - ALIEN_HEIGHT/2, False)
         self._boltrate = random.randint(1, BOLT_RATE)
 
     def collisionaction(self):
@@ -298,43 +332,71 @@ class Wave(object):
         It checks if the bolt collides with either the alien or the ship based
         on its placement, and sets the alien at that index or the ship to None.
         It also deletes the bolt that collides.
-        """
-        for bolt in self._bolts:
-            if self._ship is not None:
-                if self._ship.collides(bolt) == True:
+
+        Player bolts are not tested against every alien. The aliens sit on a regular
+        grid, so the formation maps all of the player bolts to the grid cells they
+        touch at once.
+
+        Each bolt is tested along the whole path it moved this frame, so fast bolts
+        and long frames cannot pass through an alien or the ship. Offscreen bolts are
+        only removed afterwards, so a bolt that hit something on its way off the
+        screen still counts.
+        """
+        bolts = self._bolts.items()
+        players = [bolt for bolt in bolts if bolt[4]]
+        self._tests = len(players)
+        if players != []:
+            rows, cols = self._formation.hitsPath([bolt[1] for bolt in players],
+                                                  [bolt[2] for bolt in players],
+                                                  [bolt[3] for bolt in players])
+            for bolt, row, col in zip(players, rows.tolist(), cols.tolist()):
+                if row >= 0 and self._formation.isAlive(row, col):
+                    self.removealien(row, col)
+                    self._alienrun = 0.97 * self._alienrun
+                    self._bolts.kill(bolt[0])
+        if self._ship is not None:
+            # Alien bolts all fall at the same speed, so the lowest one reaches the ship first
+            aliens = sorted((bolt for bolt in bolts if not bolt[4]), key=lambda bolt: bolt[2])
+            for index, x, y0, y, player in aliens:
+                self._tests += 1
+                if self._ship.collidesPath(x, y0, y):
                     self._ship = None
                     self._lives -= 1
-                    boltindex = self._bolts.index(bolt)
-                    del self._bolts[boltindex]
-            for alien in range(len(self._aliens)):
-                for num in range(len(self._aliens[0])):
-                    if not self._aliens[alien][num] is None:
-                        if self._aliens[alien][num].collides(bolt) == True:
-                            self._aliens[alien][num] = None
-                            self._alienrun = 0.97 * self._alienrun
-                            boltindex = self._bolts.index(bolt)
-                            del self._bolts[boltindex]
+                    self._bolts.kill(index)
+                    break
+        self._bolts.cull()
+
+    def removealien(self, row, col):
+        """
+        Removes the alien at the given row and column from the wave.
+
+        The alien is taken out of the formation and both scenes, and set to None.
+
+        Parameter row: the row of the alien to remove
+        Precondition: row is an int and self._aliens[row][col] is not None
+
+        Parameter col: the column of the alien to remove
+        Precondition: col is an int and self._aliens[row][col] is not None
+        """
+        for scene, alien in zip(self._scenes, self._aliens[row][col]):
+            scene.remove(alien)
+        self._aliens[row][col] = None
+        self._formation.kill(row, col)
 
     def noaliens(self):
         """
-        Returns True if the list of aliens is None.
+        Returns True if there are no living aliens left in the wave.
         """
-        for alien in range(ALIEN_ROWS):
-            for num in range(ALIENS_IN_ROW):
-                if self._aliens[alien][num] is not None:
-                    return False
-        else:
-            return True
+        return self._formation.getCount() == 0
 
     def aliensbelow(self):
         """
         Returns True if the alien dips below the defense line.
+
+        Only the lowest row with a living alien needs to be checked.
         """
-        for alien in range(len(self._aliens)):
-            for num in range(len(self._aliens[0])):
-                if self._aliens[alien][num] is not None:
-                    if self._aliens[alien][num].y <= DEFENSE_LINE:
-                        return True
+        bottom = self.getBottomAlien()
+        return bottom is not None and bottom <= DEFENSE_LINE
 
     def lives(self):
         """
@@ -351,20 +413,59 @@ class Wave(object):
     def newShip(self):
         self._ship = Ship()
 
+    def remember(self):
+        """
+        Records the positions of the ship, the aliens and the bolts before an update.
+
+        The draw method blends from these positions to the current ones, so that a
+        game drawn between two fixed time steps moves smoothly. It must be called
+        before every update, even the ones that do not move anything.
+        """
+        if self._ship is not None:
+            self._ship.remember()
+        self._formation.remember()
+        self._bolts.remember()
+
+    def fireBolt(self, x, y, player):
+        """
+        Adds a laser bolt to the wave, as if it had been fired from (x, y).
+
+        The game never calls this method. It lets a benchmark put any number of bolts
+        on the screen, which the one-bolt rule for the ship would otherwise prevent.
+
+        Parameter x: the x value of the bolt on the screen
+        Precondition: x is a number (int or float)
+
+        Parameter y: the y value of the bolt on the screen
+        Precondition: y is a number (int or float)
+
+        Parameter player: whether the bolt moves up, as if fired by the ship
+        Precondition: player is a bool
+        """
+        self._bolts.fire(x, y, player)
+
     # DRAW METHOD TO DRAW THE SHIP, ALIENS, DEFENSIVE LINE AND BOLTS
-    def draw (self, view):
+    def draw (self, view, alpha=1.0):
         """
         Draws the game objects (aliens, ship, defense line and bolts) to the view.
 
         Every single thing you want to draw in this game is a GObject.
         Therefore, the method g.draw(self.view) is used.
+
+        The ship, aliens and bolts are drawn the fraction alpha of the way from where
+        they were before the last update (see remember) to where they are now.
+
+        Parameter view: the view to draw to
+        Precondition: view is a GView
+
+        Parameter alpha: the interpolation factor of the game (see GameApp.alpha)
+        Precondition: alpha is a number in 0..1
         """
-        for row in range(ALIEN_ROWS):
-            for col in range(ALIENS_IN_ROW):
-                if not self._aliens[row][col] is None:
-                    self._aliens[row][col].draw(view)
-        if not self._ship is None:
-            self._ship.draw(view)
-        self._dline.draw(view)
-        for bolts in self._bolts:
-            bolts.draw(view)
+        with GTracer.span('Wave.draw'):
+            scene = self._scenes[self._formation.getFrame()]
+            scene.x, scene.y = self._formation.getPosition(alpha)
+            scene.draw(view)
+            if not self._ship is None:
+                self._ship.draw(view, alpha)
+            self._dline.draw(view)
+            self._bolts.draw(view, alpha)